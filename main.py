@@ -7,17 +7,25 @@ Supports custom prompts, different LLM providers, and flexible document processi
 Usage:
     python main.py                    # Uses default agent.yaml
     python main.py --config my.yaml   # Uses custom config file
+    python main.py -c a.yaml -c b.yaml  # Hosts several agents in one process
+    python main.py --rebuild          # Publishes a fresh index snapshot
+    python main.py --memory-report    # Prints memory use by component
+    python main.py --profile          # Per-stage flame graph stacks in ./profile
+    python main.py batch inputs.txt -o results.jsonl  # Resumable batch job
+    cat inputs.txt | python main.py batch - -o results.jsonl
 """
 
 import argparse
 import logging
+from typing import Optional, Sequence
 
-from src.agent import AgentConfig, RAGAgent
-from src.loaders import DocumentLoaderFactory
-from src.chunkers import ChunkerFactory
-from src.repositories import ChromaRepository
+from src.agent import AgentConfig, AgentHost
+from src.agent.batch import BatchJob
+from src.agent.builder import build_snapshot
+from src.diagnostics.memory import tracker
+from src.diagnostics.profiling import profiler
+from src.repositories import CachedRepository, CompressedRepository, SnapshotStore
 from src.embeddings import EmbeddingFactory
-from src.llm import LLMFactory
 
 # Configure logging
 logging.basicConfig(
@@ -27,72 +35,115 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main(config_path: str = "agent.yaml"):
+def rebuild_snapshot(config: AgentConfig) -> None:
+    """Build and publish a new index snapshot for a config."""
+    if not config.use_snapshots:
+        logger.warning(f"--rebuild requires rag.snapshots; skipping {config.name}")
+        return
+
+    embedding_provider = EmbeddingFactory.create_from_agent_config(config)
+    try:
+        build_snapshot(
+            config,
+            SnapshotStore(config.persist_dir),
+            embedding_provider.get_embeddings(),
+        )
+    finally:
+        EmbeddingFactory.release(embedding_provider)
+
+
+def main(
+    config_paths: Sequence[str] = ("agent.yaml",),
+    rebuild: bool = False,
+    memory_report: bool = False,
+    profile_dir: Optional[str] = None,
+):
     """Main execution function."""
-    # Load configuration from YAML
-    config = AgentConfig.from_yaml(config_path)
+    if memory_report:
+        # Start before anything is loaded so allocations can be attributed
+        tracker.start()
+    if profile_dir:
+        # Sample ingest (loader, chunker, embedding, repository) as well as queries
+        profiler.start()
 
-    logger.info(f"Starting agent: {config.name}")
-    logger.info(f"Using model: {config.model_provider}/{config.model_name}")
+    # Agents with identical model settings share one loaded model
+    host = AgentHost()
 
     try:
-        # Create embedding provider (Factory pattern)
-        embedding_provider = EmbeddingFactory.create_from_agent_config(config)
-        embeddings = embedding_provider.get_embeddings()
-
-        # Create repository (Repository pattern)
-        repository = ChromaRepository(
-            persist_dir=config.persist_dir,
-            embeddings=embeddings,
-        )
+        for config_path in config_paths:
+            # Load configuration from YAML
+            config = AgentConfig.from_yaml(config_path)
 
-        # Load or build vector store
-        if not repository.load():
-            logger.info("Building new vector database...")
+            logger.info(f"Starting agent: {config.name}")
+            logger.info(f"Using model: {config.model_provider}/{config.model_name}")
 
-            # Load documents (Factory + Strategy pattern)
-            file_path, documents = DocumentLoaderFactory.detect_and_load(
-                config.context_file
-            )
+            if rebuild:
+                rebuild_snapshot(config)
+                continue
 
-            # Chunk documents (Factory + Strategy pattern)
-            chunker = ChunkerFactory.create_from_agent_config(file_path, config)
-            chunks = chunker.chunk(documents)
+            agent = host.load(host.register(config_path, name=config.name))
+            if profile_dir:
+                agent.start_profiling()
 
-            # Save to repository
-            repository.save(chunks)
-            logger.info("Vector database created successfully")
+            # Run test cases
+            print("\n" + "=" * 80)
+            print(f"{config.name.upper()}")
+            print(f"{config.description}")
+            print("=" * 80 + "\n")
 
-        # Create LLM provider (Factory pattern)
-        llm_provider = LLMFactory.create_from_agent_config(config)
+            results = agent.run_test_cases()
 
-        # Create agent with injected dependencies
-        agent = RAGAgent(
-            config=config,
-            repository=repository,
-            llm_provider=llm_provider,
-        )
+            for i, result in enumerate(results, 1):
+                print(f"\n{'─' * 80}")
+                print(f"Test Case {i}:")
+                print(f"{'─' * 80}")
+                print(f"Input: {result.input}")
+                if result.is_success:
+                    print(f"\nOutput:\n{result.output}")
+                    if result.result is not None:
+                        print(f"\nLevel: {result.result.level}")
+                    if result.fast_path:
+                        print("\nAnswered by the kNN fast path")
+                    else:
+                        print(
+                            f"\nSources used: {result.source_documents} document chunks "
+                            f"({result.context_chars} characters of context)"
+                        )
+                else:
+                    print(f"\nError: {result.error}")
+
+            if agent.fast_path is not None:
+                stats = agent.fast_path.stats()
+                agreement = stats["agreement"]
+                print(
+                    f"\nFast path served {stats['served_fraction']:.0%} of requests; "
+                    f"agreement with the LLM on audited requests: "
+                    f"{'n/a' if agreement is None else f'{agreement:.0%}'}"
+                )
 
-        # Run test cases
-        print("\n" + "=" * 80)
-        print(f"{config.name.upper()}")
-        print(f"{config.description}")
-        print("=" * 80 + "\n")
+            if isinstance(agent.repository, CachedRepository):
+                stats = agent.repository.cache.stats()
+                print(
+                    f"Retrieval cache: {stats['hit_rate']:.0%} hit rate, "
+                    f"{stats['saved_ms']:.0f} ms saved"
+                )
 
-        results = agent.run_test_cases()
+            store = agent.repository
+            if isinstance(store, CachedRepository):
+                store = store.repository
+            if isinstance(store, CompressedRepository):
+                stats = store.stats()
+                print(
+                    f"Compressed vectors: {stats['stored_bytes'] / 2**20:.1f} MB instead of "
+                    f"{stats['full_bytes'] / 2**20:.1f} MB ({stats['saved_fraction']:.0%} saved), "
+                    f"recall@{stats['k']} {stats['recall']:.3f} against full precision"
+                )
 
-        for i, result in enumerate(results, 1):
-            print(f"\n{'─' * 80}")
-            print(f"Test Case {i}:")
-            print(f"{'─' * 80}")
-            print(f"Input: {result.input}")
-            if result.is_success:
-                print(f"\nOutput:\n{result.output}")
-                print(f"\nSources used: {result.source_documents} document chunks")
-            else:
-                print(f"\nError: {result.error}")
+            print("\n" + "=" * 80 + "\n")
 
-        print("\n" + "=" * 80 + "\n")
+        if memory_report and not rebuild:
+            tracker.record("steady state")
+            tracker.print_report()
 
     except FileNotFoundError as e:
         logger.error(str(e))
@@ -102,15 +153,120 @@ def main(config_path: str = "agent.yaml"):
         logger.error(f"An error occurred: {e}", exc_info=True)
         print(f"\nError: {e}")
 
+    finally:
+        host.close()
+        if profile_dir:
+            profiler.stop()
+            profiler.write(profile_dir)
+            profiler.print_summary()
+            print(f"Collapsed stacks per stage and summary.txt written to {profile_dir}/")
+
+
+def run_batch_job(
+    config_path: str,
+    input_path: str,
+    output_path: str,
+    checkpoint_path: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    checkpoint_every: int = 100,
+    progress_interval: float = 10.0,
+):
+    """Run a resumable batch job over an input file or stdin."""
+    host = AgentHost()
+    try:
+        config = AgentConfig.from_yaml(config_path)
+        logger.info(f"Starting batch job for agent: {config.name}")
+        agent = host.load(host.register(config_path, name=config.name))
+        job = BatchJob(
+            agent,
+            output_path,
+            checkpoint_path=checkpoint_path,
+            max_concurrency=max_concurrency,
+            checkpoint_every=checkpoint_every,
+            progress_interval=progress_interval,
+        )
+        job.run(input_path)
+    finally:
+        host.close()
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run RAG Agent")
     parser.add_argument(
         "--config",
         "-c",
+        action="append",
+        help="Path to agent configuration file (default: agent.yaml). "
+        "Repeat to host several agents in one process.",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Build and publish a new index snapshot, then exit (requires rag.snapshots)",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Trace allocations and print memory use by component after the test cases",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile",
+        metavar="DIR",
+        help="Sample each pipeline stage and write flame graph stacks and a hotspot "
+        "summary to DIR (default: profile)",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Stream inputs through the agent into a JSONL file, resuming from a checkpoint",
+    )
+    batch_parser.add_argument(
+        "input",
+        help='Input file with one input per line (text or {"id", "input"} JSON); "-" for stdin',
+    )
+    batch_parser.add_argument(
+        "--output", "-o", required=True, help="JSONL file that results are appended to"
+    )
+    batch_parser.add_argument(
+        "--config",
+        "-c",
+        dest="batch_config",
         default="agent.yaml",
         help="Path to agent configuration file (default: agent.yaml)",
     )
+    batch_parser.add_argument(
+        "--checkpoint", help="Checkpoint file (default: <output>.ckpt)"
+    )
+    batch_parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Inputs in flight (default: runtime.max_concurrency)",
+    )
+    batch_parser.add_argument(
+        "--checkpoint-every", type=int, default=100, help="Results between checkpoint saves"
+    )
+    batch_parser.add_argument(
+        "--progress-interval", type=float, default=10.0, help="Seconds between progress lines"
+    )
     args = parser.parse_args()
 
-    main(args.config)
+    if args.command == "batch":
+        run_batch_job(
+            args.batch_config,
+            args.input,
+            args.output,
+            checkpoint_path=args.checkpoint,
+            max_concurrency=args.concurrency,
+            checkpoint_every=args.checkpoint_every,
+            progress_interval=args.progress_interval,
+        )
+    else:
+        main(
+            args.config or ["agent.yaml"],
+            rebuild=args.rebuild,
+            memory_report=args.memory_report,
+            profile_dir=args.profile,
+        )
@@ -2,5 +2,6 @@
 
 from src.agent.config_loader import AgentConfig
 from src.agent.agent import RAGAgent
+from src.agent.host import AgentHost
 
-__all__ = ["AgentConfig", "RAGAgent"]
+__all__ = ["AgentConfig", "RAGAgent", "AgentHost"]
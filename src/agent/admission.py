@@ -0,0 +1,259 @@
+"""Admission control in front of generation: priority classes and load shedding."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.agent.metrics import AgentMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class OverloadedError(RuntimeError):
+    """A request was shed instead of queued."""
+
+    def __init__(self, priority: str, reason: str):
+        self.priority = priority
+        self.reason = reason
+        super().__init__(f"Overloaded: {reason} ({priority})")
+
+
+@dataclass
+class PriorityClass:
+    """A class of requests with its own concurrency cap and deadline."""
+
+    name: str
+    max_concurrency: Optional[int] = None
+    timeout: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, name: str, data: Optional[Dict[str, Any]]) -> "PriorityClass":
+        """Build a class from its admission.classes entry."""
+        data = data or {}
+        return cls(name, data.get("max_concurrency"), data.get("timeout"))
+
+
+@dataclass(order=True)
+class _Ticket:
+    """A request waiting for, or holding, a generation slot."""
+
+    rank: int
+    seq: int
+    priority: str = field(compare=False)
+    arrived: float = field(compare=False)
+    deadline: Optional[float] = field(compare=False)
+    future: Future = field(compare=False, default_factory=Future)
+    granted: Optional[float] = field(compare=False, default=None)
+
+
+class AdmissionController:
+    """
+    Bounded priority queue with per-class limits in front of the LLM.
+
+    At most max_concurrency requests run at once. Waiting requests are
+    admitted in class order (the first class is the most urgent), oldest
+    first, skipping classes that are at their own cap. When the queue is
+    full, the newest waiter of a less urgent class is shed to make room,
+    or the arriving request is if there is none. A request whose deadline
+    can no longer be met, given the recent service time, is shed rather
+    than admitted to finish late.
+
+    Sync and async callers share the same slots and queue.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        classes: List[PriorityClass],
+        max_queue: int = 64,
+        metrics: Optional[AgentMetrics] = None,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrency: Requests generating at once, across classes.
+            classes: Priority classes, most urgent first.
+            max_queue: Requests allowed to wait, across classes.
+            metrics: Where queue depth, wait times and sheds are reported.
+        """
+        if not classes:
+            raise ValueError("Admission control needs at least one priority class")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.classes = {c.name: c for c in classes}
+        self.metrics = metrics or AgentMetrics()
+        self._rank = {c.name: i for i, c in enumerate(classes)}
+        self._running = {c.name: 0 for c in classes}
+        self._queue: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._service_time = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, priority: str, timeout: Optional[float] = None) -> _Ticket:
+        """
+        Wait for a generation slot.
+
+        Args:
+            priority: Name of the request's priority class.
+            timeout: Seconds from now the request must finish in
+                (default: the class timeout; None waits indefinitely).
+
+        Returns:
+            The ticket to pass to release().
+
+        Raises:
+            OverloadedError: If the request was shed.
+            ValueError: If the priority class is unknown.
+        """
+        ticket = self._submit(priority, timeout)
+        try:
+            ticket.future.result(timeout=self._patience(ticket))
+        except FutureTimeout:
+            self._expire(ticket)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        # Re-read: expiring races with a concurrent grant
+        ticket.future.result()
+        return ticket
+
+    async def aacquire(self, priority: str, timeout: Optional[float] = None) -> _Ticket:
+        """Async version of acquire()."""
+        ticket = self._submit(priority, timeout)
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(ticket.future)), self._patience(ticket)
+            )
+        except asyncio.TimeoutError:
+            self._expire(ticket)
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        ticket.future.result()
+        return ticket
+
+    def release(self, ticket: _Ticket) -> None:
+        """Free a ticket's slot and admit the next waiters."""
+        with self._lock:
+            self._running[ticket.priority] -= 1
+            service = time.monotonic() - ticket.granted
+            # Exponentially weighted, so the estimate follows the current load
+            self._service_time = (
+                service if not self._service_time else 0.8 * self._service_time + 0.2 * service
+            )
+            self._dispatch()
+            self._publish()
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Get the number of waiting requests per class."""
+        with self._lock:
+            depth = {name: 0 for name in self.classes}
+            for ticket in self._queue:
+                depth[ticket.priority] += 1
+            return depth
+
+    def _submit(self, priority: str, timeout: Optional[float]) -> _Ticket:
+        """Queue a ticket and admit whatever can run now."""
+        if priority not in self.classes:
+            raise ValueError(f"Unknown priority class: {priority}")
+        if timeout is None:
+            timeout = self.classes[priority].timeout
+        now = time.monotonic()
+        ticket = _Ticket(
+            self._rank[priority],
+            next(self._seq),
+            priority,
+            now,
+            now + timeout if timeout else None,
+        )
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+            self._dispatch()
+            if len(self._queue) > self.max_queue:
+                # The least urgent class loses, newest first
+                victim = max(self._queue, key=lambda t: (t.rank, t.seq))
+                self._remove(victim)
+                self._shed(victim, "queue full")
+            self._publish()
+        return ticket
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiters in priority order. Caller holds the lock."""
+        now = time.monotonic()
+        for ticket in sorted(self._queue):
+            if sum(self._running.values()) >= self.max_concurrency:
+                break
+            if self._late(ticket, now):
+                self._remove(ticket)
+                self._shed(ticket, "deadline")
+                continue
+            cap = self.classes[ticket.priority].max_concurrency
+            if cap is not None and self._running[ticket.priority] >= cap:
+                continue
+            self._remove(ticket)
+            self._running[ticket.priority] += 1
+            ticket.granted = now
+            self.metrics.increment(f"admission.admitted.{ticket.priority}")
+            self.metrics.observe(
+                f"admission.wait_ms.{ticket.priority}", (now - ticket.arrived) * 1000
+            )
+            ticket.future.set_result(None)
+
+    def _late(self, ticket: _Ticket, now: float) -> bool:
+        """Whether a ticket would miss its deadline if admitted now."""
+        return ticket.deadline is not None and now + self._service_time > ticket.deadline
+
+    def _patience(self, ticket: _Ticket) -> Optional[float]:
+        """Seconds to wait before the ticket's deadline can't be met."""
+        if ticket.deadline is None:
+            return None
+        with self._lock:
+            service = self._service_time
+        return max(ticket.deadline - service - time.monotonic(), 0.0)
+
+    def _expire(self, ticket: _Ticket) -> None:
+        """Shed a ticket whose wait ran out, unless it was admitted meanwhile."""
+        with self._lock:
+            if ticket in self._queue:
+                self._remove(ticket)
+                self._shed(ticket, "deadline")
+                self._publish()
+
+    def _abandon(self, ticket: _Ticket) -> None:
+        """Withdraw a cancelled caller's ticket, freeing its slot if granted."""
+        with self._lock:
+            if ticket in self._queue:
+                self._remove(ticket)
+                ticket.future.cancel()
+                self._publish()
+                return
+        if ticket.granted is not None:
+            self.release(ticket)
+
+    def _remove(self, ticket: _Ticket) -> None:
+        """Take a ticket out of the queue. Caller holds the lock."""
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+
+    def _shed(self, ticket: _Ticket, reason: str) -> None:
+        """Fail a ticket with an overload error. Caller holds the lock."""
+        logger.warning(f"Shedding {ticket.priority} request: {reason}")
+        self.metrics.increment(f"admission.shed.{ticket.priority}")
+        ticket.future.set_exception(OverloadedError(ticket.priority, reason))
+
+    def _publish(self) -> None:
+        """Update the queue and in-flight gauges. Caller holds the lock."""
+        self.metrics.set("admission.queue_depth", len(self._queue))
+        self.metrics.set("admission.in_flight", sum(self._running.values()))
+        for name in self.classes:
+            self.metrics.set(
+                f"admission.queue_depth.{name}",
+                sum(1 for t in self._queue if t.priority == name),
+            )
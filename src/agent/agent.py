@@ -1,19 +1,40 @@
 """Generic RAG Agent with configurable prompts."""
 
+import asyncio
+import dataclasses
 import logging
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 
 from langchain.chains.retrieval import create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 
+from src.agent.admission import AdmissionController, OverloadedError, PriorityClass
 from src.agent.config_loader import AgentConfig
-from src.domain.models import AgentResponse
+from src.agent.fast_path import FastPathDecision, KNNFastPath
+from src.agent.grouping import MultiItemPrompt, union_documents
+from src.agent.metrics import AgentMetrics
+from src.agent.output import StructuredOutput
+from src.agent.prompts import PromptLayout
+from src.agent.single_flight import SingleFlight, fingerprint, normalize_input
+from src.diagnostics.profiling import ProfilingCallbackHandler, StageProfiler, profiler
+from src.domain.models import AgentResponse, StructuredResult
 from src.repositories.base import VectorStoreRepository
+from src.repositories.retriever import AdaptiveRetriever
+from src.repositories.snapshots import SnapshotStore
 from src.llm.base import LLMProvider
 
 logger = logging.getLogger(__name__)
 
+# Fast-path decision and retrieved chunks computed for an input ahead of answering it
+Prepared = Tuple[Optional[FastPathDecision], Optional[List[Document]]]
+
+# Chain and snapshot version held by _pin_chain() across several requests
+Pinned = Tuple[Any, Optional[str]]
+
 
 class RAGAgent:
     """Generic RAG agent with configurable behavior."""
@@ -23,6 +44,10 @@ class RAGAgent:
         config: AgentConfig,
         repository: VectorStoreRepository,
         llm_provider: LLMProvider,
+        snapshots: Optional[SnapshotStore] = None,
+        snapshot_version: Optional[str] = None,
+        repository_loader: Optional[Callable[[str], VectorStoreRepository]] = None,
+        fast_path: Optional[KNNFastPath] = None,
     ):
         """
         Initialize the RAG agent with injected dependencies.
@@ -31,65 +56,788 @@ class RAGAgent:
             config: Agent configuration from YAML.
             repository: Vector store repository for retrieval.
             llm_provider: LLM provider for generation.
+            snapshots: Snapshot store to watch for new index versions.
+            snapshot_version: Snapshot version the repository was opened from.
+            repository_loader: Opens a repository for a snapshot directory.
+                Required for hot reload.
+            fast_path: kNN classifier that answers confident inputs
+                without calling the LLM.
         """
         self.config = config
         self.repository = repository
         self.llm_provider = llm_provider
+        self.fast_path = fast_path
+        self.metrics = AgentMetrics()
+        self.admission = (
+            AdmissionController(
+                config.admission_max_concurrency or config.max_concurrency,
+                [
+                    PriorityClass.from_dict(name, data)
+                    for name, data in config.admission_classes.items()
+                ],
+                max_queue=config.admission_max_queue,
+                metrics=self.metrics,
+            )
+            if config.admission_enabled
+            else None
+        )
+        self.output = (
+            StructuredOutput(
+                config.output_mode,
+                config.output_labels,
+                max_tokens=config.output_max_tokens,
+                stop=config.output_stop,
+            )
+            if config.output_mode != "text"
+            else None
+        )
+        self.layout = PromptLayout(
+            config.system_prompt,
+            config.human_prompt,
+            layout=config.prompt_layout,
+            context_template=config.context_template,
+        )
+        self._group_prompt = MultiItemPrompt(self.layout, self.output)
+        self._single_flight = SingleFlight() if config.single_flight else None
+        self._fingerprint = fingerprint(
+            config.system_prompt,
+            config.human_prompt,
+            config.model_provider,
+            config.model_name,
+            config.temperature,
+            config.retriever_k,
+            config.output_mode,
+            config.prompt_layout,
+            config.retrieval_mode,
+            config.min_k,
+            config.max_k,
+            config.score_threshold,
+            config.score_drop,
+        )
         self._setup_chain()
 
+        self._snapshots = snapshots
+        self._snapshot_version = snapshot_version
+        self._repository_loader = repository_loader
+        self._swap_lock = threading.Lock()
+        self._inflight = {snapshot_version: 0}
+        self._repositories = {snapshot_version: repository}
+        self._retired: Set[Optional[str]] = set()
+        self._reload_stop = threading.Event()
+        self._reload_thread: Optional[threading.Thread] = None
+        # Passed to every chain and model call, e.g. profiling callbacks
+        self._run_config: Optional[Dict[str, Any]] = None
+
+        if snapshots is not None and snapshot_version is not None:
+            snapshots.acquire(snapshot_version)
+
         logger.info(f"Initialized agent: {config.name}")
 
     def _setup_chain(self) -> None:
         """Set up the RAG chain using configured prompts."""
+        self._answer_chain = self._build_answer_chain()
+        self.rag_chain = self._build_chain(self.repository)
+
+    def _build_chain(self, repository: VectorStoreRepository) -> Any:
+        """Build a retrieval chain over the given repository."""
+        return create_retrieval_chain(self._retriever(repository), self._answer_chain)
+
+    def _build_answer_chain(self) -> Any:
+        """Build the chain that answers an input from already retrieved chunks."""
+        human_prompt = self.layout.human_template
+        if self.output is not None:
+            # Braces in the JSON example must not be read as template variables
+            instructions = self.output.instructions().replace("{", "{{").replace("}", "}}")
+            human_prompt = f"{human_prompt.rstrip()}\n\n{instructions}"
         prompt = ChatPromptTemplate.from_messages([
-            ("system", self.config.system_prompt),
-            ("human", self.config.human_prompt),
+            ("system", self.layout.system_template),
+            ("human", human_prompt),
         ])
 
-        retriever = self.repository.as_retriever(k=self.config.retriever_k)
         llm = self.llm_provider.get_llm()
+        if self.output is not None:
+            # JSON-schema format, token cap and stop sequences for Ollama
+            llm = llm.bind(**self.output.bind_kwargs())
+
+        return create_stuff_documents_chain(llm, prompt)
+
+    def _retriever(self, repository: VectorStoreRepository) -> Any:
+        """Get a fixed-k or score-adaptive retriever over a repository."""
+        if self.config.retrieval_mode == "adaptive":
+            return AdaptiveRetriever(
+                repository=repository,
+                min_k=self.config.min_k,
+                max_k=self.config.max_k,
+                score_threshold=self.config.score_threshold,
+                score_drop=self.config.score_drop,
+            )
+        if self.config.retrieval_mode != "fixed":
+            raise ValueError(f"Unsupported retrieval mode: {self.config.retrieval_mode}")
+        return repository.as_retriever(k=self.config.retriever_k)
+
+    @property
+    def snapshot_version(self) -> Optional[str]:
+        """Get the index snapshot version currently being served."""
+        return self._snapshot_version
+
+    def reload_if_changed(self) -> bool:
+        """
+        Swap to the published index snapshot if it has changed.
+
+        Requests already in flight finish against the index they started
+        with; the old snapshot's lease is released once they drain.
+
+        Returns:
+            True if a new snapshot was loaded.
+        """
+        if self._snapshots is None or self._repository_loader is None:
+            return False
+
+        version = self._snapshots.current_version()
+        if version is None or version == self._snapshot_version:
+            return False
+
+        logger.info(f"Loading index snapshot: {version}")
+        self._snapshots.acquire(version)
+        try:
+            repository = self._repository_loader(str(self._snapshots.path_for(version)))
+            if not repository.load():
+                raise RuntimeError(f"Snapshot {version} has no vector store")
+            chain = self._build_chain(repository)
+        except Exception:
+            self._snapshots.release(version)
+            raise
+
+        with self._swap_lock:
+            old_version = self._snapshot_version
+            self.repository = repository
+            self.rag_chain = chain
+            self._snapshot_version = version
+            self._inflight.setdefault(version, 0)
+            self._repositories[version] = repository
+            self._retired.add(old_version)
+            drained = self._inflight.get(old_version, 0) == 0
+
+        if drained:
+            self._retire(old_version)
+
+        logger.info(f"Now serving index snapshot: {version}")
+        return True
+
+    def start_hot_reload(self, interval: Optional[float] = None) -> None:
+        """
+        Poll the snapshot store in a background thread.
+
+        Args:
+            interval: Seconds between checks (default: config.reload_interval).
+        """
+        interval = interval or self.config.reload_interval
+        if self._snapshots is None or not interval or self._reload_thread is not None:
+            return
+
+        def poll() -> None:
+            while not self._reload_stop.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    logger.error(f"Hot reload failed: {e}")
+
+        self._reload_stop.clear()
+        self._reload_thread = threading.Thread(
+            target=poll, name="index-hot-reload", daemon=True
+        )
+        self._reload_thread.start()
+        logger.info(f"Watching for new index snapshots every {interval}s")
+
+    def stop_hot_reload(self) -> None:
+        """Stop the background snapshot poller."""
+        if self._reload_thread is None:
+            return
+        self._reload_stop.set()
+        self._reload_thread.join()
+        self._reload_thread = None
+
+    def close(self) -> None:
+        """Stop hot reload and release the served snapshot."""
+        self.stop_hot_reload()
+        with self._swap_lock:
+            version = self._snapshot_version
+            self._retired.add(version)
+            drained = self._inflight.get(version, 0) == 0
+        if drained:
+            self._retire(version)
+
+    def start_profiling(self, interval: Optional[float] = None) -> StageProfiler:
+        """
+        Profile this agent's retrieval and LLM calls by stage.
 
-        question_answer_chain = create_stuff_documents_chain(llm, prompt)
-        self.rag_chain = create_retrieval_chain(retriever, question_answer_chain)
+        Starts the process-wide sampling profiler, so ingest stages run
+        meanwhile (loader, chunker, embedding, repository) are sampled too.
 
-    def run(self, input_text: str) -> AgentResponse:
+        Args:
+            interval: Seconds between samples (default: the profiler's).
+
+        Returns:
+            The profiler; write() its collapsed stacks and summary.
+        """
+        profiler.start(interval)
+        self._run_config = {"callbacks": [ProfilingCallbackHandler(profiler)]}
+        return profiler
+
+    def stop_profiling(self) -> None:
+        """Stop profiling; the samples taken stay on the profiler."""
+        self._run_config = None
+        profiler.stop()
+
+    def _pin_chain(self) -> Tuple[Any, Optional[str]]:
+        """Get the current chain and mark a request in flight on its snapshot."""
+        with self._swap_lock:
+            version = self._snapshot_version
+            self._inflight[version] = self._inflight.get(version, 0) + 1
+            return self.rag_chain, version
+
+    def _unpin_chain(self, version: Optional[str]) -> None:
+        """Mark a request finished and retire its snapshot if it was replaced."""
+        with self._swap_lock:
+            self._inflight[version] -= 1
+            drained = version in self._retired and self._inflight[version] == 0
+        if drained:
+            self._retire(version)
+
+    def _retire(self, version: Optional[str]) -> None:
+        """Release a replaced snapshot and collect unreferenced ones."""
+        with self._swap_lock:
+            self._retired.discard(version)
+            self._inflight.pop(version, None)
+            repository = self._repositories.pop(version, None)
+        if repository is not None:
+            repository.close()
+        if self._snapshots is None or version is None:
+            return
+        self._snapshots.release(version)
+        self._snapshots.gc()
+
+    def run(self, input_text: str, priority: str = "interactive") -> AgentResponse:
         """
         Run the agent on a single input.
 
+        Concurrent calls with the same (normalized) input and priority share
+        one computation when runtime.single_flight is enabled.
+
         Args:
             input_text: The input text to process.
+            priority: Admission class of the request, when admission
+                control is enabled.
+
+        Returns:
+            AgentResponse with the result; overloaded is set if the request
+            was shed.
+        """
+        self.metrics.increment("requests")
+        return self._run_coalesced(input_text, priority)
+
+    def _run_coalesced(
+        self,
+        input_text: str,
+        priority: str,
+        prepared: Optional[Prepared] = None,
+        pinned: Optional[Pinned] = None,
+    ) -> AgentResponse:
+        """Run one input, sharing the computation with identical in-flight calls."""
+        if self._single_flight is None:
+            return self._run(input_text, priority, prepared, pinned)
+        response, shared = self._single_flight.do(
+            self._flight_key(input_text, priority, pinned),
+            lambda: self._run(input_text, priority, prepared, pinned),
+        )
+        return self._coalesced(input_text, response) if shared else response
+
+    async def arun(self, input_text: str, priority: str = "interactive") -> AgentResponse:
+        """
+        Run the agent on a single input without blocking the event loop.
+
+        Coalesces with identical in-flight run() and arun() calls like run().
+
+        Args:
+            input_text: The input text to process.
+            priority: Admission class of the request.
 
         Returns:
             AgentResponse with the result.
         """
+        self.metrics.increment("requests")
+        if self._single_flight is None:
+            return await self._arun(input_text, priority)
+        response, shared = await self._single_flight.ado(
+            self._flight_key(input_text, priority), lambda: self._arun(input_text, priority)
+        )
+        return self._coalesced(input_text, response) if shared else response
+
+    def _run(
+        self,
+        input_text: str,
+        priority: str = "interactive",
+        prepared: Optional[Prepared] = None,
+        pinned: Optional[Pinned] = None,
+    ) -> AgentResponse:
+        """Run the fast path or the chain for one input."""
         logger.info(f"Processing input: {input_text[:50]}...")
+        decision, documents = prepared or (self._classify(input_text), None)
+        if decision is not None and decision.confident and not decision.audit:
+            return self._fast_response(input_text, decision)
+        return self._run_chain(input_text, decision, priority, documents, pinned)
+
+    def _run_chain(
+        self,
+        input_text: str,
+        decision: Optional[FastPathDecision],
+        priority: str = "interactive",
+        documents: Optional[List[Document]] = None,
+        pinned: Optional[Pinned] = None,
+    ) -> AgentResponse:
+        """
+        Run the RAG chain for one input the fast path didn't answer.
+
+        Chunks already retrieved for the input are answered from directly
+        instead of being retrieved again. A chain pinned by the caller is
+        used as is; otherwise the current one is pinned for the call.
+        """
+        try:
+            ticket = self._admit(priority)
+        except OverloadedError as e:
+            return self._overloaded_response(input_text, e)
+
+        chain, version = pinned or self._pin_chain()
+        try:
+            if documents is None:
+                result = chain.invoke({"input": input_text}, config=self._run_config)
+            else:
+                answer = self._answer_chain.invoke(
+                    {"input": input_text, "context": documents}, config=self._run_config
+                )
+                result = {"answer": answer, "context": documents}
+            response = self._to_response(input_text, result)
+            self._observe(decision, response)
+            return response
+        except Exception as e:
+            return self._error_response(input_text, e)
+        finally:
+            if pinned is None:
+                self._unpin_chain(version)
+            self._release(ticket)
+
+    async def _arun(self, input_text: str, priority: str = "interactive") -> AgentResponse:
+        """Async version of _run()."""
+        logger.info(f"Processing input: {input_text[:50]}...")
+        decision = await asyncio.to_thread(self._classify, input_text)
+        if decision is not None and decision.confident and not decision.audit:
+            return self._fast_response(input_text, decision)
+
         try:
-            response = self.rag_chain.invoke({"input": input_text})
-            return AgentResponse(
-                input=input_text,
-                output=response["answer"],
-                source_documents=len(response.get("context", [])),
+            ticket = await self._aadmit(priority)
+        except OverloadedError as e:
+            return self._overloaded_response(input_text, e)
+
+        chain, version = self._pin_chain()
+        try:
+            response = self._to_response(
+                input_text, await chain.ainvoke({"input": input_text}, config=self._run_config)
             )
+            self._observe(decision, response)
+            return response
         except Exception as e:
-            logger.error(f"Error processing input: {e}")
-            return AgentResponse(
-                input=input_text,
-                output="",
-                source_documents=0,
-                error=str(e),
+            return self._error_response(input_text, e)
+        finally:
+            self._unpin_chain(version)
+            self._release(ticket)
+
+    def _admit(self, priority: str) -> Any:
+        """Wait for a generation slot when admission control is enabled."""
+        return self.admission.acquire(priority) if self.admission is not None else None
+
+    async def _aadmit(self, priority: str) -> Any:
+        """Async version of _admit()."""
+        return await self.admission.aacquire(priority) if self.admission is not None else None
+
+    def _release(self, ticket: Any) -> None:
+        """Give back a slot taken by _admit()."""
+        if ticket is not None:
+            self.admission.release(ticket)
+
+    def _flight_key(
+        self,
+        input_text: str,
+        priority: str,
+        pinned: Optional[Pinned] = None,
+    ) -> str:
+        """
+        Coalescing key: normalized input, config, index version (the pinned
+        one, else the one served) and admission class, so a request never
+        waits in (or is shed from) another class's queue.
+        """
+        version = pinned[1] if pinned is not None else self._snapshot_version
+        return (
+            f"{self._fingerprint}:{version}:{priority}:"
+            f"{normalize_input(input_text)}"
+        )
+
+    def _coalesced(self, input_text: str, response: AgentResponse) -> AgentResponse:
+        """Count a coalesced call and return the shared response as its own."""
+        self.metrics.increment("coalesced")
+        return dataclasses.replace(response, input=input_text)
+
+    async def abatch(
+        self,
+        inputs: List[str],
+        max_concurrency: Optional[int] = None,
+        priority: str = "batch",
+    ) -> List[AgentResponse]:
+        """
+        Run the agent on multiple inputs concurrently.
+
+        Args:
+            inputs: List of input texts to process.
+            max_concurrency: Maximum requests in flight
+                (default: config.max_concurrency).
+            priority: Admission class of the requests.
+
+        Returns:
+            List of AgentResponse objects, in input order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.config.max_concurrency)
+
+        async def run_one(input_text: str) -> AgentResponse:
+            async with semaphore:
+                return await self.arun(input_text, priority)
+
+        return await asyncio.gather(*(run_one(text) for text in inputs))
+
+    async def astream(self, input_text: str, priority: str = "interactive") -> AsyncIterator[str]:
+        """
+        Stream the answer for a single input as it is generated.
+
+        Args:
+            input_text: The input text to process.
+            priority: Admission class of the request.
+
+        Yields:
+            Pieces of the answer text.
+
+        Raises:
+            OverloadedError: If admission control shed the request.
+        """
+        logger.info(f"Streaming input: {input_text[:50]}...")
+        decision = await asyncio.to_thread(self._classify, input_text)
+        if decision is not None and decision.confident and not decision.audit:
+            yield self._fast_response(input_text, decision).output
+            return
+
+        ticket = await self._aadmit(priority)
+        chain, version = self._pin_chain()
+        answer = []
+        try:
+            async for part in chain.astream({"input": input_text}, config=self._run_config):
+                if part.get("answer"):
+                    answer.append(part["answer"])
+                    yield part["answer"]
+            self._observe(decision, self._to_response(input_text, {"answer": "".join(answer)}))
+        finally:
+            self._unpin_chain(version)
+            self._release(ticket)
+
+    def _classify(self, input_text: str) -> Optional[FastPathDecision]:
+        """Run the fast-path vote; failures fall back to the full chain."""
+        if self.fast_path is None:
+            return None
+        try:
+            return self.fast_path.classify(input_text)
+        except Exception as e:
+            logger.warning(f"Fast path failed, using the full chain: {e}")
+            return None
+
+    def _observe(self, decision: Optional[FastPathDecision], response: AgentResponse) -> None:
+        """Let the fast path learn from (and audit against) the LLM's answer."""
+        if decision is None:
+            return
+        try:
+            self.fast_path.observe(
+                response.input,
+                decision,
+                response.output,
+                llm_label=response.result.level if response.result else None,
             )
+        except Exception as e:
+            logger.warning(f"Fast path failed to record answer: {e}")
+
+    def _fast_response(self, input_text: str, decision: FastPathDecision) -> AgentResponse:
+        """Build an AgentResponse answered by the fast path."""
+        logger.info(f"Fast path: {decision.label} (confidence {decision.confidence:.2f})")
+        result = StructuredResult(level=decision.label, confidence=decision.confidence)
+        return AgentResponse(
+            input=input_text,
+            output=(
+                self.output.render(result) if self.output is not None
+                else self.fast_path.answer(decision)
+            ),
+            source_documents=0,
+            fast_path=True,
+            result=result,
+        )
+
+    def _to_response(self, input_text: str, response: dict) -> AgentResponse:
+        """Convert a chain result into an AgentResponse."""
+        context = response.get("context", [])
+        return AgentResponse(
+            input=input_text,
+            output=response["answer"],
+            source_documents=len(context),
+            context_chars=sum(len(doc.page_content) for doc in context),
+            result=self.output.parse(response["answer"]) if self.output is not None else None,
+        )
+
+    def _overloaded_response(self, input_text: str, error: OverloadedError) -> AgentResponse:
+        """Build an AgentResponse for a request shed by admission control."""
+        return AgentResponse(
+            input=input_text,
+            output="",
+            source_documents=0,
+            error=str(error),
+            overloaded=True,
+        )
 
-    def run_batch(self, inputs: List[str]) -> List[AgentResponse]:
+    def _error_response(self, input_text: str, error: Exception) -> AgentResponse:
+        """Build an AgentResponse for a failed request."""
+        logger.error(f"Error processing input: {error}")
+        return AgentResponse(
+            input=input_text,
+            output="",
+            source_documents=0,
+            error=str(error),
+        )
+
+    def run_batch(
+        self,
+        inputs: List[str],
+        max_concurrency: Optional[int] = None,
+        group_size: Optional[int] = None,
+        priority: str = "batch",
+    ) -> List[AgentResponse]:
         """
-        Run the agent on multiple inputs.
+        Run the agent on multiple inputs using a thread pool.
+
+        With a group size above 1, consecutive inputs are answered N at a
+        time by a single LLM call over the union of their retrieved chunks.
+        In the prefix prompt layout, inputs with identical retrieved context
+        are processed consecutively so Ollama can reuse their prompt prefix.
+        The whole batch is answered from the index snapshot served when it
+        started, even if a new one is hot-reloaded meanwhile.
 
         Args:
             inputs: List of input texts to process.
+            max_concurrency: Maximum requests (or groups) in flight
+                (default: config.max_concurrency).
+            group_size: Inputs per LLM call (default: config.group_size).
+            priority: Admission class of the requests.
 
         Returns:
-            List of AgentResponse objects.
+            List of AgentResponse objects, in input order.
+        """
+        # Every item is retrieved for and answered from this one snapshot
+        pinned = self._pin_chain()
+        try:
+            order = list(range(len(inputs)))
+            prepared: List[Optional[Prepared]] = [None] * len(inputs)
+            if self.layout.layout == "prefix" and len(inputs) > 1:
+                order, prepared = self._order_by_context(inputs, pinned, max_concurrency)
+            ordered = [(inputs[i], prepared[i]) for i in order]
+
+            group_size = group_size or self.config.group_size
+            if group_size <= 1:
+
+                def run_one(item: Tuple[str, Optional[Prepared]]) -> AgentResponse:
+                    self.metrics.increment("requests")
+                    return self._run_coalesced(item[0], priority, item[1], pinned)
+
+                responses = self._map(run_one, ordered, max_concurrency)
+            else:
+                groups = [ordered[i:i + group_size] for i in range(0, len(ordered), group_size)]
+                responses = [
+                    response
+                    for group in self._map(
+                        lambda group: self._run_group(
+                            [text for text, _ in group],
+                            pinned,
+                            priority,
+                            [item for _, item in group],
+                        ),
+                        groups,
+                        max_concurrency,
+                    )
+                    for response in group
+                ]
+        finally:
+            self._unpin_chain(pinned[1])
+
+        results: List[Optional[AgentResponse]] = [None] * len(inputs)
+        for position, index in enumerate(order):
+            results[index] = responses[position]
+        return results
+
+    def _order_by_context(
+        self,
+        inputs: List[str],
+        pinned: Pinned,
+        max_concurrency: Optional[int] = None,
+    ) -> Tuple[List[int], List[Optional[Prepared]]]:
         """
-        return [self.run(input_text) for input_text in inputs]
+        Order inputs so that those with identical retrieved context are adjacent.
+
+        Inputs are classified and retrieved for concurrently from the pinned
+        snapshot; those the fast path answers are not retrieved for and go
+        first.
+
+        Returns:
+            Input indices in processing order (stable within a context), and
+            each input's fast-path decision and retrieved chunks, to be
+            answered from without classifying or retrieving again.
+        """
+        retriever = self._pinned_retriever(pinned)
+
+        def prepare(input_text: str) -> Prepared:
+            decision = self._classify(input_text)
+            if decision is not None and decision.confident and not decision.audit:
+                return decision, None
+            try:
+                return decision, retriever.invoke(input_text, config=self._run_config)
+            except Exception as e:
+                logger.warning(f"Could not retrieve context ahead of the batch: {e}")
+                return decision, None
+
+        prepared = self._map(prepare, inputs, max_concurrency)
+
+        first_seen: Dict[Tuple, int] = {}
+        signatures = []
+        for _, documents in prepared:
+            if documents is None:
+                signatures.append(-1)
+                continue
+            signature = tuple(doc.id or doc.page_content for doc in documents)
+            signatures.append(first_seen.setdefault(signature, len(first_seen)))
+        order = sorted(range(len(inputs)), key=lambda i: signatures[i])
+        return order, prepared
+
+    def _pinned_retriever(self, pinned: Pinned) -> Any:
+        """Get a retriever over the repository of a pinned snapshot."""
+        with self._swap_lock:
+            repository = self._repositories[pinned[1]]
+        return self._retriever(repository)
+
+    def _map(
+        self,
+        fn: Callable[[Any], Any],
+        items: List[Any],
+        max_concurrency: Optional[int],
+    ) -> List[Any]:
+        """Apply fn to items on a bounded thread pool, keeping their order."""
+        workers = max(1, min(max_concurrency or self.config.max_concurrency, len(items)))
+        if workers == 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-batch") as pool:
+            return list(pool.map(fn, items))
+
+    def _run_group(
+        self,
+        inputs: List[str],
+        pinned: Pinned,
+        priority: str = "batch",
+        prepared: Optional[List[Optional[Prepared]]] = None,
+    ) -> List[AgentResponse]:
+        """
+        Answer a group of inputs with one LLM call over a pinned snapshot.
+
+        Inputs the fast path answers are left out of the group. Prepared
+        inputs reuse their decision and chunks instead of classifying and
+        retrieving again; the others are retrieved for concurrently before
+        a generation slot is taken. If the call fails or its answer can't
+        be split into one valid answer per input, the affected inputs are
+        retried with single-item calls over the chunks already retrieved.
+        If admission control sheds the group, its inputs are answered as
+        overloaded.
+        """
+        self.metrics.increment("requests", len(inputs))
+        responses: Dict[int, AgentResponse] = {}
+        pending = []
+        for i, input_text in enumerate(inputs):
+            item = prepared[i] if prepared is not None else None
+            decision, retrieved = item or (self._classify(input_text), None)
+            if decision is not None and decision.confident and not decision.audit:
+                responses[i] = self._fast_response(input_text, decision)
+            else:
+                pending.append((i, input_text, decision, retrieved))
+
+        answers: Optional[List[str]] = None
+        contexts: List[Optional[List[Document]]] = []
+        documents: List[Document] = []
+        if len(pending) > 1:
+            texts = [input_text for _, input_text, _, _ in pending]
+            logger.info(f"Processing group of {len(texts)} inputs in one call")
+            ticket = None
+            try:
+                retriever = self._pinned_retriever(pinned)
+                # Retrieve concurrently before taking a generation slot, so the
+                # slot is only held for the LLM call
+                contexts = [retrieved for _, _, _, retrieved in pending]
+                missing = [n for n, docs in enumerate(contexts) if docs is None]
+                for n, docs in zip(missing, self._map(
+                    lambda n: retriever.invoke(pending[n][1], config=self._run_config),
+                    missing,
+                    None,
+                )):
+                    contexts[n] = docs
+                documents = union_documents(contexts)
+                ticket = self._admit(priority)
+
+                llm = self.llm_provider.get_llm()
+                kwargs = self._group_prompt.bind_kwargs(len(texts))
+                if kwargs:
+                    llm = llm.bind(**kwargs)
+                message = llm.invoke(
+                    self._group_prompt.messages(texts, documents), config=self._run_config
+                )
+                answers = self._group_prompt.split(message.content, len(texts))
+                self.metrics.increment("grouped_calls")
+            except OverloadedError as e:
+                for i, input_text, _, _ in pending:
+                    responses[i] = self._overloaded_response(input_text, e)
+                return [responses[i] for i in range(len(inputs))]
+            except Exception as e:
+                logger.warning(f"Group of {len(texts)} failed, using single calls: {e}")
+                self.metrics.increment("group_fallbacks")
+            finally:
+                self._release(ticket)
+
+        for n, (i, input_text, decision, retrieved) in enumerate(pending):
+            response = None
+            if answers is not None:
+                # Each item reports its own chunks; the shared prompt's size separately
+                response = self._to_response(
+                    input_text, {"answer": answers[n], "context": contexts[n]}
+                )
+                response.group_context_chars = sum(len(doc.page_content) for doc in documents)
+                if self.output is not None and response.result is None:
+                    # Malformed item: answer it on its own
+                    self.metrics.increment("group_fallbacks")
+                    response = None
+                else:
+                    self.metrics.increment("grouped_items")
+                    self._observe(decision, response)
+            if response is None:
+                # Reuse the chunks the group already retrieved
+                context = contexts[n] if contexts else retrieved
+                response = self._run_chain(input_text, decision, priority, context, pinned)
+            responses[i] = response
+
+        return [responses[i] for i in range(len(inputs))]
 
     def run_test_cases(self) -> List[AgentResponse]:
         """
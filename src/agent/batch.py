@@ -0,0 +1,368 @@
+"""Resumable batch jobs: stream inputs through an agent into a JSONL file."""
+
+import dataclasses
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, TextIO, Tuple
+
+from src.agent.agent import RAGAgent
+from src.domain.models import AgentResponse
+
+logger = logging.getLogger(__name__)
+
+
+class BatchCheckpoint:
+    """
+    Progress of a batch job, persisted next to its output file.
+
+    Items are identified by their line number in the input. The checkpoint
+    keeps a low-water mark (every line below it is done), the finished lines
+    above it, and the output size at the moment it was written. On resume
+    the output is truncated to that size, so results appended after the last
+    checkpoint are dropped and recomputed instead of being duplicated. An
+    output without a valid checkpoint has its progress rebuilt from the
+    results already in it.
+
+    Blank lines count as done, and items shed by admission control go to a
+    small retry set instead of leaving holes, so the low-water mark keeps
+    advancing and the checkpoint stays small however long the input is.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize the checkpoint, reading it from disk if it exists.
+
+        Args:
+            path: Checkpoint file.
+        """
+        self.path = path
+        self.next_line = 0
+        self.done: Set[int] = set()
+        self.retry: Set[int] = set()
+        self.blank = 0
+        self.output_bytes = 0
+        self.loaded = False
+        if path.exists():
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                self.next_line = data["next_line"]
+                self.done = set(data["done"])
+                self.output_bytes = data["output_bytes"]
+                self.retry = set(data.get("retry", []))
+                self.blank = data.get("blank", 0)
+                self.loaded = True
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+
+    @property
+    def completed(self) -> int:
+        """Number of finished items."""
+        return self.next_line + len(self.done) - len(self.retry) - self.blank
+
+    def is_done(self, line: int) -> bool:
+        """Check if an input line was already processed."""
+        return line not in self.retry and (line < self.next_line or line in self.done)
+
+    def mark(self, line: int, output_bytes: int) -> None:
+        """Record a finished line and the output size after its result."""
+        self.retry.discard(line)
+        self._advance(line)
+        self.output_bytes = output_bytes
+
+    def mark_blank(self, line: int) -> None:
+        """Record a blank input line, which has no result."""
+        if not self.is_done(line):
+            self.blank += 1
+            self._advance(line)
+
+    def mark_retry(self, line: int) -> None:
+        """Record a line that was shed and must be retried on resume."""
+        self.retry.add(line)
+        self._advance(line)
+
+    def _advance(self, line: int) -> None:
+        """Add a line to the done set and move the low-water mark past it."""
+        if line < self.next_line:
+            return
+        self.done.add(line)
+        while self.next_line in self.done:
+            self.done.remove(self.next_line)
+            self.next_line += 1
+
+    def rebuild(self, output_path: Path) -> None:
+        """
+        Recover progress from the results already written to an output file.
+
+        Complete records are kept up to the first partial or unreadable
+        line; anything after it is dropped on resume and recomputed.
+
+        Args:
+            output_path: JSONL output of the job.
+        """
+        self.next_line = 0
+        self.done = set()
+        self.retry = set()
+        self.blank = 0
+        self.output_bytes = 0
+        if not output_path.exists():
+            return
+        offset = 0
+        with open(output_path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(raw)
+                    line = record["line"]
+                except (ValueError, KeyError, TypeError):
+                    break
+                if not isinstance(line, int):
+                    break
+                offset += len(raw)
+                if record.get("overloaded"):
+                    # Shed items were never answered; redo them
+                    self.mark_retry(line)
+                    self.output_bytes = offset
+                    continue
+                self.mark(line, offset)
+        logger.info(f"Rebuilt checkpoint from {output_path}: {self.completed} items done")
+
+    def save(self) -> None:
+        """Write the checkpoint atomically."""
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "next_line": self.next_line,
+                    "done": sorted(self.done),
+                    "retry": sorted(self.retry),
+                    "blank": self.blank,
+                    "output_bytes": self.output_bytes,
+                },
+                f,
+            )
+        tmp_path.replace(self.path)
+
+
+class BatchJob:
+    """
+    Runs a stream of inputs through an agent with bounded concurrency.
+
+    Inputs are read lazily, one per line: plain text, or a JSON object with
+    an "input" field and an optional "id". At most `max_concurrency` items
+    are in flight, so memory stays flat however large the input is. Each
+    AgentResponse is appended to the output as a JSONL line as soon as it
+    completes (in completion order, tagged with its input line), and the
+    checkpoint is saved every `checkpoint_every` results and at the end. A
+    killed job started again with the same input and output resumes where
+    its checkpoint left off. Items still shed by admission control after
+    OVERLOAD_RETRIES are not written and are checkpointed for retry, so a
+    resumed job runs them again.
+    """
+
+    # Retries, with exponential backoff, of items shed by admission control
+    OVERLOAD_RETRIES = 5
+
+    def __init__(
+        self,
+        agent: RAGAgent,
+        output_path: str,
+        checkpoint_path: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        checkpoint_every: int = 100,
+        progress_interval: float = 10.0,
+    ):
+        """
+        Initialize the job.
+
+        Args:
+            agent: Agent to run the inputs through.
+            output_path: JSONL file that results are appended to.
+            checkpoint_path: Checkpoint file (default: <output>.ckpt).
+            max_concurrency: Items in flight (default: runtime.max_concurrency).
+            checkpoint_every: Results between checkpoint saves.
+            progress_interval: Seconds between progress lines.
+        """
+        self.agent = agent
+        self.output_path = Path(output_path)
+        self.checkpoint = BatchCheckpoint(
+            Path(checkpoint_path) if checkpoint_path else Path(f"{output_path}.ckpt")
+        )
+        self.max_concurrency = max_concurrency or agent.config.max_concurrency
+        self.checkpoint_every = checkpoint_every
+        self.progress_interval = progress_interval
+        self._lock = threading.Lock()
+
+    def run(self, input_path: str = "-") -> Dict[str, Any]:
+        """
+        Process every input that isn't done yet.
+
+        Args:
+            input_path: Input file, or "-" for stdin.
+
+        Returns:
+            Summary with the items processed, failed, shed (left for a
+            resume) and skipped, and the elapsed time.
+        """
+        total = None if input_path == "-" else _count_lines(input_path)
+        size = self.output_path.stat().st_size if self.output_path.exists() else 0
+        if (size and not self.checkpoint.loaded) or size < self.checkpoint.output_bytes:
+            # Truncating to an untrusted size would wipe or pad the results
+            logger.warning(f"No valid checkpoint for {self.output_path}, rebuilding it")
+            self.checkpoint.rebuild(self.output_path)
+        resumed = self.checkpoint.completed
+        if resumed:
+            logger.info(f"Resuming batch job: {resumed} items already done")
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, "a+b") as output:
+            # Drop results written after the last checkpoint; they are redone
+            output.truncate(self.checkpoint.output_bytes)
+            output.seek(0, 2)
+            stats = self._process(_read_inputs(input_path), output, total, resumed)
+            output.flush()
+            self.checkpoint.output_bytes = output.tell()
+        self.checkpoint.save()
+
+        self._report(stats, total, resumed, final=True)
+        return stats
+
+    def _process(
+        self,
+        inputs: Iterator[Tuple[int, Optional[str], Optional[str]]],
+        output: Any,
+        total: Optional[int],
+        resumed: int,
+    ) -> Dict[str, Any]:
+        """Keep up to max_concurrency items in flight until the input is drained."""
+        stats = {"processed": 0, "failed": 0, "shed": 0, "skipped": 0, "elapsed": 0.0}
+        start = time.perf_counter()
+        last_report = start
+        in_flight: Set[Future] = set()
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="agent-batch-job"
+        ) as pool:
+            for line, item_id, text in inputs:
+                if text is None:
+                    with self._lock:
+                        self.checkpoint.mark_blank(line)
+                    continue
+                if self.checkpoint.is_done(line):
+                    stats["skipped"] += 1
+                    continue
+                if len(in_flight) >= self.max_concurrency:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._collect(finished, output, stats)
+                in_flight.add(pool.submit(self._run_item, line, item_id, text))
+
+                now = time.perf_counter()
+                if now - last_report >= self.progress_interval:
+                    stats["elapsed"] = now - start
+                    self._report(stats, total, resumed)
+                    last_report = now
+
+            while in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                self._collect(finished, output, stats)
+
+        stats["elapsed"] = time.perf_counter() - start
+        return stats
+
+    def _run_item(self, line: int, item_id: Optional[str], text: str) -> Tuple[int, Dict[str, Any]]:
+        """Run one input and build its output record."""
+        try:
+            response = self.agent.run(text, priority="batch")
+            # Shed to make room for interactive traffic: back off and retry
+            for attempt in range(self.OVERLOAD_RETRIES):
+                if not response.overloaded:
+                    break
+                time.sleep(min(2 ** attempt, 30))
+                response = self.agent.run(text, priority="batch")
+        except Exception as e:
+            logger.error(f"Error processing line {line}: {e}")
+            response = AgentResponse(input=text, output="", source_documents=0, error=str(e))
+        record = {"line": line, "id": item_id, **dataclasses.asdict(response)}
+        return line, record
+
+    def _collect(self, finished: Set[Future], output: Any, stats: Dict[str, Any]) -> None:
+        """Append finished results and checkpoint them."""
+        with self._lock:
+            for future in finished:
+                line, record = future.result()
+                if record["overloaded"]:
+                    logger.warning(f"Line {line} still shed after retries; left for a resume")
+                    self.checkpoint.mark_retry(line)
+                    stats["shed"] += 1
+                    continue
+                output.write((json.dumps(record) + "\n").encode("utf-8"))
+                self.checkpoint.mark(line, output.tell())
+                stats["processed"] += 1
+                stats["failed"] += int(record["error"] is not None)
+                if stats["processed"] % self.checkpoint_every == 0:
+                    output.flush()
+                    self.checkpoint.save()
+
+    def _report(
+        self,
+        stats: Dict[str, Any],
+        total: Optional[int],
+        resumed: int,
+        final: bool = False,
+    ) -> None:
+        """Print throughput and, when the input size is known, the ETA."""
+        elapsed = stats["elapsed"]
+        rate = stats["processed"] / elapsed if elapsed > 0 else 0.0
+        done = resumed + stats["processed"]
+        message = (
+            f"{'Finished' if final else 'Progress'}: {done} done"
+            f"{f'/{total}' if total is not None else ''}, "
+            f"{stats['failed']} failed, {rate:.1f} items/s"
+        )
+        if stats["shed"]:
+            message += f", {stats['shed']} shed"
+        if total is not None and not final and rate > 0:
+            message += f", ETA {_format_duration((total - done) / rate)}"
+        print(message, file=sys.stderr, flush=True)
+
+
+def _read_inputs(input_path: str) -> Iterator[Tuple[int, Optional[str], Optional[str]]]:
+    """Yield (line number, id, input text) for each input line; text is None if blank."""
+    stream: TextIO = sys.stdin if input_path == "-" else open(input_path, "r")
+    try:
+        for line, raw in enumerate(stream):
+            raw = raw.strip()
+            if not raw:
+                yield line, None, None
+                continue
+            item_id = None
+            text = raw
+            if raw.startswith("{"):
+                try:
+                    data = json.loads(raw)
+                    text = data["input"]
+                    item_id = data.get("id")
+                except (ValueError, KeyError):
+                    pass
+            yield line, item_id, text
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _count_lines(input_path: str) -> int:
+    """Count non-empty lines in a file without loading it."""
+    with open(input_path, "r") as f:
+        return sum(1 for raw in f if raw.strip())
+
+
+def _format_duration(seconds: float) -> str:
+    """Format seconds as H:MM:SS."""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,189 @@
+"""Helpers for building indexes and wiring agents from configuration."""
+
+import logging
+from typing import List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from src.agent.agent import RAGAgent
+from src.agent.config_loader import AgentConfig
+from src.agent.fast_path import KNNFastPath
+from src.diagnostics.memory import tracker
+from src.ingest import IngestPipeline
+from src.llm.base import LLMProvider
+from src.repositories import (
+    CachedRepository,
+    RepositoryFactory,
+    RetrievalCache,
+    SnapshotStore,
+    VectorStoreRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_index(
+    config: AgentConfig,
+    repository: VectorStoreRepository,
+    persist_dir: str,
+) -> None:
+    """Load, chunk and save the context documents into a repository."""
+    logger.info("Building new vector database...")
+
+    # Parsed documents and chunks are reused from the artifact cache
+    IngestPipeline(config).build(repository, persist_dir)
+    logger.info("Vector database created successfully")
+
+
+def build_snapshot(
+    config: AgentConfig,
+    snapshots: SnapshotStore,
+    embeddings: Embeddings,
+) -> str:
+    """Build the index into a new snapshot and publish it."""
+    version, path = snapshots.new_build()
+    try:
+        repository = RepositoryFactory.create_from_agent_config(
+            config, embeddings, persist_dir=str(path)
+        )
+        try:
+            build_index(config, repository, str(path))
+        finally:
+            repository.close()
+        snapshots.publish(version)
+    finally:
+        snapshots.release(version)
+    snapshots.gc()
+    return version
+
+
+def open_repository(
+    config: AgentConfig,
+    embeddings: Embeddings,
+) -> Tuple[VectorStoreRepository, Optional[SnapshotStore], Optional[str]]:
+    """
+    Open the configured vector store, building it if it doesn't exist.
+
+    Args:
+        config: Agent configuration.
+        embeddings: Embedding function for the store.
+
+    Returns:
+        Tuple of (repository, snapshot_store, snapshot_version). The snapshot
+        values are None unless rag.snapshots is enabled.
+    """
+    pipeline = IngestPipeline(config)
+
+    if not config.use_snapshots:
+        # Create repository (Repository + Factory pattern)
+        repository = RepositoryFactory.create_from_agent_config(
+            config, embeddings, persist_dir=config.persist_dir
+        )
+
+        # Load the vector store, or (re)build it if its inputs changed
+        if not (pipeline.is_current(config.persist_dir) and repository.load()):
+            build_index(config, repository, config.persist_dir)
+        return repository, None, None
+
+    # Build into a new snapshot if the published one is missing or stale,
+    # then open the published version
+    snapshots = SnapshotStore(config.persist_dir)
+    version = snapshots.current_version()
+    if version is None or not pipeline.is_current(str(snapshots.path_for(version))):
+        build_snapshot(config, snapshots, embeddings)
+
+    version = snapshots.current_version()
+    repository = RepositoryFactory.create_from_agent_config(
+        config, embeddings, persist_dir=str(snapshots.path_for(version))
+    )
+    if not repository.load():
+        # The published snapshot is incomplete or unreadable by this store
+        logger.warning(f"Snapshot {version} could not be loaded; rebuilding")
+        repository.close()
+        version = build_snapshot(config, snapshots, embeddings)
+        repository = RepositoryFactory.create_from_agent_config(
+            config, embeddings, persist_dir=str(snapshots.path_for(version))
+        )
+        if not repository.load():
+            raise RuntimeError(f"Snapshot {version} could not be loaded after rebuilding")
+    return repository, snapshots, version
+
+
+def create_fast_path(config: AgentConfig, embeddings: Embeddings) -> Optional[KNNFastPath]:
+    """Create the kNN fast path if it is enabled in the config."""
+    if not config.fast_path_enabled:
+        return None
+    if not config.fast_path_labels:
+        raise ValueError("fast_path requires a list of labels")
+    return KNNFastPath(
+        embeddings,
+        labels=config.fast_path_labels,
+        examples=config.fast_path_examples,
+        k=config.fast_path_k,
+        threshold=config.fast_path_threshold,
+        min_similarity=config.fast_path_min_similarity,
+        learn=config.fast_path_learn,
+        audit_rate=config.fast_path_audit_rate,
+        answer_template=config.fast_path_template,
+        examples_file=config.fast_path_examples_file,
+        max_examples=config.fast_path_max_examples,
+    )
+
+
+def create_retrieval_cache(config: AgentConfig) -> Optional[RetrievalCache]:
+    """Create the retrieval cache if rag.retrieval_cache_size is set."""
+    if config.retrieval_cache_size <= 0:
+        return None
+    return RetrievalCache(config.retrieval_cache_size, hot_query_log=config.hot_query_log)
+
+
+def prewarm_queries(config: AgentConfig, cache: RetrievalCache) -> List[str]:
+    """Queries to prewarm: the test cases, then the hottest logged queries."""
+    if not config.prewarm:
+        return []
+    return list(dict.fromkeys(config.test_cases + cache.hot_queries(config.prewarm_size)))
+
+
+def create_agent(
+    config: AgentConfig,
+    embeddings: Embeddings,
+    llm_provider: LLMProvider,
+) -> RAGAgent:
+    """
+    Open the vector store and create an agent with injected dependencies.
+
+    Hot reload is started when snapshots and rag.reload_interval are set.
+    Retrieval goes through a cache (rag.retrieval_cache_size) that is
+    prewarmed whenever an index version is loaded. Memory is recorded
+    after ingest and after warmup when memory tracing is on.
+    """
+    repository, snapshots, version = open_repository(config, embeddings)
+    tracker.record(f"{config.name}: after ingest")
+
+    # Repositories of every index version share one retrieval cache
+    cache = create_retrieval_cache(config)
+    queries = prewarm_queries(config, cache) if cache is not None else []
+
+    def cached(repo: VectorStoreRepository) -> VectorStoreRepository:
+        if cache is None:
+            return repo
+        return CachedRepository(repo, cache, prewarm_queries=queries, prewarm_k=config.retriever_k)
+
+    repository = cached(repository)
+    if isinstance(repository, CachedRepository):
+        repository.prewarm()
+
+    agent = RAGAgent(
+        config=config,
+        repository=repository,
+        llm_provider=llm_provider,
+        snapshots=snapshots,
+        snapshot_version=version,
+        repository_loader=lambda path: cached(
+            RepositoryFactory.create_from_agent_config(config, embeddings, persist_dir=path)
+        ),
+        fast_path=create_fast_path(config, embeddings),
+    )
+    agent.start_hot_reload()
+    tracker.record(f"{config.name}: after warmup")
+    return agent
@@ -3,7 +3,7 @@
 import logging
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import yaml
 
@@ -42,6 +42,101 @@ class AgentConfig:
     # Test cases
     test_cases: List[str] = field(default_factory=list)
 
+    # Prompt layout
+    prompt_layout: str = "inline"
+    context_template: str = "Context:\n{context}"
+
+    # Index snapshots
+    use_snapshots: bool = False
+    reload_interval: float = 0.0
+
+    # Vector store layout
+    vector_store: str = "chroma"
+    num_shards: int = 4
+    batch_size: int = 256
+
+    # Compressed vectors (vector_store "compressed")
+    vector_reduction: str = "none"
+    reduced_dim: Optional[int] = None
+    vector_dtype: str = "float16"
+
+    # Ingest artifact cache
+    cache_dir: str = "./.rag_cache"
+
+    # Memory footprint (defaults are lowered by runtime.low_memory)
+    low_memory: bool = False
+    embedding_max_seq_length: Optional[int] = None
+    embedding_precision: str = "float32"
+    store_memory_limit_mb: Optional[int] = None
+
+    # Adaptive retrieval depth
+    retrieval_mode: str = "fixed"
+    min_k: int = 1
+    max_k: int = 6
+    score_threshold: Optional[float] = None
+    score_drop: Optional[float] = None
+
+    # Retrieval result cache
+    retrieval_cache_size: int = 1024
+    hot_query_log: Optional[str] = None
+    prewarm: bool = True
+    prewarm_size: int = 100
+
+    # Runtime settings
+    max_concurrency: int = 8
+    single_flight: bool = True
+    group_size: int = 1
+
+    # Admission control in front of generation
+    admission_enabled: bool = False
+    admission_max_concurrency: Optional[int] = None
+    admission_max_queue: int = 64
+    admission_classes: Dict[str, Dict[str, Any]] = field(
+        default_factory=lambda: {"interactive": {"timeout": 30.0}, "batch": {}}
+    )
+
+    # Ollama endpoints
+    model_base_url: str = "http://localhost:11434"
+    model_endpoints: List[Union[str, Dict[str, Any]]] = field(default_factory=list)
+    health_interval: float = 10.0
+    max_failures: int = 3
+
+    # Ollama generation and connection settings
+    request_timeout: Optional[float] = 120.0
+    keep_alive: Optional[str] = "30m"
+    num_ctx: Optional[int] = None
+    num_predict: Optional[int] = None
+    num_thread: Optional[int] = None
+    warmup: bool = True
+    hedge_percentile: Optional[float] = None
+    hedge_min_delay: float = 0.5
+    hedge_endpoints: List[str] = field(default_factory=list)
+
+    # Stub model for offline load tests (provider "stub")
+    stub_latency: float = 0.5
+    stub_jitter: float = 0.0
+    stub_parallel: Optional[int] = None
+    stub_answer: Optional[str] = None
+
+    # Output mode
+    output_mode: str = "text"
+    output_labels: List[str] = field(default_factory=list)
+    output_max_tokens: Optional[int] = None
+    output_stop: List[str] = field(default_factory=list)
+
+    # kNN fast path
+    fast_path_enabled: bool = False
+    fast_path_k: int = 5
+    fast_path_threshold: float = 0.8
+    fast_path_min_similarity: float = 0.6
+    fast_path_learn: bool = True
+    fast_path_audit_rate: float = 0.05
+    fast_path_labels: List[str] = field(default_factory=list)
+    fast_path_template: str = "{label}"
+    fast_path_examples: List[Dict[str, str]] = field(default_factory=list)
+    fast_path_examples_file: Optional[str] = None
+    fast_path_max_examples: int = 10000
+
     @classmethod
     def from_yaml(cls, path: str) -> "AgentConfig":
         """
@@ -75,6 +170,11 @@ class AgentConfig:
         model = data.get("model", {})
         embeddings = data.get("embeddings", {})
         rag = data.get("rag", {})
+        runtime = data.get("runtime", {})
+        output = data.get("output", {})
+        fast_path = data.get("fast_path", {})
+        admission = data.get("admission", {})
+        low_memory = runtime.get("low_memory", False)
 
         return cls(
             # Agent identity
@@ -104,8 +204,114 @@ class AgentConfig:
 
             # Test cases
             test_cases=data.get("test_cases", []),
+
+            # Prompt layout
+            prompt_layout=prompts.get("layout", "inline"),
+            context_template=prompts.get("context_template", "Context:\n{context}"),
+
+            # Index snapshots
+            use_snapshots=rag.get("snapshots", False),
+            reload_interval=rag.get("reload_interval", 0.0),
+
+            # Vector store layout
+            vector_store=rag.get("vector_store", "chroma"),
+            num_shards=rag.get("num_shards", 4),
+            batch_size=rag.get("batch_size", 256),
+
+            # Compressed vectors
+            vector_reduction=rag.get("reduction", "none"),
+            reduced_dim=rag.get("reduced_dim"),
+            vector_dtype=rag.get("vector_dtype", "float16"),
+
+            # Ingest artifact cache
+            cache_dir=rag.get("cache_dir", "./.rag_cache"),
+
+            # Memory footprint
+            low_memory=low_memory,
+            embedding_max_seq_length=embeddings.get(
+                "max_seq_length", 128 if low_memory else None
+            ),
+            embedding_precision=embeddings.get(
+                "precision", "bfloat16" if low_memory else "float32"
+            ),
+            store_memory_limit_mb=rag.get("store_memory_limit_mb", 256 if low_memory else None),
+
+            # Adaptive retrieval depth
+            retrieval_mode=rag.get("retrieval_mode", "fixed"),
+            min_k=rag.get("min_k", 1),
+            max_k=rag.get("max_k", 6),
+            score_threshold=rag.get("score_threshold"),
+            score_drop=rag.get("score_drop"),
+
+            # Retrieval result cache
+            retrieval_cache_size=rag.get("retrieval_cache_size", 1024),
+            hot_query_log=rag.get("hot_query_log"),
+            prewarm=rag.get("prewarm", True),
+            prewarm_size=rag.get("prewarm_size", 100),
+
+            # Runtime settings
+            max_concurrency=runtime.get("max_concurrency", 8),
+            single_flight=runtime.get("single_flight", True),
+            group_size=runtime.get("group_size", 1),
+
+            # Admission control
+            admission_enabled=admission.get("enabled", False),
+            admission_max_concurrency=admission.get("max_concurrency"),
+            admission_max_queue=admission.get("max_queue", 64),
+            admission_classes=admission.get(
+                "classes", {"interactive": {"timeout": 30.0}, "batch": {}}
+            ),
+
+            # Ollama endpoints
+            model_base_url=model.get("base_url", "http://localhost:11434"),
+            model_endpoints=model.get("endpoints", []),
+            health_interval=model.get("health_interval", 10.0),
+            max_failures=model.get("max_failures", 3),
+
+            # Ollama generation and connection settings
+            request_timeout=model.get("timeout", 120.0),
+            keep_alive=model.get("keep_alive", "30m"),
+            num_ctx=model.get("num_ctx"),
+            num_predict=model.get("num_predict"),
+            num_thread=model.get("num_thread"),
+            warmup=model.get("warmup", True),
+            hedge_percentile=model.get("hedge_percentile"),
+            hedge_min_delay=model.get("hedge_min_delay", 0.5),
+            hedge_endpoints=model.get("hedge_endpoints", []),
+            stub_latency=model.get("stub_latency", 0.5),
+            stub_jitter=model.get("stub_jitter", 0.0),
+            stub_parallel=model.get("stub_parallel"),
+            stub_answer=model.get("stub_answer"),
+
+            # Output mode
+            output_mode=output.get("mode", "text"),
+            output_labels=output.get("labels", []),
+            output_max_tokens=output.get("max_tokens"),
+            output_stop=output.get("stop", []),
+
+            # kNN fast path
+            fast_path_enabled=fast_path.get("enabled", False),
+            fast_path_k=fast_path.get("k", 5),
+            fast_path_threshold=fast_path.get("threshold", 0.8),
+            fast_path_min_similarity=fast_path.get("min_similarity", 0.6),
+            fast_path_learn=fast_path.get("learn", True),
+            fast_path_audit_rate=fast_path.get("audit_rate", 0.05),
+            fast_path_labels=fast_path.get("labels", output.get("labels", [])),
+            fast_path_template=fast_path.get("answer_template", "{label}"),
+            fast_path_examples=fast_path.get("examples", []),
+            fast_path_examples_file=fast_path.get("examples_file"),
+            fast_path_max_examples=fast_path.get("max_examples", 10000),
         )
 
+    def generation_options(self) -> Dict[str, Any]:
+        """Get the model generation options that are set."""
+        options = {
+            "num_ctx": self.num_ctx,
+            "num_predict": self.num_predict,
+            "num_thread": self.num_thread,
+        }
+        return {k: v for k, v in options.items() if v is not None}
+
     def to_yaml(self, path: str) -> None:
         """
         Save configuration to a YAML file.
@@ -119,15 +325,36 @@ class AgentConfig:
             "prompts": {
                 "system": self.system_prompt,
                 "human": self.human_prompt,
+                "layout": self.prompt_layout,
+                "context_template": self.context_template,
             },
             "model": {
                 "provider": self.model_provider,
                 "name": self.model_name,
                 "temperature": self.temperature,
+                "base_url": self.model_base_url,
+                "endpoints": self.model_endpoints,
+                "health_interval": self.health_interval,
+                "max_failures": self.max_failures,
+                "timeout": self.request_timeout,
+                "keep_alive": self.keep_alive,
+                "num_ctx": self.num_ctx,
+                "num_predict": self.num_predict,
+                "num_thread": self.num_thread,
+                "warmup": self.warmup,
+                "hedge_percentile": self.hedge_percentile,
+                "hedge_min_delay": self.hedge_min_delay,
+                "hedge_endpoints": self.hedge_endpoints,
+                "stub_latency": self.stub_latency,
+                "stub_jitter": self.stub_jitter,
+                "stub_parallel": self.stub_parallel,
+                "stub_answer": self.stub_answer,
             },
             "embeddings": {
                 "provider": self.embedding_provider,
                 "model": self.embedding_model,
+                "max_seq_length": self.embedding_max_seq_length,
+                "precision": self.embedding_precision,
             },
             "rag": {
                 "context_file": self.context_file,
@@ -136,6 +363,56 @@ class AgentConfig:
                 "retriever_k": self.retriever_k,
                 "use_md_headers": self.use_md_headers,
                 "persist_dir": self.persist_dir,
+                "snapshots": self.use_snapshots,
+                "reload_interval": self.reload_interval,
+                "vector_store": self.vector_store,
+                "num_shards": self.num_shards,
+                "batch_size": self.batch_size,
+                "reduction": self.vector_reduction,
+                "reduced_dim": self.reduced_dim,
+                "vector_dtype": self.vector_dtype,
+                "cache_dir": self.cache_dir,
+                "store_memory_limit_mb": self.store_memory_limit_mb,
+                "retrieval_mode": self.retrieval_mode,
+                "min_k": self.min_k,
+                "max_k": self.max_k,
+                "score_threshold": self.score_threshold,
+                "score_drop": self.score_drop,
+                "retrieval_cache_size": self.retrieval_cache_size,
+                "hot_query_log": self.hot_query_log,
+                "prewarm": self.prewarm,
+                "prewarm_size": self.prewarm_size,
+            },
+            "runtime": {
+                "max_concurrency": self.max_concurrency,
+                "single_flight": self.single_flight,
+                "group_size": self.group_size,
+                "low_memory": self.low_memory,
+            },
+            "admission": {
+                "enabled": self.admission_enabled,
+                "max_concurrency": self.admission_max_concurrency,
+                "max_queue": self.admission_max_queue,
+                "classes": self.admission_classes,
+            },
+            "output": {
+                "mode": self.output_mode,
+                "labels": self.output_labels,
+                "max_tokens": self.output_max_tokens,
+                "stop": self.output_stop,
+            },
+            "fast_path": {
+                "enabled": self.fast_path_enabled,
+                "k": self.fast_path_k,
+                "threshold": self.fast_path_threshold,
+                "min_similarity": self.fast_path_min_similarity,
+                "learn": self.fast_path_learn,
+                "audit_rate": self.fast_path_audit_rate,
+                "labels": self.fast_path_labels,
+                "answer_template": self.fast_path_template,
+                "examples": self.fast_path_examples,
+                "examples_file": self.fast_path_examples_file,
+                "max_examples": self.fast_path_max_examples,
             },
             "test_cases": self.test_cases,
         }
@@ -0,0 +1,258 @@
+"""Nearest-neighbour fast path that answers easy inputs without the LLM."""
+
+import json
+import logging
+import random
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.agent.single_flight import normalize_input
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FastPathDecision:
+    """Outcome of a kNN vote for one input."""
+
+    label: Optional[str]
+    confidence: float
+    confident: bool
+    audit: bool = False
+    embedding: Optional[List[float]] = None
+
+
+class KNNFastPath:
+    """
+    Labels inputs by a similarity-weighted vote of their nearest examples.
+
+    Examples are labelled texts from the config, plus (optionally) inputs
+    whose LLM answer named exactly one label. Of the k nearest examples,
+    those with at least `min_similarity` vote, weighted by similarity. An
+    input is answered directly when the winning label holds at least
+    `threshold` of the vote; otherwise the caller falls through to
+    the full chain. A fraction of confident inputs is still sent to the LLM
+    (`audit_rate`) to measure how often the two agree.
+
+    Examples are unique by normalized text, and learning stops once
+    `max_examples` are held, which also bounds the examples file.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        labels: List[str],
+        examples: Optional[List[Dict[str, str]]] = None,
+        k: int = 5,
+        threshold: float = 0.8,
+        min_similarity: float = 0.6,
+        learn: bool = True,
+        audit_rate: float = 0.05,
+        answer_template: str = "{label}",
+        examples_file: Optional[str] = None,
+        max_examples: int = 10000,
+    ):
+        """
+        Initialize the fast path.
+
+        Args:
+            embeddings: Embedding function (the agent's embedder).
+            labels: Allowed labels, used to read labels out of LLM answers.
+            examples: Seed examples as {"text": ..., "label": ...} dicts.
+            k: Number of neighbours that vote.
+            threshold: Minimum share of the weighted vote for the winner.
+            min_similarity: Minimum cosine similarity for a neighbour to vote.
+            learn: Add inputs with an unambiguous LLM label as examples.
+            audit_rate: Fraction of confident inputs also sent to the LLM.
+            answer_template: Output for fast-path answers; {label} and
+                {confidence} are filled in.
+            examples_file: JSONL file that learned examples are loaded
+                from and appended to.
+            max_examples: Most examples held, seed examples included.
+        """
+        self.embeddings = embeddings
+        self.labels = labels
+        self.k = k
+        self.threshold = threshold
+        self.min_similarity = min_similarity
+        self.learn = learn
+        self.audit_rate = audit_rate
+        self.answer_template = answer_template
+        self.examples_file = Path(examples_file) if examples_file else None
+        self.max_examples = max_examples
+        self._label_patterns = {
+            label: re.compile(rf"\b{re.escape(label)}\b", re.IGNORECASE) for label in labels
+        }
+
+        self._lock = threading.Lock()
+        self._texts: List[str] = []
+        self._labels: List[str] = []
+        self._seen: Set[str] = set()
+        # Rows [0, len(self._texts)) are in use; grown by doubling
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._requests = 0
+        self._served = 0
+        self._audited = 0
+        self._audit_agreed = 0
+        self._learned = 0
+
+        seed = list(examples or [])
+        if self.examples_file is not None and self.examples_file.exists():
+            with open(self.examples_file, "r") as f:
+                seed += [json.loads(line) for line in f if line.strip()]
+        unique = {}
+        for example in seed:
+            unique.setdefault(normalize_input(example["text"]), example)
+        seed = list(unique.values())[: self.max_examples]
+        if seed:
+            vectors = self.embeddings.embed_documents([e["text"] for e in seed])
+            for example, vector in zip(seed, vectors):
+                self._add(example["text"], example["label"], vector)
+        logger.info(f"kNN fast path ready with {len(self._texts)} examples")
+
+    def classify(self, text: str) -> FastPathDecision:
+        """
+        Vote on a label for an input.
+
+        Args:
+            text: Input text.
+
+        Returns:
+            FastPathDecision; `confident` says whether to skip the LLM.
+        """
+        embedding = self.embeddings.embed_query(text)
+        with self._lock:
+            self._requests += 1
+            # Rows and labels below the count are never rewritten, so these
+            # can be read without the lock
+            count = len(self._texts)
+            vectors, labels = self._vectors[:count], self._labels
+        if not count:
+            return FastPathDecision(None, 0.0, False, embedding=embedding)
+
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        similarities = vectors @ query
+        nearest = np.argsort(-similarities)[: self.k]
+
+        # Only neighbours that are similar enough get a vote
+        votes: Dict[str, float] = {}
+        for i in nearest:
+            if similarities[i] >= self.min_similarity:
+                votes[labels[i]] = votes.get(labels[i], 0.0) + float(similarities[i])
+        if not votes:
+            return FastPathDecision(labels[nearest[0]], 0.0, False, embedding=embedding)
+        label = max(votes, key=votes.get)
+        confidence = votes[label] / sum(votes.values())
+
+        confident = confidence >= self.threshold
+        audit = confident and random.random() < self.audit_rate
+        if confident and not audit:
+            with self._lock:
+                self._served += 1
+        return FastPathDecision(label, confidence, confident, audit, embedding)
+
+    def answer(self, decision: FastPathDecision) -> str:
+        """Render the fast-path answer for a confident decision."""
+        return self.answer_template.format(
+            label=decision.label, confidence=f"{decision.confidence:.2f}"
+        )
+
+    def observe(
+        self,
+        text: str,
+        decision: FastPathDecision,
+        llm_answer: str,
+        llm_label: Optional[str] = None,
+    ) -> None:
+        """
+        Record the LLM's answer for an input that went through the chain.
+
+        Audited decisions count towards the agreement rate, and inputs with
+        an unambiguous label are learned as new examples.
+
+        Args:
+            text: Input text.
+            decision: The decision classify() returned for it.
+            llm_answer: The chain's answer.
+            llm_label: Label already parsed from the answer, if any.
+        """
+        llm_label = llm_label or self.extract_label(llm_answer)
+        with self._lock:
+            if decision.audit:
+                self._audited += 1
+                self._audit_agreed += int(llm_label == decision.label)
+        if llm_label is None or not self.learn or decision.embedding is None:
+            return
+
+        with self._lock:
+            if not self._add(text, llm_label, decision.embedding):
+                return
+            self._learned += 1
+        if self.examples_file is not None:
+            self.examples_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.examples_file, "a") as f:
+                f.write(json.dumps({"text": text, "label": llm_label}) + "\n")
+
+    def extract_label(self, answer: str) -> Optional[str]:
+        """
+        Read the label from an LLM answer.
+
+        The first line that mentions any label must mention exactly one;
+        answers that list several labels there are treated as ambiguous.
+        """
+        for line in answer.splitlines():
+            found = [label for label, p in self._label_patterns.items() if p.search(line)]
+            if found:
+                return found[0] if len(found) == 1 else None
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the share of traffic served and the audited agreement rate."""
+        with self._lock:
+            return {
+                "examples": len(self._texts),
+                "learned": self._learned,
+                "requests": self._requests,
+                "served": self._served,
+                "served_fraction": self._served / self._requests if self._requests else 0.0,
+                "audited": self._audited,
+                "agreement": self._audit_agreed / self._audited if self._audited else None,
+            }
+
+    def _add(self, text: str, label: str, vector: List[float]) -> bool:
+        """
+        Append an example; the caller must hold the lock (or be __init__).
+
+        Returns:
+            False if the text is already an example or the set is full.
+        """
+        key = normalize_input(text)
+        count = len(self._texts)
+        if key in self._seen or count >= self.max_examples:
+            return False
+        row = _normalize(np.asarray(vector, dtype=np.float32))
+        if count == len(self._vectors):
+            # Grow into a new buffer; classify() may still be reading the old one
+            grown = np.zeros((max(2 * count, 64), len(row)), dtype=np.float32)
+            if count:
+                grown[:count] = self._vectors[:count]
+            self._vectors = grown
+        self._vectors[count] = row
+        self._seen.add(key)
+        self._texts.append(text)
+        self._labels.append(label)
+        if count + 1 == self.max_examples:
+            logger.info(f"kNN fast path holds {self.max_examples} examples; no longer learning")
+        return True
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    """Scale a vector to unit length so dot products are cosine similarities."""
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
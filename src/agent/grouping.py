@@ -0,0 +1,148 @@
+"""Multi-item prompts: answer several inputs with one LLM call."""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
+
+from src.agent.output import StructuredOutput
+from src.agent.prompts import PromptLayout
+
+# "### 3" heading that starts the answer to item 3 in text mode
+_HEADING = re.compile(r"^\s*#{1,4}\s*\[?(\d+)\]?[.:)]?\s*$", re.MULTILINE)
+
+
+class MultiItemPrompt:
+    """
+    Builds one prompt for a group of inputs and splits the answer.
+
+    The union of the group's retrieved chunks is the context, placed where
+    the prompt layout puts it, so it is prefilled once instead of once per
+    input. The human
+    turn lists the inputs by number and asks for one answer per number:
+    as "### <n>" sections in text mode, or as a JSON array of objects with
+    an "index" in the structured and label modes. split() validates that
+    every item was answered exactly once.
+    """
+
+    def __init__(self, layout: PromptLayout, output: Optional[StructuredOutput] = None):
+        """
+        Initialize the prompt.
+
+        Args:
+            layout: Prompt layout holding the configured prompts.
+            output: Structured output mode, or None for text answers.
+        """
+        self.layout = layout
+        self.system_prompt = ChatPromptTemplate.from_messages([("system", layout.system_template)])
+        self.human_prompt = PromptTemplate.from_template(layout.human_prompt)
+        self.output = output
+
+    def messages(self, inputs: List[str], documents: List[Document]) -> List[BaseMessage]:
+        """Build the messages for a group of inputs."""
+        context = "\n\n".join(doc.page_content for doc in documents)
+        items = "\n".join(f"[{i}] {text}" for i, text in enumerate(inputs, 1))
+        task = self.human_prompt.format(input="<item>").strip()
+
+        if self.output is None:
+            answer_format = (
+                f"Start the answer to each item with a line containing only "
+                f"'### <item number>', from ### 1 to ### {len(inputs)}."
+            )
+        else:
+            answer_format = (
+                f'Respond only with JSON: {{"answers": [one object per item: '
+                f'{{"index": the item number, {self.output.fields()}}}]}}.'
+            )
+
+        # In the prefix layout the context leads the human turn
+        prefix = ""
+        if self.layout.layout == "prefix":
+            prefix = PromptTemplate.from_template(self.layout.context_template).format(
+                context=context
+            ) + "\n\n"
+
+        human = prefix + (
+            f"Answer each of the {len(inputs)} numbered items below separately. "
+            f"For every item, where the instructions say <item>, use that item.\n\n"
+            f"Instructions:\n{task}\n\nItems:\n{items}\n\n{answer_format}"
+        )
+        return self.system_prompt.format_messages(context=context) + [HumanMessage(human)]
+
+    def bind_kwargs(self, count: int) -> Dict[str, Any]:
+        """Get generation arguments for a group of `count` items."""
+        if self.output is None:
+            return {}
+        item_schema = self.output.schema()
+        item_schema = {
+            **item_schema,
+            "properties": {"index": {"type": "integer"}, **item_schema["properties"]},
+            "required": ["index"] + item_schema["required"],
+        }
+        return {
+            "format": {
+                "type": "object",
+                "properties": {
+                    "answers": {
+                        "type": "array",
+                        "items": item_schema,
+                        "minItems": count,
+                        "maxItems": count,
+                    },
+                },
+                "required": ["answers"],
+            },
+            "num_predict": self.output.max_tokens * count,
+        }
+
+    def split(self, answer: str, count: int) -> List[str]:
+        """
+        Split a group answer into per-item answers.
+
+        In the structured modes each item's answer is returned as its own
+        JSON object (without the index), as a single call would produce.
+
+        Raises:
+            ValueError: If any item is missing, duplicated or empty.
+        """
+        if self.output is None:
+            parts = _HEADING.split(answer)
+            # parts = [preamble, n1, text1, n2, text2, ...]
+            answers = {}
+            for number, text in zip(parts[1::2], parts[2::2]):
+                answers.setdefault(int(number), []).append(text.strip())
+        else:
+            data = json.loads(answer)
+            answers = {}
+            for item in data["answers"]:
+                index = int(item.pop("index"))
+                answers.setdefault(index, []).append(json.dumps(item))
+
+        if sorted(answers) != list(range(1, count + 1)):
+            raise ValueError(f"Expected answers 1..{count}, got {sorted(answers)}")
+        if any(len(texts) != 1 or not texts[0] for texts in answers.values()):
+            raise ValueError("Duplicate or empty answer in group")
+        return [answers[i][0] for i in range(1, count + 1)]
+
+
+def union_documents(results: List[List[Document]]) -> List[Document]:
+    """
+    Merge per-input retrieval results, dropping duplicate chunks.
+
+    Chunks are interleaved by rank (every input's first hit, then every
+    second hit, ...) so each input's best chunks come early in the context.
+    """
+    merged: List[Document] = []
+    seen = set()
+    for rank in range(max((len(docs) for docs in results), default=0)):
+        for docs in results:
+            if rank < len(docs):
+                doc = docs[rank]
+                key = doc.id or doc.page_content
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(doc)
+    return merged
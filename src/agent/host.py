@@ -0,0 +1,223 @@
+"""Hosts several configured agents side by side in one process."""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.agent.agent import RAGAgent
+from src.agent.builder import create_agent
+from src.agent.config_loader import AgentConfig
+from src.domain.models import AgentResponse
+from src.embeddings import EmbeddingFactory, EmbeddingProvider
+from src.llm import LLMFactory, LLMProvider
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _HostedAgent:
+    """An agent together with the shared providers it holds references to."""
+
+    agent: RAGAgent
+    embedding_provider: EmbeddingProvider
+    llm_provider: LLMProvider
+    last_used: float = field(default_factory=time.monotonic)
+    inflight: int = 0
+
+
+class AgentHost:
+    """
+    Serves many agent.yaml configs from one process.
+
+    Agents are selected by config name. Embedding and LLM providers come from
+    the shared factory registries, so agents with identical model settings
+    share one loaded model. Idle agents can be unloaded, which releases their
+    model references.
+    """
+
+    def __init__(self, idle_timeout: float = 0.0):
+        """
+        Initialize the host.
+
+        Args:
+            idle_timeout: Seconds without requests before an agent is
+                unloaded by the idle reaper (0 disables it).
+        """
+        self.idle_timeout = idle_timeout
+        self._agents: Dict[str, _HostedAgent] = {}
+        self._config_paths: Dict[str, str] = {}
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._reaper_stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    def register(self, config_path: str, name: Optional[str] = None) -> str:
+        """
+        Register a config to be loaded on first use.
+
+        Args:
+            config_path: Path to the agent YAML file.
+            name: Name to select the agent by (default: the config's name).
+
+        Returns:
+            The name the agent is registered under.
+        """
+        name = name or AgentConfig.from_yaml(config_path).name
+        with self._lock:
+            self._config_paths[name] = config_path
+        return name
+
+    def load(self, name: str) -> RAGAgent:
+        """
+        Get a registered agent, loading it if necessary.
+
+        Loading happens outside the host lock, so other agents keep serving
+        while an index is built; concurrent loads of one agent share a single
+        load.
+
+        Args:
+            name: Registered agent name.
+
+        Returns:
+            The hosted RAGAgent.
+
+        Raises:
+            KeyError: If no config is registered under the name.
+        """
+        return self._acquire(name, reserve=False).agent
+
+    def _acquire(self, name: str, reserve: bool) -> _HostedAgent:
+        """Get a loaded agent, counting a request in flight if reserve is set."""
+        while True:
+            with self._lock:
+                hosted = self._agents.get(name)
+                if hosted is not None:
+                    hosted.last_used = time.monotonic()
+                    if reserve:
+                        hosted.inflight += 1
+                    return hosted
+                config_path = self._config_paths[name]
+                future = self._loading.get(name)
+                leader = future is None
+                if leader:
+                    future = self._loading[name] = Future()
+
+            if not leader:
+                # Wait for the other caller's load, then look the agent up again
+                # (it may have been unloaded in the meantime)
+                future.result()
+                continue
+
+            try:
+                hosted = self._create(name, config_path)
+            except BaseException as e:
+                with self._lock:
+                    self._loading.pop(name, None)
+                future.set_exception(e)
+                raise
+            with self._lock:
+                self._agents[name] = hosted
+                self._loading.pop(name, None)
+            future.set_result(None)
+
+    def _create(self, name: str, config_path: str) -> _HostedAgent:
+        """Load an agent and the providers it uses."""
+        logger.info(f"Loading hosted agent: {name}")
+        config = AgentConfig.from_yaml(config_path)
+        embedding_provider = EmbeddingFactory.create_from_agent_config(config)
+        llm_provider = LLMFactory.create_from_agent_config(config)
+        try:
+            agent = create_agent(config, embedding_provider.get_embeddings(), llm_provider)
+        except Exception:
+            EmbeddingFactory.release(embedding_provider)
+            LLMFactory.release(llm_provider)
+            raise
+        return _HostedAgent(agent, embedding_provider, llm_provider)
+
+    def run(self, name: str, input_text: str, priority: str = "interactive") -> AgentResponse:
+        """Run the named agent on a single input in an admission class."""
+        hosted = self._acquire(name, reserve=True)
+        try:
+            return hosted.agent.run(input_text, priority)
+        finally:
+            with self._lock:
+                hosted.inflight -= 1
+                hosted.last_used = time.monotonic()
+
+    def unload(self, name: str, max_idle: Optional[float] = None) -> bool:
+        """
+        Unload an agent and release its model references.
+
+        Args:
+            name: Registered agent name.
+            max_idle: If set, only unload the agent if it has no request in
+                flight and has been idle this many seconds.
+
+        Returns:
+            True if the agent was unloaded.
+        """
+        with self._lock:
+            hosted = self._agents.get(name)
+            if hosted is None:
+                return False
+            # Checked under the lock that run() takes to count a request
+            if max_idle is not None and (
+                hosted.inflight or time.monotonic() - hosted.last_used < max_idle
+            ):
+                return False
+            del self._agents[name]
+
+        hosted.agent.close()
+        EmbeddingFactory.release(hosted.embedding_provider)
+        LLMFactory.release(hosted.llm_provider)
+        logger.info(f"Unloaded hosted agent: {name}")
+        return True
+
+    def unload_idle(self, max_idle: Optional[float] = None) -> List[str]:
+        """
+        Unload agents that have not served a request recently.
+
+        Args:
+            max_idle: Idle seconds before unloading (default: idle_timeout).
+
+        Returns:
+            Names of the unloaded agents.
+        """
+        max_idle = max_idle if max_idle is not None else self.idle_timeout
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                name for name, hosted in self._agents.items()
+                if hosted.inflight == 0 and now - hosted.last_used >= max_idle
+            ]
+        return [name for name in idle if self.unload(name, max_idle=max_idle)]
+
+    def start_idle_reaper(self, interval: float = 60.0) -> None:
+        """Unload idle agents periodically in a background thread."""
+        if not self.idle_timeout or self._reaper is not None:
+            return
+
+        def reap() -> None:
+            while not self._reaper_stop.wait(interval):
+                self.unload_idle()
+
+        self._reaper_stop.clear()
+        self._reaper = threading.Thread(target=reap, name="agent-idle-reaper", daemon=True)
+        self._reaper.start()
+
+    def loaded(self) -> List[str]:
+        """Names of the agents currently loaded."""
+        with self._lock:
+            return list(self._agents)
+
+    def close(self) -> None:
+        """Stop the reaper and unload every agent."""
+        if self._reaper is not None:
+            self._reaper_stop.set()
+            self._reaper.join()
+            self._reaper = None
+        for name in self.loaded():
+            self.unload(name)
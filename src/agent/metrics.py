@@ -0,0 +1,60 @@
+"""In-process counters, gauges and timings for agent activity."""
+
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, List
+
+
+class AgentMetrics:
+    """Thread-safe named counters, gauges and recent samples for one agent."""
+
+    # Samples kept per timing; percentiles describe this recent window
+    WINDOW = 1024
+
+    def __init__(self):
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._gauges: Dict[str, float] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Add to a counter."""
+        with self._lock:
+            self._counts[name] += value
+
+    def get(self, name: str) -> int:
+        """Get a counter's value (0 if never incremented)."""
+        with self._lock:
+            return self._counts.get(name, 0)
+
+    def set(self, name: str, value: float) -> None:
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample of a timing or size."""
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.WINDOW)
+            self._samples[name].append(value)
+
+    def percentile(self, name: str, q: float) -> float:
+        """Nearest-rank percentile (q in 0..100) of recent samples (0 if none)."""
+        with self._lock:
+            values: List[float] = sorted(self._samples.get(name, ()))
+        if not values:
+            return 0.0
+        rank = max(1, int(-(-q * len(values) // 100)))
+        return values[min(rank, len(values)) - 1]
+
+    def snapshot(self) -> Dict[str, float]:
+        """Get a copy of all counters and gauges, with p50/p95 of each timing."""
+        with self._lock:
+            result: Dict[str, float] = dict(self._counts)
+            result.update(self._gauges)
+            names = list(self._samples)
+        for name in names:
+            result[f"{name}.p50"] = self.percentile(name, 50)
+            result[f"{name}.p95"] = self.percentile(name, 95)
+        return result
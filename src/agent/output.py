@@ -0,0 +1,137 @@
+"""Structured and label-only output modes for classification agents."""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from src.domain.models import StructuredResult
+
+logger = logging.getLogger(__name__)
+
+# Generation caps used when output.max_tokens is not set
+DEFAULT_MAX_TOKENS = {"structured": 256, "label": 16}
+
+
+class StructuredOutput:
+    """
+    Constrains generation to a small JSON object and parses it.
+
+    "structured" asks for {"level", "confidence"} and an optional
+    "justification" the schema doesn't require, so the model can skip it;
+    "label" asks for {"level"} only, so bulk classification generates a
+    handful of tokens. The JSON schema is passed to Ollama as the request format, which
+    restricts decoding to valid objects with a level from the label list.
+    """
+
+    MODES = ("structured", "label")
+
+    def __init__(
+        self,
+        mode: str,
+        labels: List[str],
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the output mode.
+
+        Args:
+            mode: "structured" or "label".
+            labels: Allowed values of level.
+            max_tokens: Cap on generated tokens (default per mode).
+            stop: Stop sequences.
+
+        Raises:
+            ValueError: If the mode is unknown or no labels are given.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported output mode: {mode}")
+        if not labels:
+            raise ValueError(f"Output mode {mode} requires a list of labels")
+        self.mode = mode
+        self.labels = labels
+        self.max_tokens = max_tokens or DEFAULT_MAX_TOKENS[mode]
+        self.stop = stop or []
+
+    def schema(self) -> Dict[str, Any]:
+        """Get the JSON schema of an answer."""
+        properties: Dict[str, Any] = {"level": {"type": "string", "enum": self.labels}}
+        required = ["level"]
+        if self.mode == "structured":
+            properties["confidence"] = {"type": "number", "minimum": 0, "maximum": 1}
+            properties["justification"] = {"type": "string"}
+            required.append("confidence")
+        return {"type": "object", "properties": properties, "required": required}
+
+    def bind_kwargs(self) -> Dict[str, Any]:
+        """Get the generation arguments to bind to the chat model."""
+        kwargs: Dict[str, Any] = {"format": self.schema(), "num_predict": self.max_tokens}
+        if self.stop:
+            kwargs["stop"] = self.stop
+        return kwargs
+
+    def fields(self) -> str:
+        """Describe the answer's JSON fields for the prompt."""
+        levels = ", ".join(self.labels)
+        if self.mode == "label":
+            return f'"level": one of {levels}'
+        return (
+            f'"level": one of {levels}, '
+            f'"confidence": a number from 0 to 1, '
+            f'"justification" (optional): one short sentence'
+        )
+
+    def instructions(self) -> str:
+        """Get the answer-format instructions appended to the human prompt."""
+        return f"Respond only with JSON: {{{self.fields()}}}."
+
+    def parse(self, answer: str) -> Optional[StructuredResult]:
+        """
+        Parse a model answer into a StructuredResult.
+
+        Falls back to the first label mentioned in the text when the answer
+        isn't valid JSON (e.g. with a provider that ignores the format).
+
+        Returns:
+            The parsed result, or None if no label could be found.
+        """
+        try:
+            data = json.loads(answer)
+        except json.JSONDecodeError:
+            data = None
+
+        if isinstance(data, dict):
+            level = self._match_label(str(data.get("level", "")))
+            if level is not None:
+                confidence = data.get("confidence")
+                return StructuredResult(
+                    level=level,
+                    confidence=float(confidence) if isinstance(confidence, (int, float)) else None,
+                    justification=data.get("justification"),
+                )
+
+        level = self._match_label(answer)
+        if level is None:
+            logger.warning(f"Could not parse a level from answer: {answer[:80]!r}")
+            return None
+        return StructuredResult(level=level)
+
+    def render(self, result: StructuredResult) -> str:
+        """Render a result as the JSON text the model would produce."""
+        data: Dict[str, Any] = {"level": result.level}
+        if self.mode == "structured":
+            data["confidence"] = result.confidence
+            if result.justification is not None:
+                data["justification"] = result.justification
+        return json.dumps(data)
+
+    def _match_label(self, text: str) -> Optional[str]:
+        """Find the earliest label mentioned in text (case-insensitive)."""
+        found = [
+            (match.start(), label)
+            for label in self.labels
+            for match in [re.search(rf"\b{re.escape(label)}\b", text, re.IGNORECASE)]
+            if match
+        ]
+        return min(found)[1] if found else None
@@ -0,0 +1,61 @@
+"""Prompt layouts: where the retrieved context goes in the messages."""
+
+import re
+
+# A whole line of the system prompt that holds the {context} variable
+_CONTEXT_LINE = re.compile(r"^[^\n]*\{context\}[^\n]*(\n|$)", re.MULTILINE)
+
+
+class PromptLayout:
+    """
+    Arranges the configured system and human prompts for one layout.
+
+    "inline" uses the prompts as written, with {context} interpolated
+    wherever the system prompt puts it. "prefix" moves the context out of
+    the system prompt and in front of the human prompt, so every request
+    starts with the same static instructions and Ollama can reuse their
+    KV cache; only the context and input at the end are prefilled anew.
+    """
+
+    LAYOUTS = ("inline", "prefix")
+
+    def __init__(
+        self,
+        system_prompt: str,
+        human_prompt: str,
+        layout: str = "inline",
+        context_template: str = "Context:\n{context}",
+    ):
+        """
+        Initialize the layout.
+
+        Args:
+            system_prompt: Configured system prompt (with {context}).
+            human_prompt: Configured human prompt (with {input}).
+            layout: "inline" or "prefix".
+            context_template: How the context is introduced in the prefix
+                layout; must contain {context}.
+
+        Raises:
+            ValueError: If the layout is unknown.
+        """
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Unsupported prompt layout: {layout}")
+        self.layout = layout
+        self.system_prompt = system_prompt
+        self.human_prompt = human_prompt
+        self.context_template = context_template
+
+    @property
+    def system_template(self) -> str:
+        """System message template; static in the prefix layout."""
+        if self.layout == "inline":
+            return self.system_prompt
+        return _CONTEXT_LINE.sub("", self.system_prompt).rstrip() + "\n"
+
+    @property
+    def human_template(self) -> str:
+        """Human message template; starts with the context in the prefix layout."""
+        if self.layout == "inline":
+            return self.human_prompt
+        return f"{self.context_template}\n\n{self.human_prompt}"
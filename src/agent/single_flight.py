@@ -0,0 +1,146 @@
+"""Coalescing of concurrent identical requests (single-flight)."""
+
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def normalize_input(text: str) -> str:
+    """Normalize an input for coalescing: case and whitespace are ignored."""
+    return " ".join(text.split()).casefold()
+
+
+def fingerprint(*parts: object) -> str:
+    """Hash the settings that affect an answer into a short key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    Callers that arrive while a computation for their key is in progress
+    wait for it and receive its result instead of starting their own. Sync
+    and async callers share the same in-flight computations, so a thread
+    and a coroutine asking the same question are coalesced too. Results are
+    not cached: once a computation finishes, the next call starts a new one.
+
+    An async computation runs as its own task, so cancelling the caller
+    that started it only cancels the computation if nobody else is waiting
+    for it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._followers: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        Run fn for key, or wait for the in-flight run.
+
+        Args:
+            key: Coalescing key.
+            fn: Computation to run if none is in flight.
+
+        Returns:
+            Tuple of (result, shared); shared is True if the result came
+            from another caller's computation.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+        self._run(key, future, fn)
+        return future.result(), False
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Async version of do(); fn returns an awaitable.
+
+        Args:
+            key: Coalescing key.
+            fn: Coroutine function to run if nothing is in flight.
+
+        Returns:
+            Tuple of (result, shared).
+        """
+        future, leader = self._join(key)
+        if not leader:
+            try:
+                # shield: a cancelled follower must not cancel the leader's work
+                return await asyncio.shield(asyncio.wrap_future(future)), True
+            except asyncio.CancelledError:
+                with self._lock:
+                    if self._calls.get(key) is future:
+                        self._followers[key] -= 1
+                raise
+
+        task = asyncio.ensure_future(fn())
+        task.add_done_callback(lambda done: self._publish(key, future, done))
+        try:
+            # shield: a cancelled leader must not fail the followers
+            return await asyncio.shield(task), False
+        except asyncio.CancelledError:
+            with self._lock:
+                abandoned = not self._followers.get(key) and self._calls.get(key) is future
+                if abandoned:
+                    # Nobody else is waiting; later callers start a new computation
+                    self._calls.pop(key)
+                    self._followers.pop(key, None)
+            if abandoned:
+                task.cancel()
+            raise
+
+    def in_flight(self) -> int:
+        """Get the number of computations currently running."""
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Get the in-flight future for key, registering a new one if absent."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._followers[key] = self._followers.get(key, 0) + 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _run(self, key: str, future: Future, fn: Callable[[], T]) -> None:
+        """Run a sync computation and publish its outcome."""
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            return
+        self._finish(key, future, result=result)
+
+    def _publish(self, key: str, future: Future, task: "asyncio.Future") -> None:
+        """Publish the outcome of an async computation's task."""
+        if task.cancelled():
+            self._finish(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, future, error=task.exception())
+        else:
+            self._finish(key, future, result=task.result())
+
+    def _finish(self, key: str, future: Future, result=None, error=None) -> None:
+        """Remove the key and wake every waiter."""
+        with self._lock:
+            # The key may already belong to a newer computation
+            if self._calls.get(key) is future:
+                del self._calls[key]
+                self._followers.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
@@ -0,0 +1 @@
+"""Benchmarks for the RAG agent (run as python -m src.benchmarks.<name>)."""
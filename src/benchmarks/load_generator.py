@@ -0,0 +1,337 @@
+"""
+End-to-end load generator for a RAGAgent.
+
+Drives the agent in-process through arun(), either open-loop (requests
+arrive as a Poisson process at a target rate, whether or not earlier ones
+have finished) or closed-loop (a fixed number of clients, each sending its
+next request when the previous one returns). Each load level runs for a
+fixed duration and the levels together form the latency-versus-load curve.
+
+Open-loop latency is measured from each request's scheduled arrival time,
+so time spent waiting behind a saturated agent is included rather than
+hidden (no coordinated omission).
+
+Usage:
+    python -m src.benchmarks.load_generator --rates 1,2,4,8          # agent.yaml model
+    python -m src.benchmarks.load_generator --concurrency 1,4,16 --stub-latency 0.5
+    python -m src.benchmarks.load_generator -c my.yaml --inputs inputs.txt --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+from src.agent.agent import RAGAgent
+from src.agent.builder import create_agent
+from src.agent.config_loader import AgentConfig
+from src.embeddings import EmbeddingFactory
+from src.llm import LLMFactory
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadResult:
+    """Measurements for one load level."""
+
+    mode: str
+    level: float
+    requests: int
+    errors: int
+    duration: float
+    throughput: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    shed: int = 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    @property
+    def shed_rate(self) -> float:
+        return self.shed / self.requests if self.requests else 0.0
+
+    def row(self) -> str:
+        """Format the result as a table row."""
+        unit = "req/s" if self.mode == "open" else "clients"
+        return (
+            f"{self.level:>8g} {unit:<7} {self.requests:>8} {self.throughput:>10.2f} "
+            f"{self.p50_ms:>9.0f} {self.p90_ms:>9.0f} {self.p99_ms:>9.0f} "
+            f"{self.max_ms:>9.0f} {self.error_rate:>7.1%} {self.shed_rate:>7.1%}"
+        )
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-q * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(
+    mode: str,
+    level: float,
+    samples: List[Tuple[float, bool, bool]],
+    duration: float,
+    completed: Optional[int] = None,
+) -> LoadResult:
+    """
+    Reduce (latency seconds, succeeded, shed) samples to a LoadResult.
+
+    Shed requests count as errors but are left out of the latency
+    percentiles, which describe the requests that were served.
+
+    Args:
+        completed: Requests that finished within duration, for the
+            throughput (default: all samples).
+    """
+    completed = len(samples) if completed is None else completed
+    latencies = sorted(latency * 1000 for latency, _, shed in samples if not shed)
+    return LoadResult(
+        mode=mode,
+        level=level,
+        requests=len(samples),
+        errors=sum(1 for _, ok, _ in samples if not ok),
+        shed=sum(1 for _, _, shed in samples if shed),
+        duration=duration,
+        throughput=completed / duration if duration > 0 else 0.0,
+        p50_ms=percentile(latencies, 50),
+        p90_ms=percentile(latencies, 90),
+        p99_ms=percentile(latencies, 99),
+        max_ms=latencies[-1] if latencies else 0.0,
+    )
+
+
+class LoadGenerator:
+    """
+    Sends sampled inputs to an agent at one load level at a time.
+
+    With `distinct` set, every request gets a unique suffix, so single-flight
+    coalescing and the retrieval cache don't turn a small input set into
+    a cache benchmark.
+    """
+
+    def __init__(
+        self,
+        agent: RAGAgent,
+        inputs: List[str],
+        duration: float = 30.0,
+        distinct: bool = False,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the generator.
+
+        Args:
+            agent: Agent under test.
+            inputs: Inputs that requests are sampled from.
+            duration: Seconds each load level runs for.
+            distinct: Make every request text unique.
+            seed: Seed for input sampling and arrival times.
+        """
+        if not inputs:
+            raise ValueError("No inputs: pass --inputs or configure test_cases")
+        self.agent = agent
+        self.inputs = inputs
+        self.duration = duration
+        self.distinct = distinct
+        self._random = random.Random(seed)
+        self._sent = 0
+
+    async def open_loop(self, rate: float) -> LoadResult:
+        """
+        Send Poisson arrivals at `rate` requests per second.
+
+        Requests still running when the arrival window closes are waited
+        for and measured, but throughput counts only the completions inside
+        the window, so the drain doesn't understate it at saturation.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + self.duration
+        tasks = []
+        completed = 0
+
+        def count(_: asyncio.Task) -> None:
+            nonlocal completed
+            completed += int(loop.time() <= deadline)
+
+        arrival = 0.0
+        while True:
+            arrival += self._random.expovariate(rate)
+            if arrival >= self.duration:
+                break
+            await asyncio.sleep(max(0.0, start + arrival - loop.time()))
+            task = asyncio.create_task(self._request(start + arrival))
+            task.add_done_callback(count)
+            tasks.append(task)
+        samples = await asyncio.gather(*tasks)
+        return summarize("open", rate, samples, self.duration, completed)
+
+    async def closed_loop(self, concurrency: int) -> LoadResult:
+        """Run `concurrency` clients back to back for the duration."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + self.duration
+
+        async def client() -> List[Tuple[float, bool, bool]]:
+            samples = []
+            while loop.time() < deadline:
+                samples.append(await self._request(loop.time()))
+            return samples
+
+        per_client = await asyncio.gather(*(client() for _ in range(concurrency)))
+        samples = [sample for samples in per_client for sample in samples]
+        return summarize("closed", concurrency, samples, loop.time() - start)
+
+    async def _request(self, scheduled: float) -> Tuple[float, bool, bool]:
+        """Send one sampled input; latency counts from its scheduled time."""
+        text = self._random.choice(self.inputs)
+        self._sent += 1
+        if self.distinct:
+            text = f"{text} (request {self._sent})"
+        shed = False
+        try:
+            response = await self.agent.arun(text)
+            ok = response.is_success
+            shed = response.overloaded
+        except Exception as e:
+            logger.warning(f"Request failed: {e}")
+            ok = False
+        return asyncio.get_running_loop().time() - scheduled, ok, shed
+
+
+async def run_levels(
+    generator: LoadGenerator,
+    rates: Optional[List[float]] = None,
+    concurrency: Optional[List[int]] = None,
+) -> List[LoadResult]:
+    """Run each load level in turn and print its row as it finishes."""
+    levels = [("open", rate) for rate in rates or []]
+    levels += [("closed", clients) for clients in concurrency or []]
+    results = []
+    print_header()
+    for mode, level in levels:
+        logger.info(f"Running {mode}-loop level {level:g} for {generator.duration:g}s")
+        if mode == "open":
+            result = await generator.open_loop(level)
+        else:
+            result = await generator.closed_loop(int(level))
+        print(result.row(), flush=True)
+        results.append(result)
+    return results
+
+
+def print_header() -> None:
+    """Print the header of the latency-versus-load table."""
+    print(
+        f"\n{'load':>16} {'requests':>8} {'req/s':>10} "
+        f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7} {'shed':>7}"
+    )
+
+
+def run_load_test(
+    config: AgentConfig,
+    inputs: Optional[List[str]] = None,
+    rates: Optional[List[float]] = None,
+    concurrency: Optional[List[int]] = None,
+    duration: float = 30.0,
+    distinct: bool = False,
+    seed: Optional[int] = None,
+) -> List[LoadResult]:
+    """
+    Build an agent from a config and measure it at each load level.
+
+    Args:
+        config: Agent configuration (set model_provider "stub" to run offline).
+        inputs: Inputs to sample from (default: the config's test cases).
+        rates: Open-loop arrival rates in requests per second.
+        concurrency: Closed-loop client counts.
+        duration: Seconds per load level.
+        distinct: Make every request text unique.
+        seed: Random seed.
+
+    Returns:
+        One LoadResult per level, in the order given.
+    """
+    embedding_provider = EmbeddingFactory.create_from_agent_config(config)
+    llm_provider = LLMFactory.create_from_agent_config(config)
+    agent = None
+    try:
+        agent = create_agent(config, embedding_provider.get_embeddings(), llm_provider)
+        generator = LoadGenerator(agent, inputs or config.test_cases, duration, distinct, seed)
+        return asyncio.run(run_levels(generator, rates, concurrency))
+    finally:
+        if agent is not None:
+            agent.close()
+        LLMFactory.release(llm_provider)
+        EmbeddingFactory.release(embedding_provider)
+
+
+def _numbers(text: str) -> List[float]:
+    """Parse a comma-separated list of numbers."""
+    return [float(part) for part in text.split(",") if part.strip()]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Measure agent latency under load")
+    parser.add_argument("--config", "-c", default="agent.yaml", help="Agent configuration file")
+    parser.add_argument("--inputs", help="Text file with one input per line (default: test cases)")
+    parser.add_argument("--rates", type=_numbers, help="Open-loop arrival rates, e.g. 1,2,4,8")
+    parser.add_argument("--concurrency", type=_numbers, help="Closed-loop client counts, e.g. 1,4,16")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per load level")
+    parser.add_argument(
+        "--distinct",
+        action="store_true",
+        help="Make every request unique (defeats single-flight and the retrieval cache)",
+    )
+    parser.add_argument("--seed", type=int, help="Random seed")
+    parser.add_argument(
+        "--stub-latency",
+        type=float,
+        help="Use the stub model with this median latency in seconds instead of the configured one",
+    )
+    parser.add_argument("--stub-jitter", type=float, help="Log-normal spread of the stub latency")
+    parser.add_argument("--stub-parallel", type=int, help="Calls the stub serves at once")
+    parser.add_argument("--json", help="Also write the results as JSON lines to this file")
+    args = parser.parse_args()
+
+    config = AgentConfig.from_yaml(args.config)
+    if args.stub_latency is not None:
+        config.model_provider = "stub"
+        config.stub_latency = args.stub_latency
+    if args.stub_jitter is not None:
+        config.stub_jitter = args.stub_jitter
+    if args.stub_parallel is not None:
+        config.stub_parallel = args.stub_parallel
+    if not args.rates and not args.concurrency:
+        parser.error("pass --rates and/or --concurrency")
+
+    inputs = None
+    if args.inputs:
+        with open(args.inputs, "r") as f:
+            inputs = [line.strip() for line in f if line.strip()]
+
+    results = run_load_test(
+        config,
+        inputs,
+        rates=args.rates,
+        concurrency=[int(n) for n in args.concurrency or []],
+        duration=args.duration,
+        distinct=args.distinct,
+        seed=args.seed,
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            for result in results:
+                record = {**asdict(result), "error_rate": result.error_rate, "shed_rate": result.shed_rate}
+                f.write(json.dumps(record) + "\n")
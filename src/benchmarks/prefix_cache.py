@@ -0,0 +1,171 @@
+"""
+Prefill benchmark for the inline and prefix prompt layouts.
+
+Sends the same inputs to Ollama with each layout and reports the prompt
+prefill time Ollama measured (prompt_eval_duration), so the time saved by
+KV-cache reuse of a static prompt prefix can be read off directly.
+
+Usage:
+    python -m src.benchmarks.prefix_cache                 # agent.yaml test cases
+    python -m src.benchmarks.prefix_cache -c my.yaml --repeat 3
+"""
+
+import argparse
+import logging
+import statistics
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from src.agent.builder import open_repository
+from src.agent.config_loader import AgentConfig
+from src.agent.prompts import PromptLayout
+from src.embeddings import EmbeddingFactory
+from src.llm import LLMFactory
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VariantResult:
+    """Prefill measurements for one layout variant."""
+
+    name: str
+    prefill_ms: List[float] = field(default_factory=list)
+    prompt_tokens: List[int] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.prefill_ms)
+
+    def row(self) -> str:
+        """Format the result as a table row."""
+        return (
+            f"{self.name:<24} {len(self.prefill_ms):>8} "
+            f"{statistics.mean(self.prompt_tokens):>12.0f} "
+            f"{statistics.mean(self.prefill_ms):>12.1f} "
+            f"{statistics.median(self.prefill_ms):>10.1f} "
+            f"{self.total_ms:>12.0f}"
+        )
+
+
+def order_by_context(items: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Order (input, context) pairs so identical contexts are adjacent."""
+    first_seen = {}
+    for _, context in items:
+        first_seen.setdefault(context, len(first_seen))
+    return sorted(items, key=lambda item: first_seen[item[1]])
+
+
+def run_variant(
+    name: str,
+    layout: PromptLayout,
+    items: List[Tuple[str, str]],
+    llm,
+) -> VariantResult:
+    """Send every (input, context) pair with one layout and collect prefill times."""
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", layout.system_template),
+        ("human", layout.human_template),
+    ])
+    result = VariantResult(name)
+    for input_text, context in items:
+        message = llm.invoke(prompt.format_messages(context=context, input=input_text))
+        metadata = message.response_metadata
+        if "prompt_eval_duration" not in metadata:
+            raise RuntimeError("The model did not report prompt_eval_duration (Ollama required)")
+        result.prefill_ms.append(metadata["prompt_eval_duration"] / 1e6)
+        result.prompt_tokens.append(metadata.get("prompt_eval_count", 0))
+    return result
+
+
+def run_benchmark(
+    config: AgentConfig,
+    inputs: Optional[List[str]] = None,
+    repeat: int = 2,
+) -> List[VariantResult]:
+    """
+    Measure prefill time for each layout variant.
+
+    Args:
+        config: Agent configuration (model, prompts and index).
+        inputs: Inputs to send (default: the config's test cases).
+        repeat: How many times the input list is sent per variant.
+
+    Returns:
+        One VariantResult per variant, baseline first.
+    """
+    inputs = inputs or config.test_cases
+    if not inputs:
+        raise ValueError("No inputs: pass --inputs or configure test_cases")
+
+    embedding_provider = EmbeddingFactory.create_from_agent_config(config)
+    llm_provider = LLMFactory.create_from_agent_config(config)
+    repository = None
+    try:
+        repository, _, _ = open_repository(config, embedding_provider.get_embeddings())
+        items = [
+            (
+                text,
+                "\n\n".join(
+                    doc.page_content for doc in repository.search(text, k=config.retriever_k)
+                ),
+            )
+            for text in inputs
+        ] * repeat
+        llm = llm_provider.get_llm()
+
+        variants = [
+            ("inline", "inline", items),
+            ("prefix", "prefix", items),
+            ("prefix + context order", "prefix", order_by_context(items)),
+        ]
+        results = []
+        for name, mode, ordered in variants:
+            logger.info(f"Running variant: {name}")
+            layout = PromptLayout(
+                config.system_prompt,
+                config.human_prompt,
+                layout=mode,
+                context_template=config.context_template,
+            )
+            results.append(run_variant(name, layout, ordered, llm))
+        return results
+    finally:
+        if repository is not None:
+            repository.close()
+        LLMFactory.release(llm_provider)
+        EmbeddingFactory.release(embedding_provider)
+
+
+def print_report(results: List[VariantResult]) -> None:
+    """Print a table of prefill times and the time saved against the baseline."""
+    print(
+        f"\n{'variant':<24} {'requests':>8} {'prompt tok':>12} "
+        f"{'prefill ms':>12} {'p50 ms':>10} {'total ms':>12}"
+    )
+    for result in results:
+        print(result.row())
+
+    baseline = results[0]
+    for result in results[1:]:
+        saved = baseline.total_ms - result.total_ms
+        share = saved / baseline.total_ms if baseline.total_ms else 0.0
+        print(f"Prefill saved by {result.name}: {saved:.0f} ms ({share:.0%})")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Benchmark prompt prefill per prompt layout")
+    parser.add_argument("--config", "-c", default="agent.yaml", help="Agent configuration file")
+    parser.add_argument("--inputs", help="Text file with one input per line (default: test cases)")
+    parser.add_argument("--repeat", type=int, default=2, help="Times each input is sent per variant")
+    args = parser.parse_args()
+
+    inputs = None
+    if args.inputs:
+        with open(args.inputs, "r") as f:
+            inputs = [line.strip() for line in f if line.strip()]
+
+    print_report(run_benchmark(AgentConfig.from_yaml(args.config), inputs, args.repeat))
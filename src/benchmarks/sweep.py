@@ -0,0 +1,346 @@
+"""
+Parameter sweep over chunking and retrieval settings.
+
+Builds one index per (chunk_size, chunk_overlap, use_md_headers) variant and
+measures every retriever_k against it on the configured test cases. Each
+row of the comparison table reports:
+- the build time and index size on disk;
+- p95 vector-search latency;
+- the average tokens of retrieved context;
+- the hit rate: the share of labelled inputs where some retrieved chunk
+  contains one of the input's expected snippets.
+
+Parsed documents come from the ingest artifact cache, and embeddings are
+cached on disk by text, so variants that produce identical chunks (and the
+test queries) are embedded once. Build times then only include embedding
+the chunks that weren't cached yet; with --cold every build embeds all of
+its chunks, so build times are comparable across variants and runs.
+Indexes whose inputs are unchanged are reused on later runs.
+
+Expected chunks are given as a YAML list:
+
+    - input: "Create a plan for a school garden."
+      expected: ["Create", "design, assemble, construct"]
+
+Usage:
+    python -m src.benchmarks.sweep --chunk-size 500,1000 --chunk-overlap 0,200 --k 3,5
+    python -m src.benchmarks.sweep --md-headers true,false --expected expected.yaml -o sweep.csv
+"""
+
+import argparse
+import csv
+import dataclasses
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_core.embeddings import Embeddings
+
+from src.agent.config_loader import AgentConfig
+from src.benchmarks.load_generator import percentile
+from src.embeddings import EmbeddingFactory
+from src.ingest import IngestPipeline
+from src.ingest.artifact_cache import key_digest
+from src.repositories import AdaptiveRetriever, RepositoryFactory, VectorStoreRepository
+
+logger = logging.getLogger(__name__)
+
+BUILD_FILE = "sweep_build.json"
+
+
+@dataclass
+class SweepResult:
+    """Measurements for one (index variant, k) combination."""
+
+    chunk_size: int
+    chunk_overlap: int
+    use_md_headers: bool
+    k: int
+    chunks: int
+    build_s: float
+    reused: bool
+    index_bytes: int
+    query_p95_ms: float
+    context_tokens: float
+    hit_rate: Optional[float]
+
+    def row(self) -> str:
+        """Format the result as a table row."""
+        hit_rate = "n/a" if self.hit_rate is None else f"{self.hit_rate:.0%}"
+        build = f"{self.build_s:.1f}{'*' if self.reused else ''}"
+        return (
+            f"{self.chunk_size:>6} {self.chunk_overlap:>7} {str(self.use_md_headers):>6} "
+            f"{self.k:>3} {self.chunks:>7} {build:>9} {self.index_bytes / 2**20:>9.1f} "
+            f"{self.query_p95_ms:>8.1f} {self.context_tokens:>8.0f} {hit_rate:>6}"
+        )
+
+
+def load_expected(path: str) -> Dict[str, List[str]]:
+    """Read labelled expected snippets, keyed by input text."""
+    with open(path, "r") as f:
+        entries = yaml.safe_load(f) or []
+    return {entry["input"]: list(entry["expected"]) for entry in entries}
+
+
+def cached_embeddings(embeddings: Embeddings, config: AgentConfig, cache_dir: Path) -> Embeddings:
+    """Wrap embeddings in an on-disk cache keyed by model and text."""
+    # LocalFileStore keys must be path-safe, so the model identity is hashed
+    namespace = key_digest(
+        config.embedding_provider,
+        config.embedding_model,
+        str(config.embedding_max_seq_length),
+        config.embedding_precision,
+    )[:16]
+    return CacheBackedEmbeddings.from_bytes_store(
+        embeddings,
+        LocalFileStore(str(cache_dir)),
+        namespace=namespace,
+        query_embedding_cache=True,
+    )
+
+
+def build_variant(
+    config: AgentConfig,
+    embeddings: Embeddings,
+) -> Tuple[VectorStoreRepository, float, bool, int]:
+    """
+    Open a variant's index, building it if its inputs changed.
+
+    Returns:
+        Tuple of (repository, build seconds, reused, chunk count). A reused
+        index reports the build time recorded when it was built.
+    """
+    pipeline = IngestPipeline(config)
+    persist_dir = Path(config.persist_dir)
+    repository = RepositoryFactory.create_from_agent_config(
+        config, embeddings, persist_dir=str(persist_dir)
+    )
+    build_file = persist_dir / BUILD_FILE
+    if pipeline.is_current(str(persist_dir)) and build_file.exists() and repository.load():
+        with open(build_file, "r") as f:
+            recorded = json.load(f)
+        return repository, recorded["build_s"], True, recorded["chunks"]
+
+    # Chunking counts towards the build; parsing comes from the shared cache
+    start = time.perf_counter()
+    chunks = pipeline.build(repository, str(persist_dir))
+    build_s = time.perf_counter() - start
+    with open(build_file, "w") as f:
+        json.dump({"build_s": build_s, "chunks": chunks}, f)
+    return repository, build_s, False, chunks
+
+
+def measure(
+    repository: VectorStoreRepository,
+    config: AgentConfig,
+    queries: List[Tuple[str, List[float]]],
+    expected: Dict[str, List[str]],
+    k: int,
+    repeat: int = 3,
+    chars_per_token: float = 4.0,
+) -> Tuple[float, float, Optional[float]]:
+    """
+    Retrieve for every query at depth k.
+
+    Search latency is timed from pre-embedded queries, so it reflects the
+    index variant rather than the embedding model. With retrieval_mode
+    adaptive, k is the candidate depth (max_k) that the score cuts apply to.
+
+    Returns:
+        Tuple of (p95 search ms, average context tokens, hit rate or None
+        without labels).
+    """
+    adaptive = None
+    if config.retrieval_mode == "adaptive":
+        adaptive = AdaptiveRetriever(
+            repository=repository,
+            min_k=config.min_k,
+            max_k=k,
+            score_threshold=config.score_threshold,
+            score_drop=config.score_drop,
+        )
+
+    latencies = []
+    tokens = []
+    hits = []
+    for text, vector in queries:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            scored = repository.search_by_vector_with_scores(vector, k=k)
+            latencies.append((time.perf_counter() - start) * 1000)
+        documents = adaptive.select(scored) if adaptive else [doc for doc, _ in scored]
+
+        tokens.append(sum(len(doc.page_content) for doc in documents) / chars_per_token)
+        if text in expected:
+            contents = [_normalize(doc.page_content) for doc in documents]
+            snippets = [_normalize(snippet) for snippet in expected[text]]
+            hits.append(any(s in c for s in snippets for c in contents))
+
+    return (
+        percentile(sorted(latencies), 95),
+        sum(tokens) / len(tokens) if tokens else 0.0,
+        sum(hits) / len(hits) if hits else None,
+    )
+
+
+def run_sweep(
+    config: AgentConfig,
+    chunk_sizes: List[int],
+    chunk_overlaps: List[int],
+    md_headers: List[bool],
+    ks: List[int],
+    expected: Optional[Dict[str, List[str]]] = None,
+    work_dir: str = "./.sweep",
+    repeat: int = 3,
+    chars_per_token: float = 4.0,
+    cold: bool = False,
+) -> List[SweepResult]:
+    """
+    Build every index variant and measure each k against it.
+
+    Args:
+        config: Base configuration; the swept settings are overridden.
+        chunk_sizes: chunk_size values.
+        chunk_overlaps: chunk_overlap values (skipped where >= chunk_size).
+        md_headers: use_md_headers values.
+        ks: retriever_k values.
+        expected: Expected snippets by input, for the hit rate.
+        work_dir: Directory for variant indexes and the embedding cache.
+        repeat: Timed searches per query.
+        chars_per_token: Characters per token for the context estimate.
+        cold: Build without the embedding cache, for comparable build times.
+
+    Returns:
+        One SweepResult per (variant, k).
+    """
+    expected = expected or {}
+    inputs = list(dict.fromkeys(config.test_cases + list(expected)))
+    if not inputs:
+        raise ValueError("No queries: configure test_cases or pass --expected")
+
+    work = Path(work_dir)
+    embedding_provider = EmbeddingFactory.create_from_agent_config(config)
+    try:
+        model = embedding_provider.get_embeddings()
+        embeddings = cached_embeddings(model, config, work / "embeddings")
+        # Embedded like the agent embeds a query, which may differ from documents
+        queries = [(text, embeddings.embed_query(text)) for text in inputs]
+
+        results = []
+        for chunk_size in chunk_sizes:
+            for chunk_overlap in chunk_overlaps:
+                if chunk_overlap >= chunk_size:
+                    continue
+                for use_md_headers in md_headers:
+                    name = f"cs{chunk_size}-ov{chunk_overlap}-md{int(use_md_headers)}"
+                    variant = dataclasses.replace(
+                        config,
+                        chunk_size=chunk_size,
+                        chunk_overlap=chunk_overlap,
+                        use_md_headers=use_md_headers,
+                        # Cold builds are kept apart so that a reused index
+                        # reports a build time measured the same way
+                        persist_dir=str(work / ("cold-indexes" if cold else "indexes") / name),
+                        use_snapshots=False,
+                    )
+                    logger.info(f"Sweeping variant {name}")
+                    build_embeddings = model if cold else embeddings
+                    repository, build_s, reused, chunks = build_variant(variant, build_embeddings)
+                    try:
+                        index_bytes = _directory_bytes(Path(variant.persist_dir))
+                        for k in ks:
+                            p95, tokens, hit_rate = measure(
+                                repository, variant, queries, expected, k, repeat, chars_per_token
+                            )
+                            result = SweepResult(
+                                chunk_size, chunk_overlap, use_md_headers, k, chunks,
+                                build_s, reused, index_bytes, p95, tokens, hit_rate,
+                            )
+                            print(result.row(), flush=True)
+                            results.append(result)
+                    finally:
+                        repository.close()
+        return results
+    finally:
+        EmbeddingFactory.release(embedding_provider)
+
+
+def print_header() -> None:
+    """Print the header of the comparison table."""
+    print(
+        f"\n{'chunk':>6} {'overlap':>7} {'md':>6} {'k':>3} {'chunks':>7} "
+        f"{'build s':>9} {'index MB':>9} {'p95 ms':>8} {'ctx tok':>8} {'hits':>6}"
+    )
+
+
+def write_csv(results: List[SweepResult], path: str) -> None:
+    """Write the comparison table as CSV."""
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=[field.name for field in dataclasses.fields(SweepResult)])
+        writer.writeheader()
+        for result in results:
+            writer.writerow(dataclasses.asdict(result))
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse whitespace for snippet matching."""
+    return " ".join(text.lower().split())
+
+
+def _directory_bytes(path: Path) -> int:
+    """Total size of the files below a directory."""
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _values(cast):
+    """Parse a comma-separated list with cast."""
+    return lambda text: [cast(part.strip()) for part in text.split(",") if part.strip()]
+
+
+def _bool(text: str) -> bool:
+    if text.lower() in ("true", "yes", "1"):
+        return True
+    if text.lower() in ("false", "no", "0"):
+        return False
+    raise argparse.ArgumentTypeError(f"Not a boolean: {text}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Sweep chunking and retrieval settings")
+    parser.add_argument("--config", "-c", default="agent.yaml", help="Agent configuration file")
+    parser.add_argument("--chunk-size", type=_values(int), help="chunk_size values (default: config)")
+    parser.add_argument("--chunk-overlap", type=_values(int), help="chunk_overlap values (default: config)")
+    parser.add_argument("--md-headers", type=_values(_bool), help="use_md_headers values, e.g. true,false")
+    parser.add_argument("--k", type=_values(int), help="retriever_k values (default: config)")
+    parser.add_argument("--expected", help="YAML list of {input, expected: [snippets]} for the hit rate")
+    parser.add_argument("--work-dir", default="./.sweep", help="Variant indexes and embedding cache")
+    parser.add_argument("--cold", action="store_true", help="Build without the embedding cache")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed searches per query")
+    parser.add_argument("--chars-per-token", type=float, default=4.0, help="For the context token estimate")
+    parser.add_argument("--output", "-o", help="Also write the table as CSV to this file")
+    args = parser.parse_args()
+
+    config = AgentConfig.from_yaml(args.config)
+    print_header()
+    results = run_sweep(
+        config,
+        chunk_sizes=args.chunk_size or [config.chunk_size],
+        chunk_overlaps=args.chunk_overlap or [config.chunk_overlap],
+        md_headers=args.md_headers or [config.use_md_headers],
+        ks=args.k or [config.retriever_k],
+        expected=load_expected(args.expected) if args.expected else None,
+        work_dir=args.work_dir,
+        repeat=args.repeat,
+        chars_per_token=args.chars_per_token,
+        cold=args.cold,
+    )
+    print("* index reused from an earlier run; build time is from when it was built")
+    if args.output:
+        write_csv(results, args.output)
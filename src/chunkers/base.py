@@ -9,6 +9,9 @@ from langchain_core.documents import Document
 class ChunkingStrategy(ABC):
     """Abstract base class for document chunking strategies."""
 
+    # Bump when a chunker's output changes to invalidate cached chunks
+    version: str = "1"
+
     @abstractmethod
     def chunk(self, documents: List[Document]) -> List[Document]:
         """
@@ -21,3 +24,16 @@ class ChunkingStrategy(ABC):
             List of chunked Document objects.
         """
         pass
+
+    def fingerprint(self) -> str:
+        """
+        Describe the strategy and its settings for cache keys.
+
+        Returns:
+            String that changes whenever the chunker's output would.
+        """
+        settings = {
+            "chunk_size": getattr(self, "chunk_size", None),
+            "chunk_overlap": getattr(self, "chunk_overlap", None),
+        }
+        return f"{type(self).__name__}:v{self.version}:{sorted(settings.items())}"
@@ -0,0 +1,13 @@
+"""Runtime diagnostics: memory accounting and stage profiling."""
+
+from src.diagnostics.memory import MemoryPhase, MemoryTracker, tracker
+from src.diagnostics.profiling import ProfilingCallbackHandler, StageProfiler, profiler
+
+__all__ = [
+    "MemoryPhase",
+    "MemoryTracker",
+    "tracker",
+    "ProfilingCallbackHandler",
+    "StageProfiler",
+    "profiler",
+]
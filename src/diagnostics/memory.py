@@ -0,0 +1,185 @@
+"""Memory accounting by component, backed by tracemalloc snapshots."""
+
+import logging
+import resource
+import sys
+import threading
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Components in attribution order: an allocation belongs to the first one
+# found anywhere in its traceback, so e.g. chunks built by the text
+# splitter under src/ingest count as ingest, not as LangChain. Patterns are
+# package paths, matched against the start of each frame's module path
+# (relative to site-packages, or to this repository for our own code)
+COMPONENTS = [
+    ("embedding model", ("sentence_transformers", "transformers", "torch", "tokenizers",
+                         "langchain_huggingface", "src/embeddings")),
+    ("vector store", ("chromadb", "hnswlib", "langchain_community/vectorstores",
+                      "langchain_chroma", "src/repositories")),
+    ("ingest", ("src/ingest", "src/chunkers", "src/loaders",
+                "langchain_text_splitters", "unstructured")),
+    ("langchain", ("langchain", "langchain_core", "langchain_community", "langchain_ollama",
+                   "langchain_chroma", "pydantic", "pydantic_core")),
+    ("agent", ("src",)),
+]
+OTHER = "other"
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_PACKAGE_DIRS = ("/site-packages/", "/dist-packages/")
+
+
+@dataclass
+class MemoryPhase:
+    """Memory in use at one point of the agent's life."""
+
+    phase: str
+    rss_bytes: int
+    traced_bytes: int
+    components: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def untraced_bytes(self) -> int:
+        """RSS not seen by tracemalloc: native allocations, interpreter, libraries."""
+        return max(self.rss_bytes - self.traced_bytes, 0)
+
+
+class MemoryTracker:
+    """
+    Records per-component memory at named phases.
+
+    Python allocations are attributed to components from tracemalloc
+    tracebacks. Native memory (model weights held by torch, the HNSW index)
+    is invisible to tracemalloc, so each phase also records RSS, and
+    components can note native sizes they know, such as parameter bytes.
+    """
+
+    def __init__(self):
+        self.phases: List[MemoryPhase] = []
+        self.native: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        """Whether tracemalloc is running."""
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 25) -> None:
+        """
+        Start tracing allocations.
+
+        Call this before the agent is built; allocations made earlier are
+        not attributed.
+
+        Args:
+            frames: Traceback depth kept per allocation.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.record("start")
+
+    def stop(self) -> None:
+        """Stop tracing."""
+        tracemalloc.stop()
+
+    def record(self, phase: str) -> Optional[MemoryPhase]:
+        """
+        Take a snapshot and record component totals for a phase.
+
+        Does nothing (and returns None) unless tracing was started.
+        """
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot()
+        components: Dict[str, int] = {}
+        for trace in snapshot.traces:
+            name = _component([frame.filename for frame in trace.traceback])
+            components[name] = components.get(name, 0) + trace.size
+        traced, _ = tracemalloc.get_traced_memory()
+        result = MemoryPhase(phase, current_rss(), traced, components)
+        with self._lock:
+            self.phases.append(result)
+        logger.info(f"Memory at {phase}: RSS {result.rss_bytes / 2**20:.1f} MB")
+        return result
+
+    def note(self, component: str, nbytes: int) -> None:
+        """Record a native allocation size a component knows about."""
+        with self._lock:
+            self.native[component] = nbytes
+
+    def print_report(self) -> None:
+        """Print one row per phase with RSS and per-component MB."""
+        if not self.phases:
+            print("No memory phases recorded (tracing was not started)")
+            return
+        names = [name for name, _ in COMPONENTS] + [OTHER]
+        width = max(len(phase.phase) for phase in self.phases) + 2
+        columns = ["RSS", "traced"] + names + ["untraced"]
+        print("\nMemory by component (MB); untraced = native allocations and runtime")
+        print(f"{'phase':<{width}}" + "".join(f"{column[:15]:>16}" for column in columns))
+        for phase in self.phases:
+            values = [phase.rss_bytes, phase.traced_bytes]
+            values += [phase.components.get(name, 0) for name in names]
+            values.append(phase.untraced_bytes)
+            print(f"{phase.phase:<{width}}" + "".join(f"{v / 2**20:>16.1f}" for v in values))
+        for component, nbytes in self.native.items():
+            print(f"Native {component}: {nbytes / 2**20:.1f} MB")
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _component(filenames: List[str]) -> str:
+    """Attribute a traceback to a component."""
+    paths = [_module_path(name) for name in filenames]
+    for name, patterns in COMPONENTS:
+        for path in paths:
+            if path and any(path == p or path.startswith(f"{p}/") for p in patterns):
+                return name
+    return OTHER
+
+
+_module_paths: Dict[str, Optional[str]] = {}
+
+
+def _module_path(filename: str) -> Optional[str]:
+    """
+    Get a source file's path relative to site-packages or this repository.
+
+    Returns None for other files (standard library, frozen modules), so a
+    checkout or virtualenv living under a directory that happens to be
+    named like a package is not mistaken for that package.
+    """
+    if filename in _module_paths:
+        return _module_paths[filename]
+    path = filename.replace("\\", "/")
+    relative = None
+    for marker in _PACKAGE_DIRS:
+        if marker in path:
+            relative = path.rsplit(marker, 1)[1]
+            break
+    else:
+        try:
+            relative = Path(filename).resolve().relative_to(_REPO_ROOT).as_posix()
+        except (OSError, ValueError):
+            pass
+    _module_paths[filename] = relative
+    return relative
+
+
+# Process-wide tracker: the agent builder records phases on it, and they are
+# only measured once start() has been called
+tracker = MemoryTracker()
@@ -0,0 +1,287 @@
+"""Sampling profiler scoped to pipeline stages."""
+
+import logging
+import sys
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+# Leading path parts dropped from frame labels
+_PATH_MARKERS = ("site-packages/", "dist-packages/", "/lib/python")
+
+# Thread and event-loop plumbing, left out of the hotspots by total samples
+_PLUMBING = ("(threading.py)", "(concurrent/futures/", "(asyncio/", "(contextlib.py)")
+
+
+class StageProfiler:
+    """
+    Samples the stacks of threads that are inside a named stage.
+
+    Code marks its stages with `with profiler.stage("chunker"):`; while the
+    profiler runs, a background thread records the stack of every thread in
+    a stage every `interval` seconds, attributed to its innermost stage.
+    Samples are wall-clock: time spent waiting (on a socket, a lock, another
+    thread) shows up in the frame that waits. Stages are tracked per thread,
+    so concurrent coroutines on one event loop share their thread's stage.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples.
+        """
+        self.interval = interval
+        self.stacks: Dict[str, Counter] = defaultdict(Counter)
+        self._stages: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether samples are being taken."""
+        return self._thread is not None
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Start sampling in a background thread."""
+        if self._thread is not None:
+            return
+        self.interval = interval or self.interval
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="stage-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Profiling pipeline stages every {self.interval * 1000:.0f} ms")
+
+    def stop(self) -> None:
+        """Stop sampling; the samples taken are kept."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Attribute the current thread's samples to a stage while inside."""
+        if self._thread is None:
+            yield
+            return
+        thread_id = self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit(thread_id, name)
+
+    def enter(self, name: str) -> int:
+        """Enter a stage on the current thread; returns the thread id for exit()."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._stages.setdefault(thread_id, []).append(name)
+        return thread_id
+
+    def exit(self, thread_id: int, name: str) -> None:
+        """Leave the innermost stage of that name on a thread."""
+        with self._lock:
+            stack = self._stages.get(thread_id, [])
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i] == name:
+                    del stack[i]
+                    break
+            if not stack:
+                self._stages.pop(thread_id, None)
+
+    def _sample(self) -> None:
+        """Record the stack of each thread in a stage until stopped."""
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = {tid: stack[-1] for tid, stack in self._stages.items() if stack}
+            if not active:
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, name in active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        self.stacks[name][_collapse(frame)] += 1
+
+    def write(self, out_dir: str, top: int = 15) -> List[Path]:
+        """
+        Write one collapsed-stack file per stage and a hotspot summary.
+
+        The .collapsed files hold "frame;frame;... count" lines, the input
+        format of flamegraph.pl, speedscope and inferno.
+
+        Args:
+            out_dir: Directory to write to.
+            top: Hotspots listed per stage in summary.txt.
+
+        Returns:
+            Paths of the files written.
+        """
+        path = Path(out_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        written = []
+        with self._lock:
+            stacks = {name: Counter(counts) for name, counts in self.stacks.items()}
+        for name, counts in stacks.items():
+            stage_path = path / f"{_filename(name)}.collapsed"
+            with open(stage_path, "w") as f:
+                for stack, count in counts.most_common():
+                    f.write(f"{stack} {count}\n")
+            written.append(stage_path)
+        summary_path = path / "summary.txt"
+        with open(summary_path, "w") as f:
+            f.write(self.summary(top))
+        written.append(summary_path)
+        return written
+
+    def summary(self, top: int = 15) -> str:
+        """
+        Get the top functions of each stage by self and total samples.
+
+        Self samples are those where the function was running; total
+        samples include time spent in the functions it called. The total
+        ranking leaves out thread plumbing and the callers every sample of
+        the stage shares, which would otherwise fill it.
+        """
+        with self._lock:
+            stacks = {name: Counter(counts) for name, counts in self.stacks.items()}
+        if not stacks:
+            return "No profile samples recorded\n"
+
+        totals = {name: sum(counts.values()) for name, counts in stacks.items()}
+        lines = ["Samples by stage (wall-clock, ~seconds = samples x interval)"]
+        for name in sorted(totals, key=totals.get, reverse=True):
+            seconds = totals[name] * self.interval
+            lines.append(f"  {name:<12} {totals[name]:>8} samples  ~{seconds:.2f}s")
+
+        for name in sorted(totals, key=totals.get, reverse=True):
+            split = {stack: stack.split(";") for stack in stacks[name]}
+            shared = _shared_callers(list(split.values()))
+            own: Counter = Counter()
+            inclusive: Counter = Counter()
+            for stack, count in stacks[name].items():
+                frames = split[stack]
+                own[frames[-1]] += count
+                for frame in set(frames[shared:]):
+                    if not any(marker in frame for marker in _PLUMBING):
+                        inclusive[frame] += count
+            lines.append(f"\n[{name}] top {top} by self samples")
+            for frame, count in own.most_common(top):
+                lines.append(f"  {count / totals[name]:>6.1%}  {frame}")
+            lines.append(f"[{name}] top {top} by total samples")
+            for frame, count in inclusive.most_common(top):
+                lines.append(f"  {count / totals[name]:>6.1%}  {frame}")
+        return "\n".join(lines) + "\n"
+
+    def print_summary(self, top: int = 15) -> None:
+        """Print the hotspot summary."""
+        print("\n" + self.summary(top))
+
+    def reset(self) -> None:
+        """Discard the samples taken so far."""
+        with self._lock:
+            self.stacks.clear()
+
+
+class ProfilingCallbackHandler(BaseCallbackHandler):
+    """
+    Marks LangChain retriever and model runs as profiler stages.
+
+    Runs inline so that the stage is entered on the thread doing the work.
+    """
+
+    run_inline = True
+
+    def __init__(self, profiler: StageProfiler):
+        self.profiler = profiler
+        self._runs: Dict[UUID, tuple] = {}
+
+    def on_retriever_start(
+        self, serialized: Dict[str, Any], query: str, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._enter(run_id, "retrieval")
+
+    def on_retriever_end(self, documents: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._exit(run_id)
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._exit(run_id)
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._enter(run_id, "llm")
+
+    def on_llm_start(
+        self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._enter(run_id, "llm")
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._exit(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._exit(run_id)
+
+    def _enter(self, run_id: UUID, name: str) -> None:
+        if self.profiler.running:
+            self._runs[run_id] = (self.profiler.enter(name), name)
+
+    def _exit(self, run_id: UUID) -> None:
+        entry = self._runs.pop(run_id, None)
+        if entry is not None:
+            self.profiler.exit(*entry)
+
+
+def _collapse(frame: Any) -> str:
+    """Format a stack root first, one "function (file)" label per frame."""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(f"{code.co_name} ({_short_path(code.co_filename)})".replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _shared_callers(stacks: List[List[str]]) -> int:
+    """Length of the caller chain all stacks share, keeping at least each leaf."""
+    shared = min(len(frames) for frames in stacks) - 1
+    for depth in range(shared):
+        if len({frames[depth] for frames in stacks}) > 1:
+            return depth
+    return max(shared, 0)
+
+
+def _short_path(filename: str) -> str:
+    """Trim a source path to its package-relative part."""
+    path = filename.replace("\\", "/")
+    for marker in _PATH_MARKERS:
+        if marker in path:
+            path = path.rsplit(marker, 1)[1]
+            if marker == "/lib/python":
+                path = path.split("/", 1)[-1]
+            break
+    else:
+        if "/src/" in path:
+            path = "src/" + path.rsplit("/src/", 1)[1]
+    return path
+
+
+def _filename(stage: str) -> str:
+    """Make a stage name safe to use as a file name."""
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in stage)
+
+
+# Process-wide profiler: pipeline stages are marked on it, and only sampled
+# once start() has been called
+profiler = StageProfiler()
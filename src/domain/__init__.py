@@ -1,5 +1,5 @@
 """Domain models for the RAG agent."""
 
-from src.domain.models import AgentResponse, ClassificationResult
+from src.domain.models import AgentResponse, ClassificationResult, StructuredResult
 
-__all__ = ["AgentResponse", "ClassificationResult"]
+__all__ = ["AgentResponse", "ClassificationResult", "StructuredResult"]
@@ -4,6 +4,15 @@ from dataclasses import dataclass
 from typing import Optional
 
 
+@dataclass
+class StructuredResult:
+    """Parsed answer of the structured and label output modes."""
+
+    level: str
+    confidence: Optional[float] = None
+    justification: Optional[str] = None
+
+
 @dataclass
 class AgentResponse:
     """Represents a response from the RAG agent."""
@@ -12,6 +21,12 @@ class AgentResponse:
     output: str
     source_documents: int
     error: Optional[str] = None
+    fast_path: bool = False
+    result: Optional[StructuredResult] = None
+    context_chars: int = 0
+    overloaded: bool = False
+    # Characters of the union context a grouped call was answered from
+    group_context_chars: int = 0
 
     @property
     def is_success(self) -> bool:
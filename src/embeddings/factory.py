@@ -1,9 +1,10 @@
 """Factory for creating embedding providers."""
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from src.embeddings.base import EmbeddingProvider
 from src.embeddings.huggingface_embeddings import HuggingFaceEmbeddingProvider
+from src.registry.model_registry import ModelRegistry
 
 if TYPE_CHECKING:
     from src.agent.config_loader import AgentConfig
@@ -12,14 +13,27 @@ if TYPE_CHECKING:
 class EmbeddingFactory:
     """Factory for creating embedding providers."""
 
-    @staticmethod
-    def create(model_name: str, provider: str = "huggingface") -> EmbeddingProvider:
+    # Identical model configs share one provider across the process
+    _registry = ModelRegistry("embeddings")
+
+    @classmethod
+    def create(
+        cls,
+        model_name: str,
+        provider: str = "huggingface",
+        max_seq_length: Optional[int] = None,
+        precision: str = "float32",
+    ) -> EmbeddingProvider:
         """
-        Create an embedding provider.
+        Create or reuse a shared embedding provider.
+
+        Each call takes a reference that should be returned with release().
 
         Args:
             model_name: Name of the embedding model.
             provider: Provider type ("huggingface" supported).
+            max_seq_length: Token limit per text (None keeps the model's).
+            precision: Weight dtype ("float32", "float16" or "bfloat16").
 
         Returns:
             EmbeddingProvider instance.
@@ -28,9 +42,26 @@ class EmbeddingFactory:
             ValueError: If provider is not supported.
         """
         if provider == "huggingface":
-            return HuggingFaceEmbeddingProvider(model_name=model_name)
+            return cls._registry.acquire(
+                (provider, model_name, max_seq_length, precision),
+                lambda: HuggingFaceEmbeddingProvider(
+                    model_name=model_name,
+                    max_seq_length=max_seq_length,
+                    precision=precision,
+                ),
+            )
         raise ValueError(f"Unsupported embedding provider: {provider}")
 
+    @classmethod
+    def release(cls, embedding_provider: EmbeddingProvider) -> None:
+        """
+        Release a provider returned by create().
+
+        Args:
+            embedding_provider: Provider to release.
+        """
+        cls._registry.release(embedding_provider)
+
     @staticmethod
     def create_from_agent_config(config: "AgentConfig") -> EmbeddingProvider:
         """
@@ -45,4 +76,6 @@ class EmbeddingFactory:
         return EmbeddingFactory.create(
             model_name=config.embedding_model,
             provider=config.embedding_provider,
+            max_seq_length=config.embedding_max_seq_length,
+            precision=config.embedding_precision,
         )
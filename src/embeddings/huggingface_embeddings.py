@@ -1,28 +1,58 @@
 """HuggingFace embedding provider implementation."""
 
 import logging
+from typing import Optional
 
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.embeddings import Embeddings
 
+from src.diagnostics.memory import tracker
 from src.embeddings.base import EmbeddingProvider
 
 logger = logging.getLogger(__name__)
 
+PRECISIONS = ("float32", "float16", "bfloat16")
+
 
 class HuggingFaceEmbeddingProvider(EmbeddingProvider):
     """Embedding provider using HuggingFace models."""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        max_seq_length: Optional[int] = None,
+        precision: str = "float32",
+    ):
         """
         Initialize the HuggingFace embedding provider.
 
         Args:
             model_name: HuggingFace model name.
+            max_seq_length: Token limit per text; longer texts are truncated.
+                Lower limits shrink activation memory (None keeps the model's).
+            precision: Weight dtype. "float16" and "bfloat16" halve the
+                memory held by the weights.
+
+        Raises:
+            ValueError: If the precision is unknown.
         """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported embedding precision: {precision}")
         self._model_name = model_name
         self._embeddings = HuggingFaceEmbeddings(model_name=model_name)
-        logger.info(f"Initialized HuggingFace embeddings with model: {model_name}")
+
+        model = self._embeddings._client
+        if max_seq_length is not None:
+            model.max_seq_length = max_seq_length
+        if precision != "float32":
+            import torch
+
+            model.to(getattr(torch, precision))
+        tracker.note(f"embedding weights ({model_name})", self.memory_bytes())
+        logger.info(
+            f"Initialized HuggingFace embeddings with model: {model_name} "
+            f"({precision}, max_seq_length={model.max_seq_length})"
+        )
 
     def get_embeddings(self) -> Embeddings:
         """Get the HuggingFace embeddings instance."""
@@ -32,3 +62,9 @@ class HuggingFaceEmbeddingProvider(EmbeddingProvider):
     def model_name(self) -> str:
         """Get the embedding model name."""
         return self._model_name
+
+    def memory_bytes(self) -> int:
+        """Get the bytes held by the model's parameters and buffers."""
+        model = self._embeddings._client
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
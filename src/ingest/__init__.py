@@ -0,0 +1,6 @@
+"""Stage-cached document ingestion pipeline."""
+
+from src.ingest.artifact_cache import ArtifactCache, DocumentStream
+from src.ingest.pipeline import IngestPipeline
+
+__all__ = ["ArtifactCache", "DocumentStream", "IngestPipeline"]
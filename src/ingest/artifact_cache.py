@@ -0,0 +1,199 @@
+"""On-disk cache for intermediate ingest artifacts."""
+
+import hashlib
+import logging
+import os
+import pickle
+import struct
+import zlib
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Streamed artifacts: an 8-byte document count, then length-prefixed frames
+_COUNT = struct.Struct("<Q")
+_FRAME = struct.Struct("<I")
+
+
+class ArtifactCache:
+    """
+    Content-addressed store for parsed documents and chunks.
+
+    Artifacts are stored as zlib-compressed pickles of (page_content,
+    metadata) pairs, one file per key, grouped by stage.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Initialize the artifact cache.
+
+        Args:
+            cache_dir: Directory to store artifacts in.
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def get(self, stage: str, key: str) -> Optional[List[Document]]:
+        """
+        Get cached documents for a stage.
+
+        Args:
+            stage: Pipeline stage name (e.g. "documents", "chunks").
+            key: Artifact key.
+
+        Returns:
+            The cached documents, or None on a miss.
+        """
+        path = self._path(stage, key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                records = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError) as e:
+            logger.warning(f"Ignoring unreadable {stage} artifact {key}: {e}")
+            return None
+        logger.info(f"Reusing cached {stage}: {key[:12]}")
+        return [Document(page_content=text, metadata=meta) for text, meta in records]
+
+    def put(self, stage: str, key: str, documents: List[Document]) -> None:
+        """
+        Store documents for a stage.
+
+        Args:
+            stage: Pipeline stage name.
+            key: Artifact key.
+            documents: Documents to store.
+        """
+        path = self._path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        records = [(doc.page_content, doc.metadata) for doc in documents]
+        data = zlib.compress(pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL))
+
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get_stream(self, stage: str, key: str) -> Optional["DocumentStream"]:
+        """
+        Get a streamed artifact, read lazily frame by frame.
+
+        Args:
+            stage: Pipeline stage name.
+            key: Artifact key.
+
+        Returns:
+            The stream, or None on a miss.
+        """
+        path = self._stream_path(stage, key)
+        if not path.exists():
+            return None
+        try:
+            stream = DocumentStream(path)
+        except (OSError, struct.error) as e:
+            logger.warning(f"Ignoring unreadable {stage} stream {key}: {e}")
+            return None
+        logger.info(f"Reusing cached {stage} stream: {key[:12]}")
+        return stream
+
+    def put_stream(
+        self,
+        stage: str,
+        key: str,
+        documents: Iterable[Document],
+        frame_size: int = 256,
+    ) -> "DocumentStream":
+        """
+        Write documents to a streamed artifact without holding them all.
+
+        Documents are compressed in frames of frame_size, so at most one
+        frame is in memory while writing or reading.
+
+        Args:
+            stage: Pipeline stage name.
+            key: Artifact key.
+            documents: Documents to store, consumed lazily.
+            frame_size: Documents per frame.
+
+        Returns:
+            The stream over the stored documents.
+        """
+        path = self._stream_path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+
+        count = 0
+        documents = iter(documents)
+        with open(tmp_path, "wb") as f:
+            f.write(_COUNT.pack(0))
+            while True:
+                frame = [(doc.page_content, doc.metadata) for doc in islice(documents, frame_size)]
+                if not frame:
+                    break
+                data = zlib.compress(pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL))
+                f.write(_FRAME.pack(len(data)))
+                f.write(data)
+                count += len(frame)
+            f.seek(0)
+            f.write(_COUNT.pack(count))
+        os.replace(tmp_path, path)
+        return DocumentStream(path)
+
+    def _path(self, stage: str, key: str) -> Path:
+        return self.cache_dir / stage / f"{key}.bin"
+
+    def _stream_path(self, stage: str, key: str) -> Path:
+        return self.cache_dir / stage / f"{key}.stream"
+
+
+class DocumentStream:
+    """
+    Documents of a streamed artifact, re-readable and with a known length.
+
+    Iterating reads one frame at a time, so the full list never exists in
+    memory. Repositories can save() it like a list.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open a streamed artifact.
+
+        Args:
+            path: Stream file written by ArtifactCache.put_stream().
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            (self._count,) = _COUNT.unpack(f.read(_COUNT.size))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Document]:
+        with open(self.path, "rb") as f:
+            f.seek(_COUNT.size)
+            while True:
+                header = f.read(_FRAME.size)
+                if not header:
+                    return
+                (size,) = _FRAME.unpack(header)
+                records = pickle.loads(zlib.decompress(f.read(size)))
+                for text, meta in records:
+                    yield Document(page_content=text, metadata=meta)
+
+
+def file_digest(path: Path) -> str:
+    """Get the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def key_digest(*parts: str) -> str:
+    """Combine key parts into a single hex digest."""
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
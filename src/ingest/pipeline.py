@@ -0,0 +1,191 @@
+"""Ingest pipeline that reruns only the stages whose inputs changed."""
+
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Collection, List, Optional
+
+from langchain_core.documents import Document
+
+from src.chunkers import ChunkerFactory, ChunkingStrategy
+from src.diagnostics.profiling import profiler
+from src.ingest.artifact_cache import ArtifactCache, DocumentStream, file_digest, key_digest
+from src.loaders import DocumentLoaderFactory, DocumentLoaderStrategy
+from src.repositories.base import VectorStoreRepository
+
+if TYPE_CHECKING:
+    from src.agent.config_loader import AgentConfig
+
+logger = logging.getLogger(__name__)
+
+
+class IngestPipeline:
+    """
+    Load -> chunk -> index pipeline with a cache per stage.
+
+    Parsed documents are keyed by the context file's hash and the loader
+    version; chunks by the documents key and the chunker settings; and a
+    built index records the chunks key, embedding model and store type it
+    was built from. A config change therefore only reruns the stages
+    downstream of what changed, and changing e.g. retriever_k or the
+    prompts reuses the existing index.
+
+    In low-memory mode, chunks are produced one document at a time and
+    streamed through an on-disk artifact into the store, instead of being
+    held as a list.
+    """
+
+    MANIFEST_FILE = "index_manifest.json"
+
+    def __init__(self, config: "AgentConfig", cache: Optional[ArtifactCache] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            config: Agent configuration.
+            cache: Artifact cache (default: one at config.cache_dir).
+        """
+        self.config = config
+        self.cache = cache or ArtifactCache(config.cache_dir)
+        self._file_path: Optional[Path] = None
+        self._file_hash: Optional[str] = None
+
+    @property
+    def file_path(self) -> Path:
+        """Get the detected context file."""
+        if self._file_path is None:
+            self._file_path = DocumentLoaderFactory.detect(self.config.context_file)
+        return self._file_path
+
+    def loader(self) -> DocumentLoaderStrategy:
+        """Get the loader for the context file."""
+        return DocumentLoaderFactory.create(self.file_path)
+
+    def chunker(self) -> ChunkingStrategy:
+        """Get the chunker for the context file."""
+        return ChunkerFactory.create_from_agent_config(self.file_path, self.config)
+
+    def documents_key(self) -> str:
+        """Cache key for parsed documents: file hash plus loader version."""
+        if self._file_hash is None:
+            self._file_hash = file_digest(self.file_path)
+        loader = self.loader()
+        return key_digest(self._file_hash, type(loader).__name__, loader.version)
+
+    def chunks_key(self) -> str:
+        """Cache key for chunks: documents key plus chunker settings."""
+        return key_digest(self.documents_key(), self.chunker().fingerprint())
+
+    def index_key(self) -> str:
+        """Key identifying an index: chunks key, embedding model and store layout."""
+        config = self.config
+        parts = [self.chunks_key(), config.embedding_provider, config.embedding_model]
+        # Truncation and precision change the vectors; the defaults keep older keys
+        if config.embedding_max_seq_length is not None or config.embedding_precision != "float32":
+            parts.append(f"{config.embedding_max_seq_length}:{config.embedding_precision}")
+        # Each store type has its own on-disk format; chroma keeps older keys
+        if config.vector_store == "sharded":
+            parts.append(f"sharded:{config.num_shards}")
+        elif config.vector_store == "compressed":
+            parts.append(
+                f"compressed:{config.vector_reduction}:{config.reduced_dim}:{config.vector_dtype}"
+            )
+        elif config.vector_store != "chroma":
+            parts.append(config.vector_store)
+        return key_digest(*parts)
+
+    def load_documents(self) -> List[Document]:
+        """Parse the context file, reusing cached documents if unchanged."""
+        key = self.documents_key()
+        documents = self.cache.get("documents", key)
+        if documents is None:
+            with profiler.stage("loader"):
+                documents = self.loader().load(self.file_path)
+            logger.info(f"Loaded {len(documents)} document(s)")
+            self.cache.put("documents", key, documents)
+        return documents
+
+    def chunk(self) -> List[Document]:
+        """Chunk the documents, reusing cached chunks if unchanged."""
+        key = self.chunks_key()
+        chunks = self.cache.get("chunks", key)
+        if chunks is None:
+            documents = self.load_documents()
+            with profiler.stage("chunker"):
+                chunks = self.chunker().chunk(documents)
+            self.cache.put("chunks", key, chunks)
+        return chunks
+
+    def chunk_stream(self) -> DocumentStream:
+        """Chunk the documents into a streamed artifact, reusing it if unchanged."""
+        key = self.chunks_key()
+        stream = self.cache.get_stream("chunks", key)
+        if stream is None:
+            chunker = self.chunker()
+            documents = self.load_documents()
+            chunks = (chunk for doc in documents for chunk in chunker.chunk([doc]))
+            with profiler.stage("chunker"):
+                stream = self.cache.put_stream("chunks", key, chunks)
+            logger.info(f"Streamed {len(stream)} chunks to disk")
+        return stream
+
+    def chunks_for_index(self) -> Collection[Document]:
+        """Get the chunks to index: a stream in low-memory mode, else a list."""
+        return self.chunk_stream() if self.config.low_memory else self.chunk()
+
+    def is_current(self, persist_dir: str) -> bool:
+        """Check whether an index directory was built from the current inputs."""
+        manifest = Path(persist_dir) / self.MANIFEST_FILE
+        if not manifest.exists():
+            return False
+        try:
+            with open(manifest, "r") as f:
+                return json.load(f).get("index_key") == self.index_key()
+        except json.JSONDecodeError:
+            logger.warning(f"Unreadable index manifest in {persist_dir}; rebuilding")
+            return False
+
+    def build(self, repository: VectorStoreRepository, persist_dir: str) -> int:
+        """
+        Build an index from the (cached) chunks.
+
+        An index in persist_dir that was built from other inputs is removed
+        first; one with a matching manifest is resumed. Hidden entries
+        (such as snapshot leases) are left alone.
+
+        Args:
+            repository: Repository writing to persist_dir.
+            persist_dir: Directory of the index.
+
+        Returns:
+            Number of chunks indexed.
+        """
+        path = Path(persist_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        if not self.is_current(persist_dir):
+            stale = [p for p in path.iterdir() if not p.name.startswith(".")]
+            if stale:
+                logger.info(f"Index inputs changed; clearing {persist_dir}")
+            for entry in stale:
+                if entry.is_dir():
+                    shutil.rmtree(entry)
+                else:
+                    entry.unlink()
+
+        manifest = {
+            "index_key": self.index_key(),
+            "source": str(self.file_path),
+            "chunker": self.chunker().fingerprint(),
+            "embedding_model": self.config.embedding_model,
+            "vector_store": self.config.vector_store,
+        }
+        tmp_path = path / f"{self.MANIFEST_FILE}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        tmp_path.replace(path / self.MANIFEST_FILE)
+
+        chunks = self.chunks_for_index()
+        with profiler.stage("repository"):
+            repository.save(chunks)
+        return len(chunks)
@@ -2,6 +2,8 @@
 
 from src.llm.base import LLMProvider
 from src.llm.ollama_provider import OllamaProvider
+from src.llm.pool_provider import OllamaPoolProvider
+from src.llm.stub_provider import StubProvider
 from src.llm.factory import LLMFactory
 
-__all__ = ["LLMProvider", "OllamaProvider", "LLMFactory"]
+__all__ = ["LLMProvider", "OllamaProvider", "OllamaPoolProvider", "StubProvider", "LLMFactory"]
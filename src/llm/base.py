@@ -12,6 +12,10 @@ class LLMProvider(ABC):
         """
         Get the LLM instance.
 
+        The instance is used both synchronously (invoke/stream) and from
+        asyncio code (ainvoke/astream), so providers should return a model
+        with a native async implementation where possible.
+
         Returns:
             LLM instance compatible with LangChain.
         """
@@ -22,3 +26,7 @@ class LLMProvider(ABC):
     def model_name(self) -> str:
         """Get the model name."""
         pass
+
+    def close(self) -> None:
+        """Release resources such as pooled connections."""
+        pass
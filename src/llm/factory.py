@@ -1,9 +1,13 @@
 """Factory for creating LLM providers."""
 
-from typing import TYPE_CHECKING
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
 from src.llm.base import LLMProvider
 from src.llm.ollama_provider import OllamaProvider
+from src.llm.pool_provider import OllamaPoolProvider
+from src.llm.stub_provider import StubProvider
+from src.registry.model_registry import ModelRegistry
 
 if TYPE_CHECKING:
     from src.agent.config_loader import AgentConfig
@@ -12,19 +16,55 @@ if TYPE_CHECKING:
 class LLMFactory:
     """Factory for creating LLM providers."""
 
-    @staticmethod
+    # Identical model configs share one provider across the process
+    _registry = ModelRegistry("llm")
+
+    @classmethod
     def create(
+        cls,
         model_name: str,
         temperature: float = 0.1,
         provider: str = "ollama",
+        base_url: str = "http://localhost:11434",
+        endpoints: Optional[List[Union[str, Dict[str, Any]]]] = None,
+        health_interval: float = 10.0,
+        max_failures: int = 3,
+        timeout: Optional[float] = 120.0,
+        keep_alive: Optional[str] = "30m",
+        options: Optional[Dict[str, Any]] = None,
+        warmup: bool = True,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_delay: float = 0.5,
+        hedge_endpoints: Optional[List[str]] = None,
+        stub_latency: float = 0.5,
+        stub_jitter: float = 0.0,
+        stub_parallel: Optional[int] = None,
+        stub_answer: Optional[str] = None,
     ) -> LLMProvider:
         """
-        Create an LLM provider.
+        Create or reuse a shared LLM provider.
+
+        Each call takes a reference that should be returned with release().
 
         Args:
             model_name: Name of the model.
             temperature: Temperature for generation.
-            provider: Provider type ("ollama" supported).
+            provider: Provider type ("ollama", "ollama_pool" or "stub").
+            base_url: Ollama server URL (ollama).
+            endpoints: Endpoint URLs or {url, max_concurrency} dicts (ollama_pool).
+            health_interval: Seconds between endpoint health checks (ollama_pool).
+            max_failures: Failures before an endpoint is ejected (ollama_pool).
+            timeout: Request timeout in seconds.
+            keep_alive: How long Ollama keeps the model loaded.
+            options: Generation options (num_ctx, num_predict, num_thread, ...).
+            warmup: Load the model when the provider is created.
+            hedge_percentile: Latency percentile to hedge at (ollama; None disables).
+            hedge_min_delay: Minimum seconds before hedging (ollama).
+            hedge_endpoints: Servers for hedged requests (ollama).
+            stub_latency: Median seconds per call (stub).
+            stub_jitter: Log-normal shape of the latency (stub).
+            stub_parallel: Calls served at once, None for unlimited (stub).
+            stub_answer: Fixed answer text (stub).
 
         Returns:
             LLMProvider instance.
@@ -32,10 +72,62 @@ class LLMFactory:
         Raises:
             ValueError: If provider is not supported.
         """
+        common = {
+            "model": model_name,
+            "temperature": temperature,
+            "timeout": timeout,
+            "keep_alive": keep_alive,
+            "options": options or {},
+            "warmup": warmup,
+        }
+
         if provider == "ollama":
-            return OllamaProvider(model=model_name, temperature=temperature)
+            settings = {
+                **common,
+                "base_url": base_url,
+                "hedge_percentile": hedge_percentile,
+                "hedge_min_delay": hedge_min_delay,
+                "hedge_endpoints": hedge_endpoints or [],
+            }
+            return cls._registry.acquire(
+                (provider, json.dumps(settings, sort_keys=True)),
+                lambda: OllamaProvider(**settings),
+            )
+        if provider == "ollama_pool":
+            settings = {
+                **common,
+                "endpoints": endpoints or [],
+                "health_interval": health_interval,
+                "max_failures": max_failures,
+            }
+            return cls._registry.acquire(
+                (provider, json.dumps(settings, sort_keys=True)),
+                lambda: OllamaPoolProvider(**settings),
+            )
+        if provider == "stub":
+            settings = {
+                "model": model_name,
+                "latency": stub_latency,
+                "jitter": stub_jitter,
+                "parallel": stub_parallel,
+                "answer": stub_answer,
+            }
+            return cls._registry.acquire(
+                (provider, json.dumps(settings, sort_keys=True)),
+                lambda: StubProvider(**settings),
+            )
         raise ValueError(f"Unsupported LLM provider: {provider}")
 
+    @classmethod
+    def release(cls, llm_provider: LLMProvider) -> None:
+        """
+        Release a provider returned by create().
+
+        Args:
+            llm_provider: Provider to release.
+        """
+        cls._registry.release(llm_provider)
+
     @staticmethod
     def create_from_agent_config(config: "AgentConfig") -> LLMProvider:
         """
@@ -51,4 +143,19 @@ class LLMFactory:
             model_name=config.model_name,
             temperature=config.temperature,
             provider=config.model_provider,
+            base_url=config.model_base_url,
+            endpoints=config.model_endpoints,
+            health_interval=config.health_interval,
+            max_failures=config.max_failures,
+            timeout=config.request_timeout,
+            keep_alive=config.keep_alive,
+            options=config.generation_options(),
+            warmup=config.warmup,
+            hedge_percentile=config.hedge_percentile,
+            hedge_min_delay=config.hedge_min_delay,
+            hedge_endpoints=config.hedge_endpoints,
+            stub_latency=config.stub_latency,
+            stub_jitter=config.stub_jitter,
+            stub_parallel=config.stub_parallel,
+            stub_answer=config.stub_answer,
         )
@@ -0,0 +1,220 @@
+"""Hedged requests: race a delayed duplicate against a slow generation."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import Field, PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """Thread-safe window of recent request latencies."""
+
+    def __init__(self, size: int = 256):
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Add a latency sample."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Get a latency percentile, or None if there are no samples."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class HedgedChatModel(BaseChatModel):
+    """
+    Chat model that sends a duplicate request when the first one is slow.
+
+    The first request goes to the primary model. If it hasn't finished after
+    the configured latency percentile of recent requests, the same request
+    is sent to the next hedge model (another endpoint) and whichever
+    finishes first wins. Hedging only starts once min_samples latencies
+    have been observed; until then, and for streaming calls, the primary
+    is called directly.
+    """
+
+    primary: Any = Field(exclude=True)
+    hedges: List[Any] = Field(default_factory=list, exclude=True)
+    percentile: float = 95.0
+    min_delay: float = 0.5
+    min_samples: int = 20
+
+    _latencies: LatencyWindow = PrivateAttr(default_factory=LatencyWindow)
+    # Sync calls run both the primary and the hedge on this pool
+    _executor: ThreadPoolExecutor = PrivateAttr(
+        default_factory=lambda: ThreadPoolExecutor(max_workers=64, thread_name_prefix="hedge")
+    )
+    # Guards the counters below, which concurrent calls update
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _next_hedge: int = PrivateAttr(default=0)
+    _hedged: int = PrivateAttr(default=0)
+    _hedge_wins: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"primary": self.primary._identifying_params, "percentile": self.percentile}
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while warming up."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, self._latencies.percentile(self.percentile))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hedging counters and the current delay."""
+        with self._lock:
+            hedged, hedge_wins = self._hedged, self._hedge_wins
+        return {
+            "hedged": hedged,
+            "hedge_wins": hedge_wins,
+            "hedge_delay_s": self.hedge_delay(),
+        }
+
+    def _pick_hedge(self) -> Any:
+        """Count a hedged request and rotate through the hedge models."""
+        with self._lock:
+            hedge = self.hedges[self._next_hedge % len(self.hedges)]
+            self._next_hedge += 1
+            self._hedged += 1
+        return hedge
+
+    def _count_win(self) -> None:
+        """Count a hedged request that the hedge answered first."""
+        with self._lock:
+            self._hedge_wins += 1
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        start = time.monotonic()
+        delay = self.hedge_delay()
+        if delay is None or not self.hedges:
+            result = self.primary._generate(messages, stop, None, **kwargs)
+            self._latencies.record(time.monotonic() - start)
+            return result
+
+        first = self._executor.submit(self.primary._generate, messages, stop, None, **kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            self._latencies.record(time.monotonic() - start)
+            return first.result()
+
+        second = self._executor.submit(
+            self._pick_hedge()._generate, messages, stop, None, **kwargs
+        )
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is second:
+                    self._count_win()
+                # The losing request finishes in the background
+                self._latencies.record(time.monotonic() - start)
+                return future.result()
+        raise error
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        start = time.monotonic()
+        delay = self.hedge_delay()
+        if delay is None or not self.hedges:
+            result = await self.primary._agenerate(messages, stop, None, **kwargs)
+            self._latencies.record(time.monotonic() - start)
+            return result
+
+        first = asyncio.ensure_future(self.primary._agenerate(messages, stop, None, **kwargs))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                self._latencies.record(time.monotonic() - start)
+                return first.result()
+
+            second = asyncio.ensure_future(
+                self._pick_hedge()._agenerate(messages, stop, None, **kwargs)
+            )
+            pending = {first, second}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is second:
+                        self._count_win()
+                    self._latencies.record(time.monotonic() - start)
+                    return task.result()
+            raise error
+        finally:
+            # Cancelling the loser (or both, if the caller was cancelled)
+            # closes its HTTP request
+            for task in pending:
+                task.cancel()
+
+    def close(self) -> None:
+        """Shut down the thread pool of sync hedged calls."""
+        self._executor.shutdown(wait=False)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        yield from self.primary._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        async for chunk in self.primary._astream(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        ):
+            yield chunk
@@ -0,0 +1,162 @@
+"""LangChain chat model for Ollama built on OllamaClient."""
+
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+# Request keys that are sent at the top level rather than in "options"
+_TOP_LEVEL_KEYS = ("format", "keep_alive")
+
+
+class OllamaChatModel(BaseChatModel):
+    """
+    Chat model for Ollama's /api/chat endpoint.
+
+    Supports invoke/stream and native ainvoke/astream over a shared, pooled
+    OllamaClient. Extra keyword arguments (e.g. via .bind()) are sent as
+    generation options, except "format" and "keep_alive" which are sent as
+    top-level request fields.
+    """
+
+    model: str
+    temperature: float = 0.1
+    client: Any = Field(exclude=True)  # OllamaClient
+    options: Dict[str, Any] = Field(default_factory=dict)
+    format: Optional[Union[str, Dict[str, Any]]] = None
+    keep_alive: Optional[Union[int, str]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "temperature": self.temperature, **self.options}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        response = self.client.chat(self._payload(messages, stop, **kwargs))
+        return _to_chat_result(response)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        response = await self.client.achat(self._payload(messages, stop, **kwargs))
+        return _to_chat_result(response)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        for part in self.client.stream_chat(self._payload(messages, stop, **kwargs)):
+            chunk = _to_chunk(part)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        async for part in self.client.astream_chat(self._payload(messages, stop, **kwargs)):
+            chunk = _to_chunk(part)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _payload(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """Build an /api/chat request body."""
+        options = {"temperature": self.temperature, **self.options}
+        options.update({k: v for k, v in kwargs.items() if k not in _TOP_LEVEL_KEYS})
+        if stop:
+            options["stop"] = stop
+
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [_to_ollama_message(m) for m in messages],
+            "options": options,
+        }
+        for key in _TOP_LEVEL_KEYS:
+            value = kwargs.get(key, getattr(self, key))
+            if value is not None:
+                payload[key] = value
+        return payload
+
+
+def _to_ollama_message(message: BaseMessage) -> Dict[str, str]:
+    """Convert a LangChain message to Ollama's format."""
+    if isinstance(message, HumanMessage):
+        role = "user"
+    elif isinstance(message, AIMessage):
+        role = "assistant"
+    elif isinstance(message, SystemMessage):
+        role = "system"
+    else:
+        raise ValueError(f"Unsupported message type for Ollama: {message.type}")
+
+    if isinstance(message.content, str):
+        content = message.content
+    else:
+        content = "\n".join(
+            part["text"] for part in message.content
+            if isinstance(part, dict) and part.get("type") == "text"
+        )
+    return {"role": role, "content": content}
+
+
+def _metadata(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Timing and token counts reported by Ollama."""
+    return {k: v for k, v in response.items() if k != "message"}
+
+
+def _to_chat_result(response: Dict[str, Any]) -> ChatResult:
+    metadata = _metadata(response)
+    message = AIMessage(
+        content=response.get("message", {}).get("content", ""),
+        response_metadata=metadata,
+    )
+    return ChatResult(generations=[ChatGeneration(message=message, generation_info=metadata)])
+
+
+def _to_chunk(part: Dict[str, Any]) -> ChatGenerationChunk:
+    metadata = _metadata(part) if part.get("done") else None
+    return ChatGenerationChunk(
+        message=AIMessageChunk(
+            content=part.get("message", {}).get("content", ""),
+            response_metadata=metadata or {},
+        ),
+        generation_info=metadata,
+    )
@@ -0,0 +1,153 @@
+"""HTTP client for the Ollama REST API with sync and async transports."""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaClient:
+    """
+    Thin client for Ollama's /api endpoints.
+
+    One pooled httpx.Client serves synchronous calls and one
+    httpx.AsyncClient per event loop serves asynchronous calls, so
+    connections are reused across requests instead of being reopened.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        timeout: Optional[float] = 120.0,
+        max_connections: int = 16,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Ollama server URL.
+            timeout: Request timeout in seconds (None for no timeout).
+            max_connections: Size of the connection pool.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._client = httpx.Client(
+            base_url=self.base_url, timeout=timeout, limits=self._limits
+        )
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a non-streaming /api/chat request."""
+        response = self._client.post("/api/chat", json={**payload, "stream": False})
+        response.raise_for_status()
+        return response.json()
+
+    def stream_chat(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Send a streaming /api/chat request and yield response parts."""
+        with self._client.stream(
+            "POST", "/api/chat", json={**payload, "stream": True}
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield _parse_line(line)
+
+    async def achat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a non-streaming /api/chat request asynchronously."""
+        response = await self._get_async_client().post(
+            "/api/chat", json={**payload, "stream": False}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def astream_chat(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Send a streaming /api/chat request asynchronously."""
+        async with self._get_async_client().stream(
+            "POST", "/api/chat", json={**payload, "stream": True}
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    yield _parse_line(line)
+
+    def warmup(self, model: str, keep_alive: Optional[str] = None) -> bool:
+        """
+        Load a model into memory ahead of the first request.
+
+        Sends an empty /api/generate request, which loads the model and
+        pins it for keep_alive without generating anything.
+
+        Returns:
+            True if the model was loaded.
+        """
+        payload: Dict[str, Any] = {"model": model, "prompt": ""}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        try:
+            response = self._client.post("/api/generate", json=payload)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not warm up {model} at {self.base_url}: {e}")
+            return False
+        return True
+
+    def ping(self, timeout: float = 5.0) -> bool:
+        """Check that the server is reachable."""
+        try:
+            response = self._client.get("/api/version", timeout=timeout)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self._client.close()
+        if self._async_client is not None:
+            _close_async_client(self._async_client, self._async_loop)
+        self._async_client = None
+        self._async_loop = None
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the async client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            if self._async_client is not None:
+                _close_async_client(self._async_client, self._async_loop)
+            # httpx async connections are bound to the loop that opened them
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, limits=self._limits
+            )
+            self._async_loop = loop
+        return self._async_client
+
+
+def _close_async_client(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop) -> None:
+    """Close an async client on the event loop its connections belong to."""
+    if loop.is_closed():
+        # Nothing can run on a closed loop; its sockets are closed with their transports
+        logger.debug("Dropping async Ollama client of a closed event loop")
+        return
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        return
+    try:
+        loop.run_until_complete(client.aclose())
+    except RuntimeError as e:
+        logger.debug(f"Could not close async Ollama client: {e}")
+
+
+def _parse_line(line: str) -> Dict[str, Any]:
+    """Parse one NDJSON line, surfacing errors reported by Ollama."""
+    part = json.loads(line)
+    if "error" in part:
+        raise RuntimeError(f"Ollama error: {part['error']}")
+    return part
@@ -1,11 +1,12 @@
 """Ollama LLM provider implementation."""
 
 import logging
-from typing import Any
-
-from langchain_community.chat_models import ChatOllama
+from typing import Any, Dict, List, Optional
 
 from src.llm.base import LLMProvider
+from src.llm.hedging import HedgedChatModel
+from src.llm.ollama_chat import OllamaChatModel
+from src.llm.ollama_client import OllamaClient
 
 logger = logging.getLogger(__name__)
 
@@ -13,24 +14,89 @@ logger = logging.getLogger(__name__)
 class OllamaProvider(LLMProvider):
     """LLM provider using local Ollama."""
 
-    def __init__(self, model: str = "qwen2.5:1.5b", temperature: float = 0.1):
+    def __init__(
+        self,
+        model: str = "qwen2.5:1.5b",
+        temperature: float = 0.1,
+        base_url: str = "http://localhost:11434",
+        timeout: Optional[float] = 120.0,
+        keep_alive: Optional[str] = "30m",
+        options: Optional[Dict[str, Any]] = None,
+        warmup: bool = True,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_delay: float = 0.5,
+        hedge_endpoints: Optional[List[str]] = None,
+    ):
         """
         Initialize the Ollama provider.
 
         Args:
             model: Ollama model name.
             temperature: Temperature for generation.
+            base_url: Ollama server URL.
+            timeout: Request timeout in seconds (None for no timeout).
+            keep_alive: How long Ollama keeps the model loaded after a
+                request (e.g. "30m", or -1 to pin it).
+            options: Extra generation options (num_ctx, num_predict, num_thread, ...).
+            warmup: Load the model at construction so the first request
+                doesn't pay for it.
+            hedge_percentile: Latency percentile after which a slow request
+                is duplicated (None disables hedging).
+            hedge_min_delay: Minimum seconds to wait before hedging.
+            hedge_endpoints: Servers to send hedged requests to. Hedging
+                needs at least one besides base_url: a duplicate sent to the
+                same server only adds to its load.
         """
         self._model = model
         self._temperature = temperature
-        self._llm = ChatOllama(model=model, temperature=temperature)
+        hedge_urls = [
+            url for url in hedge_endpoints or [] if url.rstrip("/") != base_url.rstrip("/")
+        ]
+        self._clients = [OllamaClient(base_url=base_url, timeout=timeout)]
+        self._clients += [OllamaClient(base_url=url, timeout=timeout) for url in hedge_urls]
+        models = [
+            OllamaChatModel(
+                model=model,
+                temperature=temperature,
+                client=client,
+                options=options or {},
+                keep_alive=keep_alive,
+            )
+            for client in self._clients
+        ]
+
+        if warmup:
+            for client in self._clients:
+                if client.warmup(model, keep_alive=keep_alive):
+                    logger.info(f"Warmed up {model} at {client.base_url}")
+
+        if hedge_percentile is not None and not hedge_urls:
+            logger.warning(
+                "hedge_percentile needs hedge_endpoints other than base_url; not hedging"
+            )
+        if hedge_percentile is not None and hedge_urls:
+            self._llm = HedgedChatModel(
+                primary=models[0],
+                hedges=models[1:],
+                percentile=hedge_percentile,
+                min_delay=hedge_min_delay,
+            )
+        else:
+            self._llm = models[0]
         logger.info(f"Initialized Ollama provider with model: {model}")
 
     def get_llm(self) -> Any:
-        """Get the ChatOllama instance."""
+        """Get the Ollama chat model (supports invoke and ainvoke)."""
         return self._llm
 
     @property
     def model_name(self) -> str:
         """Get the model name."""
         return self._model
+
+    def close(self) -> None:
+        """Close pooled HTTP connections and the hedging thread pool."""
+        if isinstance(self._llm, HedgedChatModel):
+            self._llm.close()
+        for client in self._clients:
+            client.close()
@@ -0,0 +1,403 @@
+"""Load-balanced LLM provider over several Ollama endpoints."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Union
+
+import httpx
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+from src.llm.base import LLMProvider
+from src.llm.ollama_chat import OllamaChatModel
+from src.llm.ollama_client import OllamaClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EndpointStats:
+    """Load and latency statistics for one endpoint."""
+
+    url: str
+    max_concurrency: int
+    outstanding: int = 0
+    healthy: bool = True
+    consecutive_failures: int = 0
+    requests: int = 0
+    errors: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=512))
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Get a latency percentile in seconds over recent requests."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the stats for reporting."""
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "max_concurrency": self.max_concurrency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+        }
+
+
+class _Endpoint:
+    """One Ollama server with its client, chat model and stats."""
+
+    def __init__(self, url: str, max_concurrency: int, llm_settings: Dict[str, Any]):
+        timeout = llm_settings.pop("timeout", None)
+        self.client = OllamaClient(base_url=url, timeout=timeout, max_connections=max_concurrency)
+        self.llm = OllamaChatModel(client=self.client, **llm_settings)
+        self.stats = EndpointStats(url=url, max_concurrency=max_concurrency)
+
+
+class OllamaPool:
+    """
+    Balances requests over endpoints by least outstanding requests.
+
+    Each endpoint has a concurrency limit; callers wait when every healthy
+    endpoint is at its limit. Endpoints are ejected after repeated failures
+    and re-admitted once a background health check succeeds again.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[_Endpoint],
+        health_interval: float = 10.0,
+        max_failures: int = 3,
+    ):
+        self.endpoints = endpoints
+        self.max_failures = max_failures
+        self._lock = threading.Lock()
+        self._waiters: List[Callable[[], None]] = []
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if health_interval:
+            self._health_thread = threading.Thread(
+                target=self._health_loop,
+                args=(health_interval,),
+                name="ollama-pool-health",
+                daemon=True,
+            )
+            self._health_thread.start()
+
+    def acquire(self, exclude: Optional[_Endpoint] = None) -> _Endpoint:
+        """Take a slot on the least-loaded healthy endpoint, waiting if needed."""
+        while True:
+            event = threading.Event()
+            with self._lock:
+                endpoint = self._pick(exclude)
+                if endpoint is not None:
+                    return endpoint
+                self._waiters.append(event.set)
+            event.wait()
+
+    async def aacquire(self, exclude: Optional[_Endpoint] = None) -> _Endpoint:
+        """Take a slot without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            future = loop.create_future()
+            with self._lock:
+                endpoint = self._pick(exclude)
+                if endpoint is not None:
+                    return endpoint
+                self._waiters.append(
+                    lambda: loop.call_soon_threadsafe(_resolve, future)
+                )
+            await future
+
+    def release(self, endpoint: _Endpoint, latency: float, ok: Optional[bool]) -> None:
+        """
+        Return a slot and record the request's outcome.
+
+        Args:
+            endpoint: Endpoint the slot was reserved on.
+            latency: Seconds the request took.
+            ok: Whether it succeeded; None for a request abandoned by its
+                caller (cancelled, or a stream closed early), which counts
+                neither as a success nor as a failure.
+        """
+        stats = endpoint.stats
+        with self._lock:
+            stats.outstanding -= 1
+            stats.requests += 1
+            if ok:
+                stats.latencies.append(latency)
+                stats.consecutive_failures = 0
+            elif ok is not None:
+                stats.errors += 1
+                self._record_failure(stats)
+            waiters, self._waiters = self._waiters, []
+
+        # Wake everyone; waiters re-check for a free slot
+        for wake in waiters:
+            wake()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get per-endpoint stats."""
+        with self._lock:
+            return [endpoint.stats.to_dict() for endpoint in self.endpoints]
+
+    def close(self) -> None:
+        """Stop health checks and close connections."""
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+    def _pick(self, exclude: Optional[_Endpoint]) -> Optional[_Endpoint]:
+        """Choose and reserve an endpoint; the caller must hold the lock."""
+        healthy = [e for e in self.endpoints if e.stats.healthy and e is not exclude]
+        if not healthy:
+            if exclude is not None and exclude.stats.healthy:
+                healthy = [exclude]
+            else:
+                raise RuntimeError("No healthy Ollama endpoints available")
+
+        available = [e for e in healthy if e.stats.outstanding < e.stats.max_concurrency]
+        if not available:
+            return None
+        endpoint = min(available, key=lambda e: e.stats.outstanding)
+        endpoint.stats.outstanding += 1
+        return endpoint
+
+    def _record_failure(self, stats: EndpointStats) -> None:
+        """Count a failure and eject the endpoint past the threshold."""
+        stats.consecutive_failures += 1
+        if stats.healthy and stats.consecutive_failures >= self.max_failures:
+            stats.healthy = False
+            logger.warning(
+                f"Ejected Ollama endpoint {stats.url} after "
+                f"{stats.consecutive_failures} consecutive failures"
+            )
+
+    def _health_loop(self, interval: float) -> None:
+        """Ping endpoints periodically, ejecting and re-admitting them."""
+        while not self._stop.wait(interval):
+            for endpoint in self.endpoints:
+                ok = endpoint.client.ping()
+                stats = endpoint.stats
+                with self._lock:
+                    if ok and not stats.healthy:
+                        stats.healthy = True
+                        stats.consecutive_failures = 0
+                        logger.info(f"Re-admitted Ollama endpoint {stats.url}")
+                    elif not ok:
+                        self._record_failure(stats)
+                    waiters, self._waiters = self._waiters, []
+                for wake in waiters:
+                    wake()
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class PooledChatModel(BaseChatModel):
+    """Chat model that routes each request to an endpoint from an OllamaPool."""
+
+    model: str
+    pool: Any = Field(exclude=True)  # OllamaPool
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-pool"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "endpoints": [e.stats.url for e in self.pool.endpoints]}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        failed = None
+        for _ in range(len(self.pool.endpoints)):
+            endpoint = self.pool.acquire(exclude=failed)
+            start = time.monotonic()
+            ok = None
+            try:
+                result = endpoint.llm._generate(messages, stop=stop, **kwargs)
+                ok = True
+            except httpx.TransportError:
+                # Connection-level failure: retry on another endpoint
+                ok = False
+                failed = endpoint
+                continue
+            except Exception:
+                ok = False
+                raise
+            finally:
+                self.pool.release(endpoint, time.monotonic() - start, ok=ok)
+            return result
+        raise RuntimeError("All Ollama endpoints failed")
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        failed = None
+        for _ in range(len(self.pool.endpoints)):
+            endpoint = await self.pool.aacquire(exclude=failed)
+            start = time.monotonic()
+            # Stays None if the caller cancels (e.g. a timeout or a lost hedge)
+            ok = None
+            try:
+                result = await endpoint.llm._agenerate(messages, stop=stop, **kwargs)
+                ok = True
+            except httpx.TransportError:
+                ok = False
+                failed = endpoint
+                continue
+            except Exception:
+                ok = False
+                raise
+            finally:
+                self.pool.release(endpoint, time.monotonic() - start, ok=ok)
+            return result
+        raise RuntimeError("All Ollama endpoints failed")
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        endpoint = self.pool.acquire()
+        start = time.monotonic()
+        # Stays None if the consumer stops early (GeneratorExit)
+        ok = None
+        try:
+            yield from endpoint.llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            ok = True
+        except Exception:
+            ok = False
+            raise
+        finally:
+            self.pool.release(endpoint, time.monotonic() - start, ok=ok)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        endpoint = await self.pool.aacquire()
+        start = time.monotonic()
+        ok = None
+        try:
+            async for chunk in endpoint.llm._astream(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            ):
+                yield chunk
+            ok = True
+        except Exception:
+            ok = False
+            raise
+        finally:
+            self.pool.release(endpoint, time.monotonic() - start, ok=ok)
+
+
+class OllamaPoolProvider(LLMProvider):
+    """LLM provider that balances requests over several Ollama endpoints."""
+
+    def __init__(
+        self,
+        endpoints: List[Union[str, Dict[str, Any]]],
+        model: str = "qwen2.5:1.5b",
+        temperature: float = 0.1,
+        health_interval: float = 10.0,
+        max_failures: int = 3,
+        timeout: Optional[float] = 120.0,
+        keep_alive: Optional[str] = "30m",
+        options: Optional[Dict[str, Any]] = None,
+        warmup: bool = True,
+    ):
+        """
+        Initialize the pooled Ollama provider.
+
+        Args:
+            endpoints: Endpoint URLs, or dicts with "url" and optional
+                "max_concurrency" (default 1).
+            model: Ollama model name (must be available on every endpoint).
+            temperature: Temperature for generation.
+            health_interval: Seconds between health checks (0 disables them).
+            max_failures: Consecutive failures before an endpoint is ejected.
+            timeout: Request timeout in seconds (None for no timeout).
+            keep_alive: How long each endpoint keeps the model loaded.
+            options: Generation options (num_ctx, num_predict, num_thread, ...).
+            warmup: Load the model on every endpoint at construction.
+        """
+        if not endpoints:
+            raise ValueError("ollama_pool requires at least one endpoint")
+
+        self._model = model
+        self._pool = OllamaPool(
+            [
+                _Endpoint(
+                    url=spec if isinstance(spec, str) else spec["url"],
+                    max_concurrency=1 if isinstance(spec, str) else spec.get("max_concurrency", 1),
+                    llm_settings={
+                        "model": model,
+                        "temperature": temperature,
+                        "timeout": timeout,
+                        "keep_alive": keep_alive,
+                        "options": options or {},
+                    },
+                )
+                for spec in endpoints
+            ],
+            health_interval=health_interval,
+            max_failures=max_failures,
+        )
+        if warmup:
+            for endpoint in self._pool.endpoints:
+                endpoint.client.warmup(model, keep_alive=keep_alive)
+        self._llm = PooledChatModel(model=model, pool=self._pool)
+        logger.info(f"Initialized Ollama pool with model {model} over {len(endpoints)} endpoints")
+
+    def get_llm(self) -> Any:
+        """Get the pooled chat model."""
+        return self._llm
+
+    @property
+    def model_name(self) -> str:
+        """Get the model name."""
+        return self._model
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get per-endpoint load, health and latency stats."""
+        return self._pool.stats()
+
+    def close(self) -> None:
+        """Stop health checks and close connections."""
+        self._pool.close()
@@ -0,0 +1,168 @@
+"""Stub LLM provider with configurable latency, for offline load tests."""
+
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+from src.llm.base import LLMProvider
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Chat model that sleeps instead of generating.
+
+    Each call takes a log-normally distributed time with median `latency`
+    seconds and shape `jitter` (0 for a constant latency), so tail latency
+    can be exercised too. With `parallel` set, at most that many calls run
+    at once and the rest queue, like the parallel slots of an Ollama
+    server. The answer is `answer` if given; otherwise, when a JSON schema
+    is bound as "format", the smallest object that matches it (with
+    integers numbered by array position), else a fixed text.
+    """
+
+    latency: float = 0.5
+    jitter: float = 0.0
+    parallel: Optional[int] = None
+    answer: Optional[str] = None
+    slots: Any = Field(default=None, exclude=True)  # threading.Semaphore
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        if self.parallel:
+            self.slots = threading.Semaphore(self.parallel)
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"latency": self.latency, "jitter": self.jitter, "parallel": self.parallel}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.slots is not None:
+            self.slots.acquire()
+        try:
+            time.sleep(self._sample_latency())
+        finally:
+            if self.slots is not None:
+                self.slots.release()
+        return self._result(kwargs.get("format"))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.slots is not None:
+            # The semaphore is shared with sync callers, so poll it
+            while not self.slots.acquire(blocking=False):
+                await asyncio.sleep(0.001)
+        try:
+            await asyncio.sleep(self._sample_latency())
+        finally:
+            if self.slots is not None:
+                self.slots.release()
+        return self._result(kwargs.get("format"))
+
+    def _sample_latency(self) -> float:
+        """Draw one call's latency in seconds."""
+        if self.jitter <= 0:
+            return self.latency
+        return self.latency * math.exp(random.gauss(0.0, self.jitter))
+
+    def _result(self, schema: Any) -> ChatResult:
+        """Build the answer for a call."""
+        if self.answer is not None:
+            text = self.answer
+        elif isinstance(schema, dict):
+            text = json.dumps(_example(schema))
+        else:
+            text = "Stub answer."
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+class StubProvider(LLMProvider):
+    """LLM provider returning a StubChatModel; needs no model server."""
+
+    def __init__(
+        self,
+        model: str = "stub",
+        latency: float = 0.5,
+        jitter: float = 0.0,
+        parallel: Optional[int] = None,
+        answer: Optional[str] = None,
+    ):
+        """
+        Initialize the stub provider.
+
+        Args:
+            model: Name reported by model_name.
+            latency: Median seconds per call.
+            jitter: Log-normal shape of the latency (0 = constant).
+            parallel: Calls served at once (None = unlimited).
+            answer: Fixed answer text (default: derived from the format).
+        """
+        self._model = model
+        self._llm = StubChatModel(
+            latency=latency, jitter=jitter, parallel=parallel, answer=answer
+        )
+
+    def get_llm(self) -> StubChatModel:
+        """Get the stub chat model."""
+        return self._llm
+
+    @property
+    def model_name(self) -> str:
+        """Get the model name."""
+        return self._model
+
+
+def _example(schema: Dict[str, Any], position: int = 0) -> Any:
+    """
+    Build the smallest value that matches a JSON schema.
+
+    Args:
+        schema: JSON schema to match.
+        position: Index within the enclosing array; integers count up from
+            it so that array items (e.g. numbered answers) are distinct.
+    """
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: _example(prop, position)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        items = schema.get("items", {})
+        return [_example(items, i) for i in range(max(schema.get("minItems", 1), 1))]
+    if kind == "number":
+        return schema.get("minimum", 0) + 0.5
+    if kind == "integer":
+        return schema.get("minimum", 1) + position
+    if kind == "boolean":
+        return True
+    return "Stub answer."
@@ -10,6 +10,9 @@ from langchain_core.documents import Document
 class DocumentLoaderStrategy(ABC):
     """Abstract base class for document loading strategies."""
 
+    # Bump when a loader's output changes to invalidate cached documents
+    version: str = "1"
+
     @abstractmethod
     def load(self, file_path: Path) -> List[Document]:
         """
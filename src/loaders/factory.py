@@ -46,9 +46,9 @@ class DocumentLoaderFactory:
         raise ValueError(f"Unsupported file type: {file_path.suffix}")
 
     @classmethod
-    def detect_and_load(cls, base_path: str) -> tuple[Path, List[Document]]:
+    def detect(cls, base_path: str) -> Path:
         """
-        Detect file type and load documents.
+        Detect which context file to load.
 
         Prefers .md over .pdf if both exist.
 
@@ -56,7 +56,7 @@ class DocumentLoaderFactory:
             base_path: Base filename without extension.
 
         Returns:
-            Tuple of (file_path, documents).
+            Path of the file to load.
 
         Raises:
             FileNotFoundError: If no supported file is found.
@@ -85,6 +85,25 @@ class DocumentLoaderFactory:
                 f"TIP: Markdown (.md) is recommended for better structure and accuracy!"
             )
 
+        return file_path
+
+    @classmethod
+    def detect_and_load(cls, base_path: str) -> tuple[Path, List[Document]]:
+        """
+        Detect file type and load documents.
+
+        Prefers .md over .pdf if both exist.
+
+        Args:
+            base_path: Base filename without extension.
+
+        Returns:
+            Tuple of (file_path, documents).
+
+        Raises:
+            FileNotFoundError: If no supported file is found.
+        """
+        file_path = cls.detect(base_path)
         loader = cls.create(file_path)
         documents = loader.load(file_path)
         logger.info(f"Loaded {len(documents)} document(s)")
@@ -0,0 +1,5 @@
+"""Process-wide registries for sharing expensive objects."""
+
+from src.registry.model_registry import ModelRegistry
+
+__all__ = ["ModelRegistry"]
@@ -0,0 +1,110 @@
+"""Reference-counted registry for sharing model instances in one process."""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Shares one instance per configuration key across all callers.
+
+    Every acquire() increments the key's reference count and must be paired
+    with a release(). When the last reference is released the instance is
+    dropped (calling its close() method if it has one) so its memory can be
+    reclaimed. Instances are created outside the registry lock, so a slow
+    load only holds up callers waiting for the same key.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the registry.
+
+        Args:
+            name: Name used in log messages (e.g. "embeddings").
+        """
+        self.name = name
+        self._entries: Dict[Hashable, Tuple[Any, int]] = {}
+        self._keys_by_id: Dict[int, Hashable] = {}
+        self._loading: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Get the shared instance for a key, creating it on first use.
+
+        Args:
+            key: Hashable model configuration.
+            factory: Creates the instance if none is registered.
+
+        Returns:
+            The shared instance.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    instance, refs = entry
+                    self._entries[key] = (instance, refs + 1)
+                    logger.info(f"Reusing shared {self.name} instance: {key} (refs={refs + 1})")
+                    return instance
+                future = self._loading.get(key)
+                leader = future is None
+                if leader:
+                    future = self._loading[key] = Future()
+
+            if not leader:
+                # Wait for the other caller's load, then look the key up again
+                # (the instance may have been released in the meantime)
+                future.result()
+                continue
+
+            try:
+                instance = factory()
+            except BaseException as e:
+                with self._lock:
+                    self._loading.pop(key, None)
+                future.set_exception(e)
+                raise
+            with self._lock:
+                self._entries[key] = (instance, 1)
+                self._keys_by_id[id(instance)] = key
+                self._loading.pop(key, None)
+            future.set_result(None)
+            return instance
+
+    def release(self, instance: Any) -> None:
+        """
+        Drop one reference to an instance returned by acquire().
+
+        Args:
+            instance: The shared instance.
+        """
+        with self._lock:
+            key = self._keys_by_id.get(id(instance))
+            if key is None:
+                return
+            _, refs = self._entries[key]
+            if refs > 1:
+                self._entries[key] = (instance, refs - 1)
+                return
+            del self._entries[key]
+            del self._keys_by_id[id(instance)]
+
+        logger.info(f"Unloading shared {self.name} instance: {key}")
+        close = getattr(instance, "close", None)
+        if callable(close):
+            close()
+
+    def ref_count(self, key: Hashable) -> int:
+        """Get the number of live references for a key."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry else 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -2,5 +2,24 @@
 
 from src.repositories.base import VectorStoreRepository
 from src.repositories.chroma_repository import ChromaRepository
+from src.repositories.sharded_repository import ShardedChromaRepository
+from src.repositories.compressed_repository import CompressedRepository
+from src.repositories.compression import VectorCodec
+from src.repositories.retriever import AdaptiveRetriever, RepositoryRetriever
+from src.repositories.cached_repository import CachedRepository, RetrievalCache
+from src.repositories.snapshots import SnapshotStore
+from src.repositories.factory import RepositoryFactory
 
-__all__ = ["VectorStoreRepository", "ChromaRepository"]
+__all__ = [
+    "VectorStoreRepository",
+    "ChromaRepository",
+    "ShardedChromaRepository",
+    "CompressedRepository",
+    "VectorCodec",
+    "RepositoryRetriever",
+    "AdaptiveRetriever",
+    "CachedRepository",
+    "RetrievalCache",
+    "SnapshotStore",
+    "RepositoryFactory",
+]
@@ -1,7 +1,8 @@
 """Base class for vector store repositories using Repository pattern."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Any
+from typing import Collection, List, Any, Tuple
 
 from langchain_core.documents import Document
 
@@ -10,12 +11,13 @@ class VectorStoreRepository(ABC):
     """Abstract base class for vector store operations."""
 
     @abstractmethod
-    def save(self, documents: List[Document]) -> None:
+    def save(self, documents: Collection[Document]) -> None:
         """
         Save documents to the vector store.
 
         Args:
-            documents: List of documents to save.
+            documents: Documents to save: a list, or a DocumentStream that
+                should be consumed in batches rather than materialized.
         """
         pass
 
@@ -53,6 +55,74 @@ class VectorStoreRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def search_with_scores(self, query: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """
+        Search for similar documents with relevance scores.
+
+        Args:
+            query: Search query.
+            k: Number of results to return.
+
+        Returns:
+            List of (document, relevance) tuples, most relevant first.
+            Higher relevance means more similar.
+        """
+        pass
+
+    @abstractmethod
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query with the store's embedding function.
+
+        Args:
+            query: Search query.
+
+        Returns:
+            Query vector.
+        """
+        pass
+
+    @abstractmethod
+    def search_by_vector_with_scores(
+        self,
+        vector: List[float],
+        k: int = 3,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Search with an already embedded query.
+
+        Args:
+            vector: Query vector from embed_query().
+            k: Number of results to return.
+
+        Returns:
+            List of (document, relevance) tuples, most relevant first.
+        """
+        pass
+
+    def index_version(self) -> str:
+        """
+        Identify the indexed contents.
+
+        The value changes whenever the index is rebuilt or replaced, so
+        results cached under one version are never served for another.
+        """
+        return f"{type(self).__name__}:{id(self)}"
+
+    async def asearch(self, query: str, k: int = 3) -> List[Document]:
+        """
+        Search for similar documents from asyncio code.
+
+        The default runs search() in a worker thread; stores with a native
+        async client should override it.
+        """
+        return await asyncio.to_thread(self.search, query, k)
+
+    async def asearch_with_scores(self, query: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """Search with relevance scores from asyncio code (see asearch)."""
+        return await asyncio.to_thread(self.search_with_scores, query, k)
+
     @abstractmethod
     def as_retriever(self, k: int = 3) -> Any:
         """
@@ -65,3 +135,7 @@ class VectorStoreRepository(ABC):
             Retriever instance.
         """
         pass
+
+    def close(self) -> None:
+        """Release resources held by the store (processes, clients)."""
+        pass
@@ -0,0 +1,146 @@
+"""Helpers for batched, resumable writes to vector stores."""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Sequence, Set, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.diagnostics.profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_id(doc: Document, position: int) -> str:
+    """Derive a stable id for a chunk from its content and position."""
+    digest = hashlib.sha1(doc.page_content.encode()).hexdigest()[:16]
+    return f"{position:08d}-{digest}"
+
+
+def batch_id(ids: Sequence[str]) -> str:
+    """Derive a stable id for a batch from the ids of its chunks."""
+    return hashlib.sha1("\n".join(ids).encode()).hexdigest()[:16]
+
+
+def batched(documents: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    """Split documents into lists of up to size, consuming them lazily."""
+    documents = iter(documents)
+    while True:
+        batch = list(islice(documents, size))
+        if not batch:
+            return
+        yield batch
+
+
+def embed_batches(
+    embeddings: Embeddings,
+    batches: Iterable[List[Document]],
+) -> Iterator[Tuple[List[Document], List[List[float]]]]:
+    """
+    Embed batches in a background thread, one batch ahead of the consumer.
+
+    While the caller writes batch N, batch N+1 is being embedded, so at most
+    two batches of vectors are held in memory at a time.
+
+    Args:
+        embeddings: Embedding function to use.
+        batches: Batches of documents to embed.
+
+    Yields:
+        Tuples of (batch, vectors).
+    """
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed") as pool:
+        pending = None
+        for batch in batches:
+            future = pool.submit(_embed, embeddings, [doc.page_content for doc in batch])
+            if pending is not None:
+                yield pending[0], pending[1].result()
+            pending = (batch, future)
+        if pending is not None:
+            yield pending[0], pending[1].result()
+
+
+def _embed(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """Embed texts as the embedding profiler stage."""
+    with profiler.stage("embedding"):
+        return embeddings.embed_documents(texts)
+
+
+class BatchCheckpoint:
+    """
+    Durable record of the batches already written to a store.
+
+    The checkpoint is rewritten atomically after every batch so that a
+    crashed build can skip completed batches when it is restarted.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            path: JSON file holding the checkpoint.
+        """
+        self.path = path
+        self.completed: Set[str] = set()
+        self.complete = False
+        if path.exists():
+            with open(path, "r") as f:
+                data = json.load(f)
+            self.completed = set(data.get("batches", []))
+            self.complete = data.get("complete", False)
+
+    def mark_started(self) -> None:
+        """Record that a build is in progress, before anything is written."""
+        self.complete = False
+        self._write()
+
+    def mark_batch(self, batch: str) -> None:
+        """Record a batch as written."""
+        self.completed.add(batch)
+        self._write()
+
+    def mark_complete(self) -> None:
+        """Record that every batch has been written."""
+        self.complete = True
+        self._write()
+
+    def _write(self) -> None:
+        """Atomically replace the checkpoint file."""
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"complete": self.complete, "batches": sorted(self.completed)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class BatchProgress:
+    """Logs progress and throughput of a batched build."""
+
+    def __init__(self, total_batches: int, total_items: int):
+        self.total_batches = total_batches
+        self.total_items = total_items
+        self.done_items = 0
+        self._saved_items = 0
+        self._start = time.monotonic()
+
+    def update(self, batch_number: int, items: int, skipped: bool = False) -> None:
+        """Record a finished batch and log progress."""
+        self.done_items += items
+        if not skipped:
+            self._saved_items += items
+        elapsed = time.monotonic() - self._start
+        rate = self._saved_items / elapsed if elapsed > 0 else 0.0
+        status = "skipped (already saved)" if skipped else "saved"
+        logger.info(
+            f"Batch {batch_number}/{self.total_batches} {status}: "
+            f"{self.done_items}/{self.total_items} chunks ({rate:.1f} chunks/s)"
+        )
@@ -0,0 +1,325 @@
+"""LRU cache of retrieval results in front of a repository."""
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from src.repositories.base import VectorStoreRepository
+from src.repositories.retriever import RepositoryRetriever
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedRetrieval:
+    """Cached query vector and top-k hits for one query."""
+
+    index_version: str
+    vector: List[float]
+    hits: List[Tuple[Document, float]]
+    k: int
+    cost_ms: float
+
+
+class RetrievalCache:
+    """
+    Thread-safe LRU map of query text to its vector and top-k hits.
+
+    Entries record the index version they were computed against and are
+    dropped on lookup once the repository reports a different version.
+    Lookups are counted per query in memory and merged into a hot-query
+    log every flush_interval seconds and on flush(); prewarming reads the
+    most frequent queries back. The log keeps the max_logged most frequent
+    queries as "count<TAB>query" lines.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        hot_query_log: Optional[str] = None,
+        max_logged: int = 10000,
+        flush_interval: float = 60.0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached queries.
+            hot_query_log: File that query counts are kept in.
+            max_logged: Most queries kept in the log.
+            flush_interval: Seconds between merges of new counts into the log.
+        """
+        self.max_entries = max_entries
+        self.hot_query_log = Path(hot_query_log) if hot_query_log else None
+        self.max_logged = max_logged
+        self.flush_interval = flush_interval
+        self._entries: "OrderedDict[str, CachedRetrieval]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Query counts not yet in the log; separate from the entry lock so
+        # counting never waits on lookups, and flushing never blocks either
+        self._pending: Counter = Counter()
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._hits = 0
+        self._partial_hits = 0
+        self._misses = 0
+        self._invalidated = 0
+        self._saved_ms = 0.0
+
+    def get(self, query: str, index_version: str) -> Optional[CachedRetrieval]:
+        """Get the entry for a query if it was computed against index_version."""
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is None:
+                return None
+            if entry.index_version != index_version:
+                del self._entries[query]
+                self._invalidated += 1
+                return None
+            self._entries.move_to_end(query)
+            return entry
+
+    def put(self, query: str, entry: CachedRetrieval) -> None:
+        """Store an entry, evicting the least recently used beyond max_entries."""
+        with self._lock:
+            self._entries[query] = entry
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record(self, outcome: str, saved_ms: float = 0.0) -> None:
+        """Count a lookup outcome ("hit", "partial" or "miss") and time saved."""
+        with self._lock:
+            if outcome == "hit":
+                self._hits += 1
+            elif outcome == "partial":
+                self._partial_hits += 1
+            else:
+                self._misses += 1
+            self._saved_ms += max(saved_ms, 0.0)
+
+    def log_query(self, query: str) -> None:
+        """Count a query for the hot-query log."""
+        if self.hot_query_log is None:
+            return
+        with self._pending_lock:
+            self._pending[" ".join(query.split())] += 1
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush(block=False)
+
+    def flush(self, block: bool = True) -> None:
+        """
+        Merge the pending query counts into the hot-query log.
+
+        Args:
+            block: Wait for a flush already in progress; if False, leave
+                the counts to that flush instead.
+        """
+        if self.hot_query_log is None or not self._flush_lock.acquire(blocking=block):
+            return
+        try:
+            self._last_flush = time.monotonic()
+            with self._pending_lock:
+                pending, self._pending = self._pending, Counter()
+            if not pending:
+                return
+            counts = self._read_log() + pending
+            self.hot_query_log.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.hot_query_log.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                for query, count in counts.most_common(self.max_logged):
+                    f.write(f"{count}\t{query}\n")
+            tmp_path.replace(self.hot_query_log)
+        finally:
+            self._flush_lock.release()
+
+    def hot_queries(self, limit: int) -> List[str]:
+        """Get the most frequent queries from the hot-query log and pending counts."""
+        if self.hot_query_log is None:
+            return []
+        with self._pending_lock:
+            pending = Counter(self._pending)
+        counts = self._read_log() + pending
+        return [query for query, _ in counts.most_common(limit)]
+
+    def _read_log(self) -> Counter:
+        """Read query counts from the hot-query log."""
+        counts: Counter = Counter()
+        if self.hot_query_log is None or not self.hot_query_log.exists():
+            return counts
+        with open(self.hot_query_log, "r") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                count, tab, query = line.partition("\t")
+                if tab and count.isdigit():
+                    counts[query] += int(count)
+                elif line.strip():
+                    # Logs written one query per line count each line once
+                    counts[line] += 1
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit counts, hit rate and the retrieval time saved."""
+        with self._lock:
+            lookups = self._hits + self._partial_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "partial_hits": self._partial_hits,
+                "misses": self._misses,
+                "invalidated": self._invalidated,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "saved_ms": round(self._saved_ms, 1),
+            }
+
+
+class CachedRepository(VectorStoreRepository):
+    """
+    Repository decorator that serves repeated queries from a RetrievalCache.
+
+    A hit returns the cached top-k without embedding or searching. A query
+    cached with a smaller k reuses its vector and only searches again. The
+    cache is keyed by exact query text and validated against the wrapped
+    repository's index_version(), so a rebuilt or swapped index never
+    serves stale chunks.
+    """
+
+    def __init__(
+        self,
+        repository: VectorStoreRepository,
+        cache: RetrievalCache,
+        prewarm_queries: Optional[List[str]] = None,
+        prewarm_k: int = 3,
+    ):
+        """
+        Initialize the cached repository.
+
+        Args:
+            repository: Repository to wrap.
+            cache: Cache, shared between the repositories of one agent.
+            prewarm_queries: Queries to compute whenever an index is loaded.
+            prewarm_k: k used when prewarming.
+        """
+        self.repository = repository
+        self.cache = cache
+        self.prewarm_queries = prewarm_queries or []
+        self.prewarm_k = prewarm_k
+
+    def save(self, documents: Collection[Document]) -> None:
+        """Save documents to the wrapped repository."""
+        self.repository.save(documents)
+
+    def load(self) -> bool:
+        """Load the wrapped repository and prewarm the cache for it."""
+        loaded = self.repository.load()
+        if loaded:
+            self.prewarm()
+        return loaded
+
+    def exists(self) -> bool:
+        """Check if the wrapped store exists."""
+        return self.repository.exists()
+
+    def search(self, query: str, k: int = 3) -> List[Document]:
+        """Search, serving repeated queries from the cache."""
+        return [doc for doc, _ in self.search_with_scores(query, k=k)]
+
+    def search_with_scores(self, query: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """Search with relevance scores, serving repeated queries from the cache."""
+        self.cache.log_query(query)
+        return self._lookup(query, k)
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query, reusing a cached vector if there is one."""
+        entry = self.cache.get(query, self.repository.index_version())
+        return entry.vector if entry is not None else self.repository.embed_query(query)
+
+    def search_by_vector_with_scores(
+        self,
+        vector: List[float],
+        k: int = 3,
+    ) -> List[Tuple[Document, float]]:
+        """Search the wrapped repository with an embedded query."""
+        return self.repository.search_by_vector_with_scores(vector, k=k)
+
+    def index_version(self) -> str:
+        """Get the wrapped repository's index version."""
+        return self.repository.index_version()
+
+    def as_retriever(self, k: int = 3) -> Any:
+        """Get a retriever that goes through the cache."""
+        return RepositoryRetriever(repository=self, k=k)
+
+    def close(self) -> None:
+        """Flush the hot-query log and close the wrapped repository."""
+        self.cache.flush()
+        self.repository.close()
+
+    def prewarm(self, queries: Optional[List[str]] = None, k: Optional[int] = None) -> int:
+        """
+        Compute and cache results for queries ahead of traffic.
+
+        Args:
+            queries: Queries to warm (default: prewarm_queries).
+            k: Results per query (default: prewarm_k).
+
+        Returns:
+            Number of queries that were computed (not already cached).
+        """
+        queries = self.prewarm_queries if queries is None else queries
+        k = k or self.prewarm_k
+        version = self.repository.index_version()
+        warmed = 0
+        for query in dict.fromkeys(queries):
+            entry = self.cache.get(query, version)
+            if entry is None or entry.k < k:
+                self._compute(query, k, version, entry)
+                warmed += 1
+        if warmed:
+            logger.info(f"Prewarmed retrieval cache with {warmed} queries")
+        return warmed
+
+    def _lookup(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Serve a query from the cache or compute and store it."""
+        start = time.perf_counter()
+        version = self.repository.index_version()
+        entry = self.cache.get(query, version)
+        if entry is not None and entry.k >= k:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.cache.record("hit", entry.cost_ms - elapsed_ms)
+            return entry.hits[:k]
+
+        computed = self._compute(query, k, version, entry)
+        if entry is not None:
+            # The cached vector saved the embedding step
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.cache.record("partial", entry.cost_ms - elapsed_ms)
+        else:
+            self.cache.record("miss")
+        return computed.hits
+
+    def _compute(
+        self,
+        query: str,
+        k: int,
+        version: str,
+        entry: Optional[CachedRetrieval],
+    ) -> CachedRetrieval:
+        """Embed (unless the vector is cached), search and cache a query."""
+        start = time.perf_counter()
+        vector = entry.vector if entry is not None else self.repository.embed_query(query)
+        hits = self.repository.search_by_vector_with_scores(vector, k=k)
+        cost_ms = (time.perf_counter() - start) * 1000
+        if entry is not None:
+            # Keep the full cost (including embedding) as the price of a hit
+            cost_ms = max(cost_ms, entry.cost_ms)
+        computed = CachedRetrieval(version, vector, hits, k, cost_ms)
+        self.cache.put(query, computed)
+        return computed
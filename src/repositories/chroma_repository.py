@@ -1,41 +1,117 @@
 """Chroma vector store repository implementation."""
 
 import logging
+from collections import deque
 from pathlib import Path
-from typing import List, Any, Optional
+from typing import Collection, List, Any, Optional, Tuple
 
+import chromadb
+from chromadb.api import ClientAPI
+from chromadb.config import Settings
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 
+from src.diagnostics.profiling import profiler
 from src.repositories.base import VectorStoreRepository
+from src.repositories.batching import (
+    BatchCheckpoint,
+    BatchProgress,
+    batch_id,
+    batched,
+    chunk_id,
+    embed_batches,
+)
 
 logger = logging.getLogger(__name__)
 
+COLLECTION_NAME = "langchain"
+
 
 class ChromaRepository(VectorStoreRepository):
     """Repository implementation using Chroma vector store."""
 
-    def __init__(self, persist_dir: str, embeddings: Embeddings):
+    CHECKPOINT_FILE = "ingest_checkpoint.json"
+
+    def __init__(
+        self,
+        persist_dir: str,
+        embeddings: Embeddings,
+        batch_size: int = 256,
+        memory_limit_mb: Optional[int] = None,
+    ):
         """
         Initialize the Chroma repository.
 
         Args:
             persist_dir: Directory to persist the vector store.
             embeddings: Embedding function to use.
+            batch_size: Number of chunks embedded and written per batch.
+            memory_limit_mb: Cap on the segments Chroma keeps loaded; least
+                recently used ones are evicted and reread from disk (None
+                keeps everything loaded).
         """
         self.persist_dir = persist_dir
         self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.memory_limit_mb = memory_limit_mb
         self._vectorstore: Optional[Chroma] = None
+        self._generation = 0
+        self._version: Optional[str] = None
+
+    def save(self, documents: Collection[Document]) -> None:
+        """
+        Save documents to Chroma in resumable batches.
 
-    def save(self, documents: List[Document]) -> None:
-        """Save documents to Chroma."""
+        Completed batches are recorded in a checkpoint file, so rerunning
+        save() with the same documents after a crash skips the batches that
+        were already written. Documents are consumed batch by batch, so a
+        streamed collection is never held in memory as a whole.
+        """
         logger.info("Creating embeddings and saving to Chroma...")
-        self._vectorstore = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            persist_directory=self.persist_dir,
-        )
+        Path(self.persist_dir).mkdir(parents=True, exist_ok=True)
+        checkpoint = BatchCheckpoint(Path(self.persist_dir) / self.CHECKPOINT_FILE)
+        # Written before Chroma creates any file, so exists() never takes a
+        # store interrupted in its first batch for a complete one
+        checkpoint.mark_started()
+        client = self._client()
+        self._vectorstore = self._open(client)
+        # Vectors are embedded here, so batches are written straight to the
+        # collection instead of through Chroma.add_texts()
+        collection = client.get_or_create_collection(COLLECTION_NAME, embedding_function=None)
+
+        total = len(documents)
+        progress = BatchProgress(-(-total // self.batch_size), total)
+
+        # Batches still to write, with their ids, in the order they're embedded
+        pending = deque()
+
+        def unsaved():
+            for number, batch in enumerate(batched(documents, self.batch_size), 1):
+                start = (number - 1) * self.batch_size
+                ids = [chunk_id(doc, start + i) for i, doc in enumerate(batch)]
+                bid = batch_id(ids)
+                if bid in checkpoint.completed:
+                    progress.update(number, len(batch), skipped=True)
+                else:
+                    pending.append((number, bid, ids))
+                    yield batch
+
+        # Embedding of the next batch overlaps with writing the current one
+        for batch, vectors in embed_batches(self.embeddings, unsaved()):
+            number, bid, ids = pending.popleft()
+            collection.upsert(
+                ids=ids,
+                embeddings=vectors,
+                documents=[doc.page_content for doc in batch],
+                metadatas=[doc.metadata or None for doc in batch],
+            )
+            checkpoint.mark_batch(bid)
+            progress.update(number, len(batch))
+
+        checkpoint.mark_complete()
+        self._generation += 1
+        self._version = None
         logger.info("Documents saved to Chroma successfully")
 
     def load(self) -> bool:
@@ -44,16 +120,40 @@ class ChromaRepository(VectorStoreRepository):
             return False
 
         logger.info("Loading existing vector database...")
-        self._vectorstore = Chroma(
-            persist_directory=self.persist_dir,
-            embedding_function=self.embeddings,
-        )
+        self._vectorstore = self._open(self._client())
+        self._version = None
         logger.info("Vector database loaded successfully")
         return True
 
+    def _client(self) -> ClientAPI:
+        """Get a client for the persisted store, with an LRU segment cache if limited."""
+        settings = Settings()
+        if self.memory_limit_mb is not None:
+            settings = Settings(
+                anonymized_telemetry=False,
+                chroma_segment_cache_policy="LRU",
+                chroma_memory_limit_bytes=self.memory_limit_mb * 2**20,
+            )
+        return chromadb.PersistentClient(path=self.persist_dir, settings=settings)
+
+    def _open(self, client: ClientAPI) -> Chroma:
+        """Open the persisted collection through a client."""
+        return Chroma(
+            collection_name=COLLECTION_NAME,
+            embedding_function=self.embeddings,
+            client=client,
+        )
+
     def exists(self) -> bool:
-        """Check if the Chroma store exists."""
-        return Path(self.persist_dir).exists()
+        """Check if a completely written Chroma store exists."""
+        if not Path(self.persist_dir).exists():
+            return False
+        checkpoint_path = Path(self.persist_dir) / self.CHECKPOINT_FILE
+        if checkpoint_path.exists():
+            return BatchCheckpoint(checkpoint_path).complete
+        # Stores written before checkpointing have a Chroma database but no
+        # checkpoint; save() writes the checkpoint before the database
+        return (Path(self.persist_dir) / "chroma.sqlite3").exists()
 
     def search(self, query: str, k: int = 3) -> List[Document]:
         """Search for similar documents."""
@@ -61,6 +161,38 @@ class ChromaRepository(VectorStoreRepository):
             raise RuntimeError("Vector store not initialized. Call load() or save() first.")
         return self._vectorstore.similarity_search(query, k=k)
 
+    def search_with_scores(self, query: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """Search for similar documents with relevance scores."""
+        if self._vectorstore is None:
+            raise RuntimeError("Vector store not initialized. Call load() or save() first.")
+        return self._vectorstore.similarity_search_with_relevance_scores(query, k=k)
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query with the store's embedding function."""
+        with profiler.stage("embedding"):
+            return self.embeddings.embed_query(query)
+
+    def search_by_vector_with_scores(
+        self,
+        vector: List[float],
+        k: int = 3,
+    ) -> List[Tuple[Document, float]]:
+        """Search with an embedded query, returning relevance scores."""
+        if self._vectorstore is None:
+            raise RuntimeError("Vector store not initialized. Call load() or save() first.")
+        hits = self._vectorstore.similarity_search_by_vector_with_relevance_scores(vector, k=k)
+        relevance = self._vectorstore._select_relevance_score_fn()
+        return [(doc, relevance(distance)) for doc, distance in hits]
+
+    def index_version(self) -> str:
+        """Identify the index by location, in-process saves and last completed build."""
+        # Computed once per load or save; it is read on every cached query
+        if self._version is None:
+            checkpoint = Path(self.persist_dir) / self.CHECKPOINT_FILE
+            stamp = checkpoint.stat().st_mtime_ns if checkpoint.exists() else 0
+            self._version = f"{Path(self.persist_dir).resolve()}:{self._generation}:{stamp}"
+        return self._version
+
     def as_retriever(self, k: int = 3) -> Any:
         """Get a retriever interface."""
         if self._vectorstore is None:
@@ -0,0 +1,385 @@
+"""Vector store with reduced, quantized embeddings in memory-mapped arrays."""
+
+import json
+import logging
+import math
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.diagnostics.profiling import profiler
+from src.repositories.base import VectorStoreRepository
+from src.repositories.batching import batched, chunk_id, embed_batches
+from src.repositories.compression import VectorCodec
+from src.repositories.retriever import RepositoryRetriever
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per block, bounding the float32 copy of int8/float16 codes
+BLOCK_ROWS = 65536
+
+
+class CompressedRepository(VectorStoreRepository):
+    """
+    Exact (brute-force) search over compressed vectors.
+
+    save() embeds the chunks to a temporary float32 array on disk, fits the
+    codec (PCA) on a sample of them and writes the compressed codes. Before
+    the full-precision vectors are deleted, the recall of the compressed
+    top-k against full-precision cosine search is measured on a sample of
+    stored vectors used as queries; it is logged with the bytes saved and
+    kept in the manifest (see stats()).
+
+    The codes and documents are loaded memory-mapped, so only the pages
+    touched by searches are resident. A store being replaced by save()
+    keeps serving searches until the new one is complete and loaded.
+    """
+
+    MANIFEST_FILE = "compressed.json"
+
+    def __init__(
+        self,
+        persist_dir: str,
+        embeddings: Embeddings,
+        reduction: str = "none",
+        dim: Optional[int] = None,
+        dtype: str = "float16",
+        batch_size: int = 256,
+        fit_sample: int = 10000,
+        eval_queries: int = 100,
+        eval_k: int = 5,
+    ):
+        """
+        Initialize the compressed repository.
+
+        Args:
+            persist_dir: Directory to persist the store.
+            embeddings: Embedding function to use.
+            reduction: "none", "pca" or "truncate".
+            dim: Dimensions kept by the reduction.
+            dtype: Stored precision: "float32", "float16" or "int8".
+            batch_size: Number of chunks embedded per batch.
+            fit_sample: Vectors the PCA is fitted on.
+            eval_queries: Stored vectors used as queries for the recall check.
+            eval_k: Depth of the recall check.
+        """
+        self.persist_dir = persist_dir
+        self.embeddings = embeddings
+        self.codec = VectorCodec(reduction, dim, dtype)
+        self.batch_size = batch_size
+        self.fit_sample = fit_sample
+        self.eval_queries = eval_queries
+        self.eval_k = eval_k
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._documents: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._version: Optional[str] = None
+
+    def save(self, documents: Collection[Document]) -> None:
+        """Embed, compress and store documents, replacing any previous contents."""
+        logger.info("Creating embeddings and saving compressed vectors...")
+        root = Path(self.persist_dir)
+        root.mkdir(parents=True, exist_ok=True)
+        # Files are replaced one by one below; without a manifest the mix of
+        # old and new files is never taken for a complete store
+        (root / self.MANIFEST_FILE).unlink(missing_ok=True)
+        # A new codec, so searches still served by the loaded one are unaffected
+        codec = VectorCodec(self.codec.reduction, self.codec.dim, self.codec.dtype)
+
+        total = len(documents)
+        raw_path = root / "full.tmp.npy"
+        raw = None
+        offsets = np.zeros(total, dtype=np.int64)
+        position = 0
+        offset = 0
+        with open(root / "documents.jsonl.tmp", "wb") as f:
+            embedded = embed_batches(self.embeddings, batched(documents, self.batch_size))
+            for batch, vectors in embedded:
+                if raw is None:
+                    raw = np.lib.format.open_memmap(
+                        raw_path, mode="w+", dtype=np.float32, shape=(total, len(vectors[0]))
+                    )
+                raw[position:position + len(batch)] = vectors
+                for i, doc in enumerate(batch):
+                    record = {
+                        "id": chunk_id(doc, position + i),
+                        "text": doc.page_content,
+                        "metadata": doc.metadata,
+                    }
+                    line = (json.dumps(record) + "\n").encode("utf-8")
+                    # Byte offsets, counted instead of asking the file
+                    offsets[position + i] = offset
+                    f.write(line)
+                    offset += len(line)
+                position += len(batch)
+        if raw is None:
+            raise ValueError("No documents to save")
+        raw.flush()
+
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(total, min(self.fit_sample, total), replace=False))
+        codec.fit(raw[sample])
+
+        codes = None
+        scales = np.ones(total, dtype=np.float32) if codec.dtype == "int8" else None
+        for start in range(0, total, BLOCK_ROWS):
+            projected = codec.project(raw[start:start + BLOCK_ROWS])
+            block, block_scales = codec.encode(projected)
+            if codes is None:
+                codes = np.lib.format.open_memmap(
+                    root / "vectors.tmp.npy",
+                    mode="w+",
+                    dtype=block.dtype,
+                    shape=(total, block.shape[1]),
+                )
+            codes[start:start + len(block)] = block
+            if scales is not None:
+                scales[start:start + len(block)] = block_scales
+        codes.flush()
+
+        stats = self._evaluate(raw, codes, scales, codec, rng)
+        del raw, codes
+
+        codec.save(str(root / "codec.tmp.npz"))
+        os.replace(root / "codec.tmp.npz", root / "codec.npz")
+        np.save(root / "offsets.tmp.npy", offsets)
+        os.replace(root / "offsets.tmp.npy", root / "offsets.npy")
+        if scales is not None:
+            np.save(root / "scales.tmp.npy", scales)
+            os.replace(root / "scales.tmp.npy", root / "scales.npy")
+        else:
+            # Scales left by an earlier int8 build would be applied on load
+            (root / "scales.npy").unlink(missing_ok=True)
+        os.replace(root / "vectors.tmp.npy", root / "vectors.npy")
+        os.replace(root / "documents.jsonl.tmp", root / "documents.jsonl")
+        raw_path.unlink()
+
+        manifest = root / self.MANIFEST_FILE
+        with open(manifest.with_suffix(".tmp"), "w") as f:
+            settings = {
+                "reduction": codec.reduction,
+                "dim": codec.dim,
+                "dtype": codec.dtype,
+            }
+            json.dump({**settings, "stats": stats}, f, indent=2)
+        os.replace(manifest.with_suffix(".tmp"), manifest)
+
+        logger.info(
+            f"Stored {total} vectors in {stats['stored_bytes'] / 2**20:.1f} MB instead of "
+            f"{stats['full_bytes'] / 2**20:.1f} MB ({stats['saved_fraction']:.0%} saved); "
+            f"recall@{stats['k']} against full precision: {stats['recall']:.3f}"
+        )
+        self._generation += 1
+        self.load()
+
+    def _evaluate(
+        self,
+        raw: np.ndarray,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray],
+        codec: VectorCodec,
+        rng: np.random.Generator,
+    ) -> Dict[str, Any]:
+        """
+        Measure the bytes saved and the top-k recall of compressed search.
+
+        All eval queries are scored together, one matrix product per block
+        of rows, keeping a running top-k per query.
+        """
+        total, full_dim = raw.shape
+        k = min(self.eval_k, total - 1)
+        recalls = []
+        if k > 0:
+            queries = np.sort(rng.choice(total, min(self.eval_queries, total), replace=False))
+            vectors = np.asarray(raw[queries], dtype=np.float32)
+            exact_queries = (
+                vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            ).T
+            approx_queries = codec.project(vectors).T
+            exact = approx = None
+            for start in range(0, total, BLOCK_ROWS):
+                block = raw[start:start + BLOCK_ROWS]
+                norms = np.maximum(np.linalg.norm(block, axis=1), 1e-12)
+                exact_scores = (block @ exact_queries) / norms[:, None]
+                approx_scores = VectorCodec.scores(
+                    codes[start:start + BLOCK_ROWS],
+                    scales[start:start + BLOCK_ROWS] if scales is not None else None,
+                    approx_queries,
+                )
+                # The query vector itself is trivially its own best match
+                inside = np.nonzero((queries >= start) & (queries < start + len(block)))[0]
+                exact_scores[queries[inside] - start, inside] = -np.inf
+                approx_scores[queries[inside] - start, inside] = -np.inf
+                exact = _merge_top(exact, exact_scores, start, k)
+                approx = _merge_top(approx, approx_scores, start, k)
+            for column in range(len(queries)):
+                expected = set(exact[1][:, column].tolist())
+                recalls.append(len(expected.intersection(approx[1][:, column].tolist())) / k)
+
+        full_bytes = total * full_dim * 4
+        stored_bytes = codes.nbytes + (scales.nbytes if scales is not None else 0)
+        return {
+            "vectors": total,
+            "full_dim": full_dim,
+            "stored_dim": codes.shape[1],
+            "full_bytes": full_bytes,
+            "stored_bytes": stored_bytes,
+            "saved_fraction": 1 - stored_bytes / full_bytes,
+            "k": k,
+            "recall": float(np.mean(recalls)) if recalls else 1.0,
+        }
+
+    def load(self) -> bool:
+        """Open an existing store with its vectors memory-mapped."""
+        if not self.exists():
+            return False
+        root = Path(self.persist_dir)
+        logger.info("Loading compressed vector store...")
+        codec = VectorCodec.load(str(root / "codec.npz"))
+        codes = np.load(root / "vectors.npy", mmap_mode="r")
+        scales_path = root / "scales.npy"
+        scales = np.load(scales_path, mmap_mode="r") if scales_path.exists() else None
+        offsets = np.load(root / "offsets.npy")
+        with open(root / "documents.jsonl", "rb") as f:
+            documents = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Swapped in at once; searches already running keep the arrays they
+        # started with, and a replaced mapping is unmapped once they drop it
+        with self._lock:
+            self.codec = codec
+            self._codes, self._scales, self._offsets = codes, scales, offsets
+            self._documents = documents
+            self._version = None
+        logger.info(f"Compressed vector store loaded ({len(codes)} vectors)")
+        return True
+
+    def exists(self) -> bool:
+        """Check if a completely written store exists."""
+        return (Path(self.persist_dir) / self.MANIFEST_FILE).exists()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the size and recall measured when the store was saved."""
+        with open(Path(self.persist_dir) / self.MANIFEST_FILE, "r") as f:
+            return json.load(f)["stats"]
+
+    def search(self, query: str, k: int = 3) -> List[Document]:
+        """Search for similar documents."""
+        return [doc for doc, _ in self.search_with_scores(query, k=k)]
+
+    def search_with_scores(self, query: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """Search for similar documents with relevance scores."""
+        return self.search_by_vector_with_scores(self.embed_query(query), k=k)
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query with the store's embedding function."""
+        with profiler.stage("embedding"):
+            return self.embeddings.embed_query(query)
+
+    def search_by_vector_with_scores(
+        self,
+        vector: List[float],
+        k: int = 3,
+    ) -> List[Tuple[Document, float]]:
+        """Score the query against every stored code and return the top-k."""
+        with self._lock:
+            codec, codes, scales = self.codec, self._codes, self._scales
+            offsets, documents = self._offsets, self._documents
+        if codes is None:
+            raise RuntimeError("Vector store not initialized. Call load() or save() first.")
+        query = codec.project([vector])[0]
+        scores = self._scan(
+            lambda s: VectorCodec.scores(
+                codes[s:s + BLOCK_ROWS],
+                scales[s:s + BLOCK_ROWS] if scales is not None else None,
+                query,
+            ),
+            len(codes),
+        )
+        return [
+            (_document(documents, int(offsets[index])), _relevance(float(scores[index])))
+            for index in _top(scores, min(k, len(scores)))
+        ]
+
+    def index_version(self) -> str:
+        """Identify the index by location, in-process saves and last completed build."""
+        # Computed once per load; it is read on every cached query
+        if self._version is None:
+            manifest = Path(self.persist_dir) / self.MANIFEST_FILE
+            stamp = manifest.stat().st_mtime_ns if manifest.exists() else 0
+            self._version = f"{Path(self.persist_dir).resolve()}:{self._generation}:{stamp}"
+        return self._version
+
+    def as_retriever(self, k: int = 3) -> Any:
+        """Get a retriever interface."""
+        if self._codes is None:
+            raise RuntimeError("Vector store not initialized. Call load() or save() first.")
+        return RepositoryRetriever(repository=self, k=k)
+
+    def close(self) -> None:
+        """Unmap the vectors and documents."""
+        with self._lock:
+            if self._documents is not None:
+                self._documents.close()
+            self._documents = None
+            self._codes = self._scales = self._offsets = None
+
+    @staticmethod
+    def _scan(score_block: Any, total: int) -> np.ndarray:
+        """Concatenate per-block scores over all rows."""
+        return np.concatenate([score_block(s) for s in range(0, total, BLOCK_ROWS)])
+
+
+def _document(documents: mmap.mmap, offset: int) -> Document:
+    """Read the stored document at a byte offset of the documents file."""
+    record = json.loads(documents[offset:documents.find(b"\n", offset)])
+    return Document(
+        page_content=record["text"], metadata=record["metadata"] or {}, id=record["id"]
+    )
+
+
+def _merge_top(
+    best: Optional[Tuple[np.ndarray, np.ndarray]],
+    scores: np.ndarray,
+    start: int,
+    k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge a block of per-query scores into a running top-k.
+
+    Args:
+        best: (scores, rows) of shape (k, queries) so far, or None.
+        scores: Block scores of shape (rows, queries).
+        start: Row number of the block's first row.
+        k: Depth kept.
+
+    Returns:
+        Updated (scores, rows), unordered within each column.
+    """
+    rows = np.broadcast_to(np.arange(start, start + len(scores))[:, None], scores.shape)
+    if best is not None:
+        scores = np.concatenate([best[0], scores])
+        rows = np.concatenate([best[1], rows])
+    keep = np.argpartition(-scores, min(k, len(scores)) - 1, axis=0)[:k]
+    return np.take_along_axis(scores, keep, 0), np.take_along_axis(rows, keep, 0)
+
+
+def _top(scores: np.ndarray, k: int) -> List[int]:
+    """Indices of the k highest scores, best first."""
+    if k <= 0:
+        return []
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])].tolist()
+
+
+def _relevance(similarity: float) -> float:
+    """Convert a cosine similarity to the relevance Chroma reports for unit vectors."""
+    # Squared L2 distance between unit vectors is 2 - 2 cos
+    return 1.0 - (2.0 - 2.0 * similarity) / math.sqrt(2)
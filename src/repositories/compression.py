@@ -0,0 +1,131 @@
+"""Dimensionality reduction and scalar quantization of embedding vectors."""
+
+import logging
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REDUCTIONS = ("none", "pca", "truncate")
+DTYPES = ("float32", "float16", "int8")
+
+
+class VectorCodec:
+    """
+    Maps embeddings to compact stored codes and scores queries against them.
+
+    Vectors are first reduced (PCA onto the top principal components, or
+    truncation to the leading dimensions for models trained to allow it)
+    and L2-normalized, so a dot product is the cosine similarity. They are
+    then stored as float32, float16 or int8; int8 codes keep one float32
+    scale per vector (its largest absolute component / 127). Queries go
+    through the same reduction and are compared at float32.
+    """
+
+    def __init__(self, reduction: str = "none", dim: Optional[int] = None, dtype: str = "float16"):
+        """
+        Initialize the codec.
+
+        Args:
+            reduction: "none", "pca" or "truncate".
+            dim: Dimensions kept by the reduction.
+            dtype: Stored precision: "float32", "float16" or "int8".
+
+        Raises:
+            ValueError: If a setting is not supported.
+        """
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unsupported vector reduction: {reduction}")
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        if reduction != "none" and not dim:
+            raise ValueError(f"Reduction {reduction} requires reduced_dim")
+        self.reduction = reduction
+        self.dim = dim
+        self.dtype = dtype
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+
+    def fit(self, sample: np.ndarray) -> None:
+        """
+        Fit the reduction to a sample of vectors (PCA only).
+
+        Args:
+            sample: Array of shape (vectors, dimensions).
+        """
+        if self.reduction != "pca":
+            return
+        sample = np.asarray(sample, dtype=np.float32)
+        self.mean = sample.mean(axis=0)
+        _, _, vt = np.linalg.svd(sample - self.mean, full_matrices=False)
+        if vt.shape[0] < self.dim:
+            logger.warning(
+                f"PCA fitted on {sample.shape[0]} vectors keeps {vt.shape[0]} "
+                f"dimensions instead of {self.dim}"
+            )
+        self.components = vt[: self.dim].astype(np.float32)
+
+    def project(self, vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        """Reduce and L2-normalize vectors; returns float32 rows."""
+        x = np.asarray(vectors, dtype=np.float32)
+        if self.reduction == "pca":
+            x = (x - self.mean) @ self.components.T
+        elif self.reduction == "truncate":
+            x = x[:, : self.dim]
+        norms = np.linalg.norm(x, axis=1, keepdims=True)
+        return x / np.maximum(norms, 1e-12)
+
+    def encode(self, projected: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Quantize projected vectors.
+
+        Returns:
+            Tuple of (codes, scales); scales is None unless dtype is int8.
+        """
+        if self.dtype != "int8":
+            return projected.astype(self.dtype), None
+        scales = np.abs(projected).max(axis=1) / 127.0
+        scales = np.maximum(scales, 1e-12).astype(np.float32)
+        codes = np.round(projected / scales[:, None]).astype(np.int8)
+        return codes, scales
+
+    @staticmethod
+    def scores(codes: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of a projected query to each code row.
+
+        Args:
+            codes: Stored codes, one row per vector.
+            scales: Per-row int8 scales, or None.
+            query: Projected query, or a (dim, queries) matrix of them as
+                columns to score several at once.
+
+        Returns:
+            Scores of shape (rows,), or (rows, queries) for a matrix.
+        """
+        result = codes.astype(np.float32) @ query
+        if scales is None:
+            return result
+        return result * (scales[:, None] if result.ndim > 1 else scales)
+
+    def save(self, path: str) -> None:
+        """Write the codec settings and fitted reduction to an .npz file."""
+        arrays = {"mean": self.mean, "components": self.components}
+        np.savez(
+            path,
+            reduction=self.reduction,
+            dim=self.dim or 0,
+            dtype=self.dtype,
+            **{name: value for name, value in arrays.items() if value is not None},
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "VectorCodec":
+        """Read a codec written by save()."""
+        with np.load(path) as data:
+            codec = cls(str(data["reduction"]), int(data["dim"]) or None, str(data["dtype"]))
+            if "components" in data:
+                codec.mean = data["mean"]
+                codec.components = data["components"]
+        return codec
@@ -0,0 +1,104 @@
+"""Factory for creating vector store repositories."""
+
+from typing import TYPE_CHECKING, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from src.repositories.base import VectorStoreRepository
+from src.repositories.chroma_repository import ChromaRepository
+from src.repositories.compressed_repository import CompressedRepository
+from src.repositories.sharded_repository import ShardedChromaRepository
+
+if TYPE_CHECKING:
+    from src.agent.config_loader import AgentConfig
+
+
+class RepositoryFactory:
+    """Factory for creating vector store repositories."""
+
+    @staticmethod
+    def create(
+        persist_dir: str,
+        embeddings: Embeddings,
+        store: str = "chroma",
+        num_shards: int = 4,
+        batch_size: int = 256,
+        memory_limit_mb: Optional[int] = None,
+        reduction: str = "none",
+        reduced_dim: Optional[int] = None,
+        vector_dtype: str = "float16",
+    ) -> VectorStoreRepository:
+        """
+        Create a vector store repository.
+
+        Args:
+            persist_dir: Directory to persist the vector store.
+            embeddings: Embedding function to use.
+            store: Store type ("chroma", "sharded" or "compressed").
+            num_shards: Number of shards for a new sharded store.
+            batch_size: Number of chunks embedded and written per batch.
+            memory_limit_mb: Cap on loaded index segments (chroma).
+            reduction: "none", "pca" or "truncate" (compressed).
+            reduced_dim: Dimensions kept by the reduction (compressed).
+            vector_dtype: "float32", "float16" or "int8" (compressed).
+
+        Returns:
+            VectorStoreRepository instance.
+
+        Raises:
+            ValueError: If the store type is not supported.
+        """
+        if store == "chroma":
+            return ChromaRepository(
+                persist_dir=persist_dir,
+                embeddings=embeddings,
+                batch_size=batch_size,
+                memory_limit_mb=memory_limit_mb,
+            )
+        if store == "sharded":
+            return ShardedChromaRepository(
+                persist_dir=persist_dir,
+                embeddings=embeddings,
+                num_shards=num_shards,
+                batch_size=batch_size,
+            )
+        if store == "compressed":
+            return CompressedRepository(
+                persist_dir=persist_dir,
+                embeddings=embeddings,
+                reduction=reduction,
+                dim=reduced_dim,
+                dtype=vector_dtype,
+                batch_size=batch_size,
+            )
+        raise ValueError(f"Unsupported vector store: {store}")
+
+    @staticmethod
+    def create_from_agent_config(
+        config: "AgentConfig",
+        embeddings: Embeddings,
+        persist_dir: str,
+    ) -> VectorStoreRepository:
+        """
+        Create a repository from AgentConfig.
+
+        Args:
+            config: Agent configuration.
+            embeddings: Embedding function to use.
+            persist_dir: Directory for this store (the config's persist_dir
+                or a snapshot directory below it).
+
+        Returns:
+            VectorStoreRepository instance.
+        """
+        return RepositoryFactory.create(
+            persist_dir=persist_dir,
+            embeddings=embeddings,
+            store=config.vector_store,
+            num_shards=config.num_shards,
+            batch_size=config.batch_size,
+            memory_limit_mb=config.store_memory_limit_mb,
+            reduction=config.vector_reduction,
+            reduced_dim=config.reduced_dim,
+            vector_dtype=config.vector_dtype,
+        )
@@ -0,0 +1,85 @@
+"""LangChain retriever backed by a VectorStoreRepository."""
+
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+class RepositoryRetriever(BaseRetriever):
+    """Retriever that delegates to a repository's search()."""
+
+    repository: Any
+    k: int = 3
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> List[Document]:
+        """Get the top-k documents for a query from the repository."""
+        return self.repository.search(query, k=self.k)
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+    ) -> List[Document]:
+        """Get the top-k documents for a query from asyncio code."""
+        return await self.repository.asearch(query, k=self.k)
+
+
+class AdaptiveRetriever(BaseRetriever):
+    """
+    Retriever that picks the number of chunks from their relevance scores.
+
+    Fetches max_k candidates with scores and keeps them in order while
+    their relevance is at least score_threshold and no more than
+    score_drop below the best candidate. At least min_k chunks are kept
+    whatever their scores. Either cut can be disabled with None.
+    """
+
+    repository: Any
+    min_k: int = 1
+    max_k: int = 6
+    score_threshold: Optional[float] = None
+    score_drop: Optional[float] = None
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> List[Document]:
+        """Get the documents that pass the score cuts."""
+        return self.select(self.repository.search_with_scores(query, k=self.max_k))
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+    ) -> List[Document]:
+        """Get the documents that pass the score cuts from asyncio code."""
+        return self.select(await self.repository.asearch_with_scores(query, k=self.max_k))
+
+    def select(self, hits: List[Tuple[Document, float]]) -> List[Document]:
+        """Cut scored candidates (most relevant first) to the adaptive depth."""
+        if not hits:
+            return []
+        best = hits[0][1]
+        depth = 0
+        for _, score in hits:
+            if self.score_threshold is not None and score < self.score_threshold:
+                break
+            if self.score_drop is not None and best - score > self.score_drop:
+                break
+            depth += 1
+        depth = max(self.min_k, depth)
+        return [doc for doc, _ in hits[:depth]]
@@ -0,0 +1,414 @@
+"""Sharded vector store repository with scatter-gather search."""
+
+import hashlib
+import heapq
+import json
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.diagnostics.profiling import profiler
+from src.repositories.base import VectorStoreRepository
+from src.repositories.batching import batched, chunk_id, embed_batches
+from src.repositories.retriever import RepositoryRetriever
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "langchain"
+MANIFEST_FILE = "shards.json"
+
+
+def _shard_worker(path: str, conn: Any) -> None:
+    """
+    Serve one shard's Chroma collection over a pipe.
+
+    Runs in a child process. Requests are (command, *args) tuples and every
+    request gets exactly one ("ok", result) or ("error", message) reply.
+    """
+    import chromadb
+
+    collection = chromadb.PersistentClient(path=path).get_or_create_collection(
+        COLLECTION_NAME
+    )
+
+    while True:
+        command, *args = conn.recv()
+        if command == "close":
+            conn.send(("ok", None))
+            break
+        try:
+            if command == "add":
+                ids, embeddings, texts, metadatas = args
+                collection.upsert(
+                    ids=ids,
+                    embeddings=embeddings,
+                    documents=texts,
+                    metadatas=[m or None for m in metadatas],
+                )
+                result = len(ids)
+            elif command == "query":
+                embedding, k = args
+                k = min(k, collection.count())
+                if k == 0:
+                    result = []
+                else:
+                    found = collection.query(query_embeddings=[embedding], n_results=k)
+                    result = list(zip(
+                        found["ids"][0],
+                        found["documents"][0],
+                        found["metadatas"][0],
+                        found["distances"][0],
+                    ))
+            elif command == "get":
+                limit, offset = args
+                found = collection.get(
+                    limit=limit,
+                    offset=offset,
+                    include=["embeddings", "documents", "metadatas"],
+                )
+                result = (
+                    found["ids"],
+                    [list(map(float, e)) for e in found["embeddings"]],
+                    found["documents"],
+                    found["metadatas"],
+                )
+            elif command == "delete":
+                (ids,) = args
+                collection.delete(ids=ids)
+                result = len(ids)
+            elif command == "count":
+                result = collection.count()
+            else:
+                raise ValueError(f"Unknown shard command: {command}")
+            conn.send(("ok", result))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _ShardClient:
+    """Parent-side handle for one shard worker process."""
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_shard_worker,
+            args=(str(path), child_conn),
+            name=f"shard-{name}",
+            daemon=True,
+        )
+        self._process.start()
+        self._lock = threading.Lock()
+
+    def call(self, command: str, *args: Any) -> Any:
+        """Send a request to the worker and wait for its reply."""
+        with self._lock:
+            self._conn.send((command, *args))
+            status, result = self._conn.recv()
+        if status == "error":
+            raise RuntimeError(f"Shard {self.name} failed on {command}: {result}")
+        return result
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        if self._process.is_alive():
+            try:
+                self.call("close")
+            except (EOFError, OSError):
+                pass
+        self._process.join(timeout=10)
+
+
+class ShardedChromaRepository(VectorStoreRepository):
+    """
+    Repository that partitions chunks across several Chroma shards.
+
+    Each shard lives in its own directory below persist_dir and is served by
+    a local worker process. Chunks are assigned to shards by rendezvous
+    hashing of their ids, so adding a shard only moves the chunks the new
+    shard now owns, together with their stored embeddings. Queries are
+    embedded once, fanned out to all shards in parallel, and the per-shard
+    results are merged into a global top-k.
+
+    The manifest lists the shards and whether the last save() completed.
+    A shard being filled by add_shard() is recorded before any chunk moves,
+    so an interrupted rebalance loses nothing and is finished by the next
+    load().
+    """
+
+    def __init__(
+        self,
+        persist_dir: str,
+        embeddings: Embeddings,
+        num_shards: int = 4,
+        batch_size: int = 256,
+    ):
+        """
+        Initialize the sharded repository.
+
+        Args:
+            persist_dir: Directory holding one subdirectory per shard.
+            embeddings: Embedding function to use.
+            num_shards: Number of shards to create for a new store.
+            batch_size: Number of chunks embedded and sent per request.
+        """
+        self.persist_dir = persist_dir
+        self.embeddings = embeddings
+        self.num_shards = num_shards
+        self.batch_size = batch_size
+        self._shards: Dict[str, _ShardClient] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._version: Optional[str] = None
+
+    def save(self, documents: Collection[Document]) -> None:
+        """Embed documents and distribute them across the shards."""
+        root = Path(self.persist_dir)
+        root.mkdir(parents=True, exist_ok=True)
+        if not self._shards:
+            names = self._read_manifest().get("shards") or [
+                f"shard-{i:03d}" for i in range(self.num_shards)
+            ]
+            self._start(names)
+        # exists() is false until every chunk has been written
+        self._write_manifest(complete=False)
+
+        logger.info(f"Creating embeddings and saving to {len(self._shards)} shards...")
+        embedded = embed_batches(self.embeddings, batched(documents, self.batch_size))
+        for number, (batch, vectors) in enumerate(embedded):
+            start = number * self.batch_size
+            ids = [chunk_id(doc, start + i) for i, doc in enumerate(batch)]
+
+            routed: Dict[str, Tuple[list, list, list, list]] = {}
+            for doc_id, vector, doc in zip(ids, vectors, batch):
+                group = routed.setdefault(self._owner(doc_id), ([], [], [], []))
+                group[0].append(doc_id)
+                group[1].append(vector)
+                group[2].append(doc.page_content)
+                group[3].append(doc.metadata)
+
+            self._fan_out(
+                {name: ("add", *group) for name, group in routed.items()}
+            )
+        self._write_manifest(complete=True)
+        self._generation += 1
+        self._version = None
+        logger.info("Documents saved to shards successfully")
+
+    def load(self) -> bool:
+        """Start worker processes for an existing sharded store."""
+        if not self.exists():
+            return False
+
+        logger.info("Loading existing sharded vector database...")
+        manifest = self._read_manifest()
+        self._start(manifest["shards"])
+        self._version = None
+        if manifest.get("rebalancing"):
+            logger.info(f"Resuming interrupted rebalance into {manifest['rebalancing']}")
+            self._rebalance(manifest["rebalancing"])
+        logger.info(f"Sharded vector database loaded ({len(self._shards)} shards)")
+        return True
+
+    def exists(self) -> bool:
+        """Check if a completely written sharded store exists."""
+        return bool(self._read_manifest().get("complete"))
+
+    def search(self, query: str, k: int = 3) -> List[Document]:
+        """Search all shards and return the global top-k documents."""
+        return [doc for doc, _ in self.search_with_scores(query, k=k)]
+
+    def search_with_scores(self, query: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """Search all shards and return the global top-k with relevance scores."""
+        return self.search_by_vector_with_scores(self.embed_query(query), k=k)
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query once for all shards."""
+        with profiler.stage("embedding"):
+            return self.embeddings.embed_query(query)
+
+    def search_by_vector_with_scores(
+        self,
+        vector: List[float],
+        k: int = 3,
+    ) -> List[Tuple[Document, float]]:
+        """Fan an embedded query out to all shards and merge the top-k."""
+        if not self._shards:
+            raise RuntimeError("Vector store not initialized. Call load() or save() first.")
+
+        with self._lock:
+            names = list(self._shards)
+        results = self._fan_out({name: ("query", vector, k) for name in names})
+        # A chunk being moved by add_shard() can briefly be in two shards
+        unique: Dict[str, tuple] = {}
+        for shard_hits in results.values():
+            for hit in shard_hits:
+                if hit[0] not in unique or hit[3] < unique[hit[0]][3]:
+                    unique[hit[0]] = hit
+        hits = heapq.nsmallest(k, unique.values(), key=lambda hit: hit[3])
+        return [
+            (
+                Document(page_content=text, metadata=metadata or {}, id=doc_id),
+                _relevance(distance),
+            )
+            for doc_id, text, metadata, distance in hits
+        ]
+
+    def index_version(self) -> str:
+        """Identify the index by location, in-process changes and shard layout."""
+        # Computed once per load or change; it is read on every cached query
+        if self._version is None:
+            manifest = Path(self.persist_dir) / MANIFEST_FILE
+            stamp = manifest.stat().st_mtime_ns if manifest.exists() else 0
+            self._version = f"{Path(self.persist_dir).resolve()}:{self._generation}:{stamp}"
+        return self._version
+
+    def as_retriever(self, k: int = 3) -> Any:
+        """Get a retriever interface."""
+        if not self._shards:
+            raise RuntimeError("Vector store not initialized. Call load() or save() first.")
+        return RepositoryRetriever(repository=self, k=k)
+
+    def add_shard(self) -> str:
+        """
+        Add a shard and move the chunks it now owns into it.
+
+        Moved chunks keep their stored embeddings, so nothing is re-embedded.
+
+        Returns:
+            The new shard's name.
+        """
+        if not self._shards:
+            raise RuntimeError("Vector store not initialized. Call load() or save() first.")
+
+        name = f"shard-{len(self._shards):03d}"
+        while name in self._shards:
+            name = f"{name}-x"
+        self._start(list(self._shards) + [name])
+        # Record the new shard before moving anything into it
+        self._write_manifest(complete=True, rebalancing=name)
+        moved = self._rebalance(name)
+        logger.info(f"Added {name}; moved {moved} chunks without re-embedding")
+        return name
+
+    def _rebalance(self, name: str) -> int:
+        """
+        Move the chunks that shard `name` owns into it from the other shards.
+
+        Chunks are copied before they are deleted from their source, so the
+        move can be repeated after an interruption.
+
+        Returns:
+            The number of chunks moved.
+        """
+        moved = 0
+        for source in [shard for shard in self._shards if shard != name]:
+            offset = 0
+            while True:
+                ids, vectors, texts, metadatas = self._shards[source].call(
+                    "get", self.batch_size, offset
+                )
+                if not ids:
+                    break
+                move = [i for i, doc_id in enumerate(ids) if self._owner(doc_id) == name]
+                if move:
+                    self._shards[name].call(
+                        "add",
+                        [ids[i] for i in move],
+                        [vectors[i] for i in move],
+                        [texts[i] for i in move],
+                        [metadatas[i] for i in move],
+                    )
+                    self._shards[source].call("delete", [ids[i] for i in move])
+                    moved += len(move)
+                # Deleted rows shift the remaining ones down
+                offset += len(ids) - len(move)
+
+        self._write_manifest(complete=True)
+        self._generation += 1
+        self._version = None
+        return moved
+
+    def close(self) -> None:
+        """Stop all shard worker processes."""
+        with self._lock:
+            shards, self._shards = self._shards, {}
+            pool, self._pool = self._pool, None
+        for shard in shards.values():
+            shard.close()
+        if pool is not None:
+            pool.shutdown()
+
+    def _start(self, names: List[str]) -> None:
+        """Start workers for any shards that aren't running yet."""
+        started = {}
+        for name in names:
+            if name not in self._shards:
+                path = Path(self.persist_dir) / name
+                path.mkdir(parents=True, exist_ok=True)
+                started[name] = _ShardClient(name, path)
+
+        # Swapped under the lock _fan_out() submits under, so nothing is
+        # submitted to a pool that was shut down; requests already queued still run
+        with self._lock:
+            self._shards = {**self._shards, **started}
+            old_pool = self._pool
+            self._pool = ThreadPoolExecutor(
+                max_workers=len(self._shards), thread_name_prefix="shard-fanout"
+            )
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def _fan_out(self, requests: Dict[str, tuple]) -> Dict[str, Any]:
+        """Send one request per shard in parallel and gather the replies."""
+        with self._lock:
+            futures = {
+                name: self._pool.submit(self._shards[name].call, *request)
+                for name, request in requests.items()
+            }
+        return {name: future.result() for name, future in futures.items()}
+
+    def _owner(self, doc_id: str) -> str:
+        """Pick the shard for a chunk by rendezvous (highest random weight) hashing."""
+        return max(
+            self._shards,
+            key=lambda name: hashlib.md5(f"{name}:{doc_id}".encode()).digest(),
+        )
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        """Read the manifest, or an empty dict if absent or unreadable."""
+        path = Path(self.persist_dir) / MANIFEST_FILE
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring unreadable shard manifest in {self.persist_dir}")
+            return {}
+
+    def _write_manifest(self, complete: bool, rebalancing: Optional[str] = None) -> None:
+        """Record the shard names, whether the store is complete and any rebalance."""
+        path = Path(self.persist_dir) / MANIFEST_FILE
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"shards": list(self._shards), "complete": complete, "rebalancing": rebalancing},
+                f,
+            )
+        tmp_path.replace(path)
+
+
+def _relevance(distance: float) -> float:
+    """Convert a Chroma L2 distance to LangChain's relevance score."""
+    return 1.0 - distance / math.sqrt(2)
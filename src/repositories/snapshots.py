@@ -0,0 +1,169 @@
+"""Versioned index snapshots published through an atomic pointer file."""
+
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """
+    Manages immutable index snapshots below a root directory.
+
+    Layout::
+
+        <root>/CURRENT              # name of the published snapshot
+        <root>/snapshots/<version>/ # one complete vector store per version
+        <root>/snapshots/<version>/.leases/<pid>
+
+    A build writes into a fresh snapshot directory and is made visible by
+    atomically replacing the CURRENT pointer, so readers never observe a
+    half-written index. Processes that serve a snapshot hold a lease on it;
+    snapshots that are neither current nor leased are garbage-collected.
+    """
+
+    POINTER_FILE = "CURRENT"
+    SNAPSHOT_DIR = "snapshots"
+    LEASE_DIR = ".leases"
+
+    def __init__(self, root: str):
+        """
+        Initialize the snapshot store.
+
+        Args:
+            root: Root directory holding the pointer file and snapshots.
+        """
+        self.root = Path(root)
+        self._snapshots_dir = self.root / self.SNAPSHOT_DIR
+        self._refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def current_version(self) -> Optional[str]:
+        """Get the published snapshot version, or None if nothing is published."""
+        pointer = self.root / self.POINTER_FILE
+        try:
+            version = pointer.read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def path_for(self, version: str) -> Path:
+        """Get the directory of a snapshot version."""
+        return self._snapshots_dir / version
+
+    def new_build(self) -> Tuple[str, Path]:
+        """
+        Allocate a directory for a new snapshot build.
+
+        The build is leased by this process until it is published or
+        released, so a concurrent garbage collection will not remove it.
+
+        Returns:
+            Tuple of (version, snapshot_directory).
+        """
+        version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        path = self.path_for(version)
+        path.mkdir(parents=True)
+        self.acquire(version)
+        logger.info(f"Building index snapshot: {version}")
+        return version, path
+
+    def publish(self, version: str) -> None:
+        """
+        Atomically make a snapshot the current version.
+
+        Args:
+            version: Snapshot version returned by new_build().
+        """
+        if not self.path_for(version).is_dir():
+            raise ValueError(f"Unknown snapshot version: {version}")
+
+        tmp_pointer = self.root / f".{self.POINTER_FILE}.{os.getpid()}.tmp"
+        with open(tmp_pointer, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_pointer, self.root / self.POINTER_FILE)
+        logger.info(f"Published index snapshot: {version}")
+
+    def acquire(self, version: str) -> None:
+        """Take a lease on a snapshot so it is not garbage-collected."""
+        with self._lock:
+            count = self._refs.get(version, 0)
+            if count == 0:
+                lease_dir = self.path_for(version) / self.LEASE_DIR
+                lease_dir.mkdir(parents=True, exist_ok=True)
+                (lease_dir / str(os.getpid())).touch()
+            self._refs[version] = count + 1
+
+    def release(self, version: str) -> None:
+        """Release a lease taken with acquire() or new_build()."""
+        with self._lock:
+            count = self._refs.get(version, 0)
+            if count <= 1:
+                self._refs.pop(version, None)
+                lease = self.path_for(version) / self.LEASE_DIR / str(os.getpid())
+                lease.unlink(missing_ok=True)
+            else:
+                self._refs[version] = count - 1
+
+    def versions(self) -> List[str]:
+        """List all snapshot versions on disk, oldest first."""
+        if not self._snapshots_dir.exists():
+            return []
+        return sorted(p.name for p in self._snapshots_dir.iterdir() if p.is_dir())
+
+    def gc(self) -> List[str]:
+        """
+        Remove snapshots that are neither current nor leased by a live process.
+
+        Returns:
+            List of removed snapshot versions.
+        """
+        current = self.current_version()
+        removed = []
+        for version in self.versions():
+            if version == current or self._is_leased(version):
+                continue
+            shutil.rmtree(self.path_for(version), ignore_errors=True)
+            removed.append(version)
+
+        if removed:
+            logger.info(f"Garbage-collected {len(removed)} index snapshot(s)")
+        return removed
+
+    def _is_leased(self, version: str) -> bool:
+        """Check for leases held by this or any other live process."""
+        with self._lock:
+            if self._refs.get(version):
+                return True
+
+        lease_dir = self.path_for(version) / self.LEASE_DIR
+        if not lease_dir.exists():
+            return False
+
+        for lease in lease_dir.iterdir():
+            try:
+                pid = int(lease.name)
+            except ValueError:
+                continue
+            if pid != os.getpid() and _pid_alive(pid):
+                return True
+        return False
+
+
+def _pid_alive(pid: int) -> bool:
+    """Check whether a process with the given pid is running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
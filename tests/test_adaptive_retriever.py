@@ -0,0 +1,48 @@
+"""Tests for the score-adaptive retriever."""
+
+import unittest
+
+from langchain_core.documents import Document
+
+from src.repositories.retriever import AdaptiveRetriever
+
+
+def _hits(*scores):
+    return [(Document(page_content=f"chunk {i}"), score) for i, score in enumerate(scores)]
+
+
+def _contents(documents):
+    return [doc.page_content for doc in documents]
+
+
+class AdaptiveRetrieverSelectTest(unittest.TestCase):
+    """select() cuts scored candidates to the adaptive depth."""
+
+    def test_no_cuts_keeps_every_candidate(self):
+        retriever = AdaptiveRetriever(repository=None)
+        self.assertEqual(len(retriever.select(_hits(0.9, 0.2, 0.1))), 3)
+
+    def test_threshold_stops_at_the_first_weak_chunk(self):
+        retriever = AdaptiveRetriever(repository=None, score_threshold=0.5)
+        selected = retriever.select(_hits(0.9, 0.7, 0.4, 0.8))
+        self.assertEqual(_contents(selected), ["chunk 0", "chunk 1"])
+
+    def test_drop_is_measured_from_the_best_chunk(self):
+        retriever = AdaptiveRetriever(repository=None, score_drop=0.2)
+        selected = retriever.select(_hits(0.9, 0.8, 0.75, 0.6))
+        self.assertEqual(_contents(selected), ["chunk 0", "chunk 1", "chunk 2"])
+
+    def test_min_k_is_kept_whatever_the_scores(self):
+        retriever = AdaptiveRetriever(repository=None, min_k=2, score_threshold=0.95)
+        self.assertEqual(_contents(retriever.select(_hits(0.5, 0.4, 0.3))), ["chunk 0", "chunk 1"])
+
+    def test_min_k_does_not_exceed_the_candidates(self):
+        retriever = AdaptiveRetriever(repository=None, min_k=3)
+        self.assertEqual(len(retriever.select(_hits(0.5))), 1)
+
+    def test_no_candidates(self):
+        self.assertEqual(AdaptiveRetriever(repository=None, min_k=2).select([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""Tests for admission control in front of generation."""
+
+import asyncio
+import time
+import unittest
+
+from src.agent.admission import AdmissionController, OverloadedError, PriorityClass
+
+
+def _controller(max_concurrency=1, max_queue=8, batch_cap=None, batch_timeout=None):
+    return AdmissionController(
+        max_concurrency,
+        [
+            PriorityClass("interactive"),
+            PriorityClass("batch", max_concurrency=batch_cap, timeout=batch_timeout),
+        ],
+        max_queue=max_queue,
+    )
+
+
+class AdmissionControllerTest(unittest.IsolatedAsyncioTestCase):
+    """Slots are granted by class then arrival, within caps, and shed when needed."""
+
+    async def _queue(self, controller, priority):
+        """Start waiting for a slot and let the request join the queue."""
+        task = asyncio.create_task(controller.aacquire(priority))
+        await asyncio.sleep(0)
+        return task
+
+    async def _granted(self, tasks):
+        """Wait for exactly one of the tasks to be granted and return it."""
+        done, _ = await asyncio.wait(tasks, timeout=1, return_when=asyncio.FIRST_COMPLETED)
+        self.assertEqual(len(done), 1)
+        return done.pop()
+
+    async def test_grants_in_class_order_then_arrival_order(self):
+        controller = _controller()
+        held = controller.acquire("batch")
+        waiting = {
+            name: await self._queue(controller, priority)
+            for name, priority in (
+                ("batch 1", "batch"),
+                ("interactive 1", "interactive"),
+                ("batch 2", "batch"),
+                ("interactive 2", "interactive"),
+            )
+        }
+        self.assertEqual(controller.queue_depth(), {"interactive": 2, "batch": 2})
+
+        names = {task: name for name, task in waiting.items()}
+        pending = set(names)
+        order = []
+        ticket = held
+        while pending:
+            controller.release(ticket)
+            task = await self._granted(pending)
+            pending.discard(task)
+            order.append(names[task])
+            ticket = task.result()
+        controller.release(ticket)
+
+        self.assertEqual(order, ["interactive 1", "interactive 2", "batch 1", "batch 2"])
+        self.assertEqual(controller.metrics.get("admission.admitted.batch"), 3)
+
+    async def test_class_cap_leaves_slots_to_other_classes(self):
+        controller = _controller(max_concurrency=2, batch_cap=1)
+        first = controller.acquire("batch")
+        second = await self._queue(controller, "batch")
+        self.assertEqual(controller.queue_depth()["batch"], 1)
+
+        interactive = await asyncio.wait_for(controller.aacquire("interactive"), timeout=1)
+        self.assertFalse(second.done())
+
+        controller.release(first)
+        controller.release(await asyncio.wait_for(second, timeout=1))
+        controller.release(interactive)
+
+    async def test_full_queue_sheds_the_newest_least_urgent_request(self):
+        controller = _controller(max_queue=2)
+        held = controller.acquire("interactive")
+        older = await self._queue(controller, "batch")
+        newer = await self._queue(controller, "batch")
+
+        urgent = await self._queue(controller, "interactive")
+        with self.assertRaises(OverloadedError) as shed:
+            await asyncio.wait_for(newer, timeout=1)
+        self.assertEqual(shed.exception.reason, "queue full")
+
+        # Nothing less urgent is waiting, so the arriving request is shed
+        with self.assertRaises(OverloadedError):
+            await asyncio.wait_for(controller.aacquire("batch"), timeout=1)
+        self.assertEqual(controller.metrics.get("admission.shed.batch"), 2)
+        self.assertEqual(controller.queue_depth(), {"interactive": 1, "batch": 1})
+
+        controller.release(held)
+        controller.release(await asyncio.wait_for(urgent, timeout=1))
+        controller.release(await asyncio.wait_for(older, timeout=1))
+
+    def test_request_is_shed_when_its_deadline_passes_in_the_queue(self):
+        controller = _controller(batch_timeout=0.05)
+        held = controller.acquire("interactive")
+        start = time.monotonic()
+        with self.assertRaises(OverloadedError) as shed:
+            controller.acquire("batch")
+        self.assertEqual(shed.exception.reason, "deadline")
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(controller.queue_depth()["batch"], 0)
+        controller.release(held)
+
+    def test_request_that_would_finish_late_is_shed_on_arrival(self):
+        controller = _controller()
+        ticket = controller.acquire("interactive")
+        time.sleep(0.2)
+        controller.release(ticket)
+
+        # A free slot, but the recent service time exceeds the deadline
+        with self.assertRaises(OverloadedError) as shed:
+            controller.acquire("interactive", timeout=0.05)
+        self.assertEqual(shed.exception.reason, "deadline")
+        controller.release(controller.acquire("interactive", timeout=5))
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        controller = _controller()
+        held = controller.acquire("interactive")
+        cancelled = await self._queue(controller, "interactive")
+        waiting = await self._queue(controller, "batch")
+
+        cancelled.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+        self.assertEqual(controller.queue_depth(), {"interactive": 0, "batch": 1})
+
+        controller.release(held)
+        controller.release(await asyncio.wait_for(waiting, timeout=1))
+
+    async def test_waiter_cancelled_as_it_is_granted_frees_the_slot(self):
+        controller = _controller()
+        held = controller.acquire("interactive")
+        cancelled = await self._queue(controller, "interactive")
+
+        controller.release(held)
+        cancelled.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+
+        controller.release(
+            await asyncio.wait_for(controller.aacquire("interactive"), timeout=1)
+        )
+
+    def test_unknown_class_is_rejected(self):
+        with self.assertRaises(ValueError):
+            _controller().acquire("background")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for the batch job checkpoint."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.agent.batch import BatchCheckpoint
+
+
+class BatchCheckpointTest(unittest.TestCase):
+    """The low-water mark advances and progress survives a restart."""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._dir.name)
+        self.path = self.root / "out.jsonl.ckpt"
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_out_of_order_lines_advance_the_low_water_mark(self):
+        checkpoint = BatchCheckpoint(self.path)
+        checkpoint.mark(2, 30)
+        checkpoint.mark(0, 10)
+        self.assertEqual((checkpoint.next_line, checkpoint.done), (1, {2}))
+
+        checkpoint.mark(1, 20)
+        self.assertEqual((checkpoint.next_line, checkpoint.done), (3, set()))
+        self.assertEqual(checkpoint.completed, 3)
+        self.assertEqual(checkpoint.output_bytes, 20)
+
+    def test_blank_and_shed_lines_do_not_hold_back_the_low_water_mark(self):
+        checkpoint = BatchCheckpoint(self.path)
+        checkpoint.mark(0, 10)
+        checkpoint.mark_blank(1)
+        checkpoint.mark_retry(2)
+        checkpoint.mark(3, 20)
+
+        self.assertEqual((checkpoint.next_line, checkpoint.done), (4, set()))
+        self.assertEqual(checkpoint.completed, 2)
+        self.assertFalse(checkpoint.is_done(2))
+        self.assertTrue(checkpoint.is_done(1))
+
+        checkpoint.mark(2, 30)
+        self.assertTrue(checkpoint.is_done(2))
+        self.assertEqual(checkpoint.completed, 3)
+
+    def test_save_and_reload(self):
+        checkpoint = BatchCheckpoint(self.path)
+        checkpoint.mark(0, 10)
+        checkpoint.mark(5, 20)
+        checkpoint.mark_retry(3)
+        checkpoint.save()
+
+        loaded = BatchCheckpoint(self.path)
+        self.assertTrue(loaded.loaded)
+        self.assertEqual(
+            (loaded.next_line, loaded.done, loaded.retry, loaded.output_bytes),
+            (1, {3, 5}, {3}, 20),
+        )
+        self.assertFalse(loaded.is_done(3))
+
+    def test_unreadable_checkpoint_is_not_loaded(self):
+        self.path.write_text("{not json")
+        self.assertFalse(BatchCheckpoint(self.path).loaded)
+
+    def test_rebuild_from_output_stops_at_a_partial_line(self):
+        output = self.root / "out.jsonl"
+        records = [
+            {"line": 1, "overloaded": False},
+            {"line": 0, "overloaded": False},
+            {"line": 2, "overloaded": True},
+        ]
+        complete = "".join(json.dumps(record) + "\n" for record in records)
+        output.write_text(complete + '{"line": 3, "partial')
+
+        checkpoint = BatchCheckpoint(self.path)
+        checkpoint.rebuild(output)
+
+        self.assertEqual(checkpoint.next_line, 3)
+        self.assertEqual(checkpoint.retry, {2})
+        self.assertEqual(checkpoint.completed, 2)
+        self.assertEqual(checkpoint.output_bytes, len(complete.encode()))
+
+    def test_rebuild_without_output_starts_over(self):
+        checkpoint = BatchCheckpoint(self.path)
+        checkpoint.mark(0, 10)
+        checkpoint.rebuild(self.root / "missing.jsonl")
+        self.assertEqual((checkpoint.completed, checkpoint.output_bytes), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Tests for the vector compression codec."""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.repositories.compression import VectorCodec
+
+
+def _vectors(rows=20, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+
+
+class VectorCodecTest(unittest.TestCase):
+    """Encoded vectors score queries close to the exact cosine similarity."""
+
+    def test_project_normalizes_rows(self):
+        projected = VectorCodec("none", dtype="float32").project(_vectors())
+        np.testing.assert_allclose(np.linalg.norm(projected, axis=1), 1.0, rtol=1e-5)
+
+    def test_truncate_keeps_the_leading_dimensions(self):
+        vectors = _vectors()
+        projected = VectorCodec("truncate", dim=4, dtype="float32").project(vectors)
+        self.assertEqual(projected.shape, (20, 4))
+        expected = vectors[:, :4] / np.linalg.norm(vectors[:, :4], axis=1, keepdims=True)
+        np.testing.assert_allclose(projected, expected, rtol=1e-5)
+
+    def test_float_codes_have_no_scales(self):
+        codec = VectorCodec("none", dtype="float16")
+        codes, scales = codec.encode(codec.project(_vectors()))
+        self.assertEqual(codes.dtype, np.float16)
+        self.assertIsNone(scales)
+
+    def test_int8_scales_map_the_largest_component_to_127(self):
+        codec = VectorCodec("none", dtype="int8")
+        projected = codec.project(_vectors())
+        codes, scales = codec.encode(projected)
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertEqual(scales.shape, (20,))
+        np.testing.assert_array_equal(np.abs(codes).max(axis=1), 127)
+        np.testing.assert_allclose(codes * scales[:, None], projected, atol=scales.max())
+
+    def test_scores_approximate_cosine_similarity(self):
+        for dtype, tolerance in (("float32", 1e-5), ("float16", 1e-2), ("int8", 3e-2)):
+            codec = VectorCodec("none", dtype=dtype)
+            projected = codec.project(_vectors())
+            codes, scales = codec.encode(projected)
+            query = codec.project(_vectors(rows=1, seed=1))[0]
+            np.testing.assert_allclose(
+                VectorCodec.scores(codes, scales, query), projected @ query, atol=tolerance
+            )
+
+    def test_query_matrix_scores_every_query_at_once(self):
+        codec = VectorCodec("none", dtype="int8")
+        codes, scales = codec.encode(codec.project(_vectors()))
+        queries = codec.project(_vectors(rows=3, seed=1))
+        matrix = VectorCodec.scores(codes, scales, queries.T)
+        self.assertEqual(matrix.shape, (20, 3))
+        for column, query in enumerate(queries):
+            np.testing.assert_allclose(
+                matrix[:, column], VectorCodec.scores(codes, scales, query), atol=1e-6
+            )
+
+    def test_pca_round_trips_through_save_and_load(self):
+        codec = VectorCodec("pca", dim=4, dtype="float32")
+        vectors = _vectors()
+        codec.fit(vectors)
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "codec.npz")
+            codec.save(path)
+            loaded = VectorCodec.load(path)
+        self.assertEqual((loaded.reduction, loaded.dim, loaded.dtype), ("pca", 4, "float32"))
+        np.testing.assert_allclose(loaded.project(vectors), codec.project(vectors))
+
+    def test_unsupported_settings_are_rejected(self):
+        with self.assertRaises(ValueError):
+            VectorCodec("svd")
+        with self.assertRaises(ValueError):
+            VectorCodec(dtype="int4")
+        with self.assertRaises(ValueError):
+            VectorCodec("pca")
+
+
+if __name__ == "__main__":
+    unittest.main()
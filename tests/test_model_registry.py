@@ -0,0 +1,74 @@
+"""Tests for the shared model registry."""
+
+import threading
+import unittest
+
+from src.registry import ModelRegistry
+
+
+class ModelRegistryTest(unittest.TestCase):
+    """Instances are shared per key and loaded outside the registry lock."""
+
+    def test_concurrent_callers_share_one_load(self):
+        registry = ModelRegistry("test")
+        release = threading.Event()
+        loads = []
+
+        def load():
+            loads.append(1)
+            release.wait()
+            return object()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.acquire("a", load)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        while not loads:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(len({id(instance) for instance in results}), 1)
+        self.assertEqual(registry.ref_count("a"), 3)
+
+    def test_slow_load_does_not_block_other_keys(self):
+        registry = ModelRegistry("test")
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait()
+            return object()
+
+        thread = threading.Thread(target=registry.acquire, args=("slow", slow))
+        thread.start()
+        started.wait()
+        try:
+            fast = registry.acquire("fast", object)
+            registry.release(fast)
+            self.assertEqual(registry.ref_count("fast"), 0)
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(registry.ref_count("slow"), 1)
+
+    def test_failed_load_is_not_registered(self):
+        registry = ModelRegistry("test")
+
+        def fail():
+            raise ValueError("no model")
+
+        with self.assertRaises(ValueError):
+            registry.acquire("a", fail)
+        self.assertEqual(len(registry), 0)
+        self.assertIsNotNone(registry.acquire("a", object))
+
+
+if __name__ == "__main__":
+    unittest.main()
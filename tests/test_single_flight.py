@@ -0,0 +1,269 @@
+"""Tests for coalescing of concurrent identical requests."""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from langchain_core.documents import Document
+
+from src.agent.agent import RAGAgent
+from src.agent.config_loader import AgentConfig
+from src.agent.single_flight import SingleFlight
+from src.llm import StubProvider
+from src.repositories.base import VectorStoreRepository
+from src.repositories.retriever import RepositoryRetriever
+
+
+class SingleFlightCancellationTest(unittest.IsolatedAsyncioTestCase):
+    """Cancelling one caller must not fail the others sharing its computation."""
+
+    async def test_cancelled_leader_does_not_fail_followers(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+        release = asyncio.Event()
+        runs = 0
+
+        async def compute():
+            nonlocal runs
+            runs += 1
+            started.set()
+            await release.wait()
+            return "answer"
+
+        leader = asyncio.create_task(flight.ado("key", compute))
+        await started.wait()
+        follower = asyncio.create_task(flight.ado("key", compute))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        release.set()
+
+        self.assertEqual(await follower, ("answer", True))
+        self.assertEqual(runs, 1)
+        self.assertEqual(flight.in_flight(), 0)
+
+    async def test_cancelled_leader_does_not_fail_sync_followers(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def compute():
+            started.set()
+            await release.wait()
+            return "answer"
+
+        leader = asyncio.create_task(flight.ado("key", compute))
+        await started.wait()
+
+        results = []
+        joined = threading.Event()
+
+        def sync_follower():
+            joined.set()
+            results.append(flight.do("key", lambda: "own run"))
+
+        thread = threading.Thread(target=sync_follower)
+        thread.start()
+        await asyncio.to_thread(joined.wait)
+        # Let the thread join as a follower before the leader goes away; had it
+        # not, it would have run its own computation and the result would show
+        await asyncio.sleep(0.1)
+
+        leader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        release.set()
+        await asyncio.to_thread(thread.join)
+
+        self.assertEqual(results, [("answer", True)])
+
+    async def test_abandoned_computation_is_cancelled(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def compute():
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        leader = asyncio.create_task(flight.ado("key", compute))
+        await started.wait()
+        leader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        self.assertEqual(flight.in_flight(), 0)
+
+    async def test_cancelled_follower_does_not_cancel_leader(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "answer"
+
+        leader = asyncio.create_task(flight.ado("key", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.ado("key", compute))
+        await asyncio.sleep(0)
+
+        follower.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await follower
+        release.set()
+
+        self.assertEqual(await leader, ("answer", False))
+
+
+class SingleFlightSharingTest(unittest.TestCase):
+    """Concurrent callers for a key share one computation and its outcome."""
+
+    def _start_followers(self, flight, count):
+        """Start callers that block on the computation fn is leading."""
+        outcomes = []
+
+        def follow():
+            try:
+                outcomes.append(flight.do("key", lambda: "own run"))
+            except Exception as e:
+                outcomes.append(e)
+
+        threads = [threading.Thread(target=follow) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, outcomes
+
+    def test_followers_receive_the_leader_result(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            started.set()
+            release.wait()
+            return "answer"
+
+        leader = []
+        thread = threading.Thread(target=lambda: leader.append(flight.do("key", compute)))
+        thread.start()
+        started.wait()
+        followers, outcomes = self._start_followers(flight, 3)
+        # Followers arriving late would run their own computation and show it
+        time.sleep(0.1)
+        release.set()
+        for follower in [thread, *followers]:
+            follower.join()
+
+        self.assertEqual(leader, [("answer", False)])
+        self.assertEqual(outcomes, [("answer", True)] * 3)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_followers_receive_the_leader_exception(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            started.set()
+            release.wait()
+            raise ValueError("failed")
+
+        errors = []
+
+        def lead():
+            try:
+                flight.do("key", compute)
+            except ValueError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=lead)
+        thread.start()
+        started.wait()
+        followers, outcomes = self._start_followers(flight, 2)
+        time.sleep(0.1)
+        release.set()
+        for follower in [thread, *followers]:
+            follower.join()
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(outcomes, [errors[0], errors[0]])
+        # The failure isn't cached: the next call runs again
+        self.assertEqual(flight.do("key", lambda: "retry"), ("retry", False))
+
+
+class _GatedRepository(VectorStoreRepository):
+    """In-memory repository whose searches wait for a gate to open."""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.searches = 0
+
+    def save(self, documents):
+        pass
+
+    def load(self):
+        return True
+
+    def exists(self):
+        return True
+
+    def search(self, query, k=3):
+        self.searches += 1
+        self.entered.set()
+        self.gate.wait()
+        return [Document(page_content="Paris is the capital of France.")]
+
+    def search_with_scores(self, query, k=3):
+        return [(doc, 1.0) for doc in self.search(query, k)]
+
+    def embed_query(self, query):
+        return [0.0]
+
+    def search_by_vector_with_scores(self, embedding, k=3):
+        return [(doc, 1.0) for doc in self.search("", k)]
+
+    def as_retriever(self, k=3):
+        return RepositoryRetriever(repository=self, k=k)
+
+
+class AgentCoalescingTest(unittest.IsolatedAsyncioTestCase):
+    """Identical in-flight agent requests are answered by one computation."""
+
+    async def test_identical_requests_are_coalesced(self):
+        config = AgentConfig._parse_config({"runtime": {"single_flight": True}})
+        repository = _GatedRepository()
+        agent = RAGAgent(config, repository, StubProvider(latency=0.0, answer="Paris"))
+
+        leader = asyncio.create_task(
+            asyncio.to_thread(agent.run, "What is the capital of France?")
+        )
+        await asyncio.to_thread(repository.entered.wait)
+        # Joins the leader's computation as soon as the task first runs
+        follower = asyncio.create_task(agent.arun("  what is the capital of  FRANCE? "))
+        await asyncio.sleep(0)
+        repository.gate.set()
+
+        leader_response, follower_response = await asyncio.gather(leader, follower)
+        self.assertEqual(repository.searches, 1)
+        self.assertEqual(agent.metrics.get("coalesced"), 1)
+        self.assertEqual(agent.metrics.get("requests"), 2)
+        self.assertEqual((leader_response.output, follower_response.output), ("Paris", "Paris"))
+        self.assertEqual(follower_response.input, "  what is the capital of  FRANCE? ")
+
+        # Nothing in flight: the next identical request runs again
+        agent.run("What is the capital of France?")
+        self.assertEqual(repository.searches, 2)
+        self.assertEqual(agent.metrics.get("coalesced"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()